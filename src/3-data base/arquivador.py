@@ -0,0 +1,303 @@
+# arquivador.py
+# Arquivamento de palavras_chave antigas em partições comprimidas por mês e origem, com consulta unificada
+#
+# Uso:
+#   python "src/3-data base/arquivador.py" --db global_keywords.db --idade-dias 180
+#   python "src/3-data base/arquivador.py" --db global_keywords.db --idade-dias 365 --formato ndjson --vacuum
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # sem pyarrow: partições em NDJSON comprimido
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:  # sem zstandard: NDJSON com gzip da biblioteca padrão
+    zstandard = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from migrador import migrar  # noqa: E402
+
+logger = logging.getLogger("arquivador")
+
+CONFIG_PADRAO = {
+    "IDADE_DIAS": 180,        # linhas sem coleta (visto_em) há mais que isso saem da tabela quente
+    "LOTE": 5000,             # linhas por transação (seleção, arquivos, manifesto e DELETE juntos)
+    "PAUSA_MS": 10.0,         # intervalo entre lotes para a fila de ingestão gravar
+    "BUSY_TIMEOUT_MS": 30000,
+    "FORMATO": None,          # "parquet" | "ndjson"; None: parquet se o pyarrow estiver instalado
+    "NIVEL_ZSTD": 3,
+    "LOG_A_CADA": 20          # lotes entre logs de progresso
+}
+
+EXTENSOES = {"parquet": ".parquet", "ndjson.zst": ".ndjson.zst", "ndjson.gz": ".ndjson.gz"}
+
+# =========================
+# FORMATOS
+# =========================
+def _resolver_formato(formato: Optional[str]) -> str:
+    if formato in (None, "parquet") and pyarrow is not None:
+        return "parquet"
+    if formato == "parquet":
+        raise RuntimeError("Formato parquet requer o pacote pyarrow.")
+    if formato not in (None, "ndjson"):
+        raise ValueError(f"Formato de arquivo desconhecido: {formato}")
+    return "ndjson.zst" if zstandard is not None else "ndjson.gz"
+
+def _gravar_parte(caminho: Path, registros: List[dict], formato: str, nivel_zstd: int):
+    """Grava num temporário, sincroniza no disco e renomeia: a parte nunca fica pela metade."""
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    if formato == "parquet":
+        pq.write_table(pyarrow.Table.from_pylist(registros), temporario, compression="zstd")
+    else:
+        linhas = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros).encode("utf-8")
+        with open(temporario, "wb") as f:
+            if formato == "ndjson.zst":
+                f.write(zstandard.ZstdCompressor(level=nivel_zstd).compress(linhas))
+            else:
+                f.write(gzip.compress(linhas))
+    with open(temporario, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+def ler_parte(caminho: Path, formato: str) -> List[dict]:
+    if formato == "parquet":
+        if pyarrow is None:
+            raise RuntimeError(f"Partição {caminho} é parquet e o pyarrow não está instalado.")
+        return pq.read_table(caminho).to_pylist()
+    with open(caminho, "rb") as f:
+        if formato == "ndjson.zst":
+            if zstandard is None:
+                raise RuntimeError(f"Partição {caminho} é zstd e o zstandard não está instalado.")
+            fluxo = zstandard.ZstdDecompressor().stream_reader(f)
+        else:
+            fluxo = gzip.GzipFile(fileobj=f)
+        return [json.loads(linha) for linha in io.TextIOWrapper(fluxo, encoding="utf-8") if linha.strip()]
+
+def _nome_seguro(valor: str) -> str:
+    return re.sub(r"[^\w.-]", "_", valor) or "_"
+
+# =========================
+# ARQUIVAMENTO
+# =========================
+class Arquivador:
+    """
+    Move linhas de palavras_chave com visto_em anterior ao corte para
+    `diretorio/mes=AAAA-MM/origem=<origem>/parte-<id_min>-<id_max>.<ext>`.
+    Cada lote seleciona, grava as partes, registra o manifesto
+    (arquivo_particoes) e apaga as linhas quentes numa única transação; uma
+    parte gravada por um lote que não chegou ao COMMIT fica fora do manifesto
+    e é removida na execução seguinte.
+    """
+
+    def __init__(self, db_path: Union[str, Path], diretorio: Optional[Union[str, Path]] = None, config: Optional[dict] = None):
+        self.db_path = str(db_path)
+        self.diretorio = Path(diretorio) if diretorio else Path(self.db_path).resolve().parent / "arquivo"
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.formato = _resolver_formato(self.config["FORMATO"])
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.db_path, isolation_level=None, timeout=self.config["BUSY_TIMEOUT_MS"] / 1000)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        return conexao
+
+    def limpar_orfaos(self, conexao: sqlite3.Connection) -> int:
+        """
+        Remove partes fora do manifesto (lote interrompido entre a gravação do
+        arquivo e o COMMIT). A listagem é feita sem lock; a conferência com o
+        manifesto e a remoção, sob BEGIN IMMEDIATE: outro arquivador só grava
+        partes com a escrita do banco adquirida, então cada arquivo listado já
+        foi registrado pelo COMMIT dele ou pertence a um lote desfeito.
+        """
+        if not self.diretorio.exists():
+            return 0
+        candidatas = list(self.diretorio.rglob("parte-*"))
+        if not candidatas:
+            return 0
+        removidas = 0
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            registradas = {linha[0] for linha in conexao.execute("SELECT caminho FROM arquivo_particoes")}
+            for arquivo in candidatas:
+                if arquivo.relative_to(self.diretorio).as_posix() not in registradas:
+                    arquivo.unlink(missing_ok=True)
+                    removidas += 1
+        finally:
+            conexao.execute("ROLLBACK")
+        if removidas:
+            logger.warning(f"🧹 {removidas} partes órfãs removidas de {self.diretorio}")
+        return removidas
+
+    def _arquivar_lote(self, conexao: sqlite3.Connection, corte: str) -> Tuple[int, int]:
+        gravadas: List[Path] = []
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conexao.execute(
+                "SELECT * FROM palavras_chave WHERE visto_em < ? ORDER BY visto_em LIMIT ?", (corte, self.config["LOTE"])
+            )
+            colunas = [d[0] for d in cursor.description]
+            registros = [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+            if not registros:
+                conexao.execute("ROLLBACK")
+                return 0, 0
+
+            particoes: Dict[Tuple[str, str], List[dict]] = {}
+            for registro in registros:
+                particoes.setdefault((registro["visto_em"][:7], registro["origem"]), []).append(registro)
+
+            agora = datetime.utcnow().isoformat()
+            for (mes, origem), linhas in particoes.items():
+                ids = [r["id"] for r in linhas]
+                relativo = f"mes={mes}/origem={_nome_seguro(origem)}/parte-{min(ids)}-{max(ids)}{EXTENSOES[self.formato]}"
+                caminho = self.diretorio / relativo
+                _gravar_parte(caminho, linhas, self.formato, self.config["NIVEL_ZSTD"])
+                gravadas.append(caminho)
+                conexao.execute("""
+                    INSERT INTO arquivo_particoes (caminho, mes, origem, formato, linhas, id_min, id_max, criado_em)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (relativo, mes, origem, self.formato, len(linhas), min(ids), max(ids), agora))
+
+            conexao.executemany("DELETE FROM palavras_chave WHERE id = ?", [(r["id"],) for r in registros])
+            conexao.execute("COMMIT")
+            return len(registros), len(particoes)
+        except Exception:
+            conexao.execute("ROLLBACK")
+            for caminho in gravadas:
+                caminho.unlink(missing_ok=True)
+            raise
+
+    def arquivar(self, idade_dias: Optional[float] = None, vacuum: bool = False) -> dict:
+        """Arquiva em lotes até não restar linha anterior ao corte e retorna o resumo da execução."""
+        idade_dias = self.config["IDADE_DIAS"] if idade_dias is None else idade_dias
+        corte = (datetime.utcnow() - timedelta(days=idade_dias)).isoformat()
+        migrar(self.db_path)  # garante manifesto e índice de visto_em (migração 0004)
+
+        conexao = self._conectar()
+        inicio, lotes, linhas, partes = time.perf_counter(), 0, 0, 0
+        try:
+            self.limpar_orfaos(conexao)
+            logger.info(f"📦 Arquivando palavras_chave com visto_em < {corte} em {self.diretorio} ({self.formato})")
+            while True:
+                arquivadas, particoes = self._arquivar_lote(conexao, corte)
+                if not arquivadas:
+                    break
+                lotes, linhas, partes = lotes + 1, linhas + arquivadas, partes + particoes
+                if lotes % self.config["LOG_A_CADA"] == 0:
+                    logger.info(f"⏳ {linhas} linhas arquivadas em {partes} partes | {time.perf_counter() - inicio:.1f}s")
+                if self.config["PAUSA_MS"]:
+                    time.sleep(self.config["PAUSA_MS"] / 1000)
+            if vacuum and linhas:
+                # Devolve ao sistema as páginas liberadas; bloqueia escritas enquanto roda
+                logger.info("🗜️ Executando VACUUM...")
+                conexao.execute("VACUUM")
+        finally:
+            conexao.close()
+
+        duracao = time.perf_counter() - inicio
+        logger.info(f"✅ {linhas} linhas arquivadas em {partes} partes | {lotes} lotes | {duracao:.1f}s")
+        return {"corte": corte, "linhas": linhas, "partes": partes, "lotes": lotes, "duracao_s": round(duracao, 3)}
+
+# =========================
+# CONSULTA HISTÓRICA
+# =========================
+def conectar_historico(
+    db_path: Union[str, Path],
+    diretorio: Optional[Union[str, Path]] = None,
+    desde: Optional[str] = None,
+    ate: Optional[str] = None,
+    origens: Optional[Sequence[str]] = None
+) -> sqlite3.Connection:
+    """
+    Conexão ao banco global com a view temporária `palavras_chave_historico`:
+    a tabela quente mais as partições arquivadas, com a coluna `arquivado`
+    (0/1). `desde`/`ate` ("AAAA-MM" ou datas ISO) e `origens` escolhem quais
+    partições carregar, pelo mês de visto_em e pela origem; a tabela quente é
+    sempre incluída inteira e pode ser filtrada no próprio SQL do relatório.
+    """
+    diretorio = Path(diretorio) if diretorio else Path(db_path).resolve().parent / "arquivo"
+    conexao = sqlite3.connect(str(db_path))
+    colunas = [linha[1] for linha in conexao.execute("PRAGMA main.table_info(palavras_chave)")]
+    conexao.execute("CREATE TEMP TABLE palavras_chave_arquivo AS SELECT * FROM main.palavras_chave WHERE 0")
+
+    filtros, parametros = [], []
+    if desde:
+        filtros.append("mes >= ?")
+        parametros.append(desde[:7])
+    if ate:
+        filtros.append("mes <= ?")
+        parametros.append(ate[:7])
+    if origens:
+        filtros.append(f"origem IN ({', '.join('?' for _ in origens)})")
+        parametros.extend(origens)
+    manifesto = "SELECT caminho, formato FROM arquivo_particoes"
+    if filtros:
+        manifesto += " WHERE " + " AND ".join(filtros)
+
+    tem_manifesto = conexao.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'arquivo_particoes'"
+    ).fetchone()[0]
+    inserir = (
+        f"INSERT INTO temp.palavras_chave_arquivo ({', '.join(colunas)}) "
+        f"VALUES ({', '.join(':' + c for c in colunas)})"
+    )
+    carregadas = 0
+    for caminho, formato in (conexao.execute(manifesto, parametros).fetchall() if tem_manifesto else []):
+        # Partes gravadas antes de uma migração que adicionou colunas ficam com NULL nelas
+        registros = ler_parte(diretorio / caminho, formato)
+        conexao.executemany(inserir, ({c: r.get(c) for c in colunas} for r in registros))
+        carregadas += len(registros)
+
+    lista = ", ".join(colunas)
+    conexao.execute(f"""
+        CREATE TEMP VIEW palavras_chave_historico AS
+        SELECT {lista}, 0 AS arquivado FROM main.palavras_chave
+        UNION ALL
+        SELECT {lista}, 1 AS arquivado FROM temp.palavras_chave_arquivo
+    """)
+    conexao.commit()
+    logger.debug(f"{carregadas} linhas arquivadas carregadas para consulta histórica")
+    return conexao
+
+def consultar_historico(
+    db_path: Union[str, Path],
+    sql: str,
+    parametros: Iterable = (),
+    **filtros_particao
+) -> List[tuple]:
+    """Executa `sql` (que referencia palavras_chave_historico) sobre a união da tabela quente com o arquivo."""
+    conexao = conectar_historico(db_path, **filtros_particao)
+    try:
+        return conexao.execute(sql, tuple(parametros)).fetchall()
+    finally:
+        conexao.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Arquiva palavras_chave antigas em partições comprimidas por mês e origem")
+    parser.add_argument("--db", default="global_keywords.db")
+    parser.add_argument("--diretorio", default=None, help="Padrão: <pasta do banco>/arquivo")
+    parser.add_argument("--idade-dias", type=float, default=CONFIG_PADRAO["IDADE_DIAS"])
+    parser.add_argument("--lote", type=int, default=CONFIG_PADRAO["LOTE"])
+    parser.add_argument("--pausa-ms", type=float, default=CONFIG_PADRAO["PAUSA_MS"])
+    parser.add_argument("--formato", choices=["parquet", "ndjson"], default=None)
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM ao final para reduzir o arquivo do banco")
+    args = parser.parse_args()
+
+    arquivador = Arquivador(args.db, args.diretorio, {"LOTE": args.lote, "PAUSA_MS": args.pausa_ms, "FORMATO": args.formato})
+    print(json.dumps(arquivador.arquivar(args.idade_dias, vacuum=args.vacuum), indent=2))
@@ -0,0 +1,159 @@
+# integrator/cache_palavras.py
+# Cache Redis das palavras salvas: HSET + EXPIRE em pipeline por bloco, com modo assíncrono opcional
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger("cache_palavras")
+
+CONFIG_PADRAO = {
+    "TTL_S": 86400,
+    "TAMANHO_LOTE": 500,      # palavras por pipeline (cada uma vira HSET + EXPIRE)
+    # Assíncrono: salvar_coleta só enfileira e uma thread grava no Redis, desacoplado do commit no banco
+    "ASSINCRONO": os.getenv("CACHE_PALAVRAS_ASSINCRONO", "0") == "1",
+    "MAX_ESPERA_MS": 100.0,   # no modo assíncrono, atraso máximo até o envio de um bloco incompleto
+    "MAX_PENDENTES": 100000   # palavras aguardando envio; acima disso são descartadas (é só cache)
+}
+
+# === Métricas Prometheus ===
+comandos_enviados = Counter("cache_palavras_comandos_total", "Comandos Redis (HSET/EXPIRE) enviados para o cache de palavras")
+round_trips = Counter("cache_palavras_round_trips_total", "Round-trips ao Redis (um por pipeline)")
+round_trips_economizados = Counter(
+    "cache_palavras_round_trips_economizados_total",
+    "Round-trips evitados em relação a HSET + EXPIRE individuais por palavra"
+)
+palavras_descartadas = Counter("cache_palavras_descartadas_total", "Palavras não gravadas no cache", ["motivo"])
+duracao_pipeline = Histogram(
+    "cache_palavras_pipeline_segundos",
+    "Duração de cada pipeline ao Redis",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+)
+
+def _valor_redis(valor):
+    # redis-py só aceita str/bytes/int/float: bool vira 0/1 e None vira ""
+    if isinstance(valor, bool):
+        return int(valor)
+    return "" if valor is None else valor
+
+class EscritorCache:
+    """
+    Grava os registros de `salvar_coleta` como hashes `chave:{palavra}` com
+    TTL. Cada bloco de `TAMANHO_LOTE` palavras é um único pipeline (sem
+    MULTI: não há leitura dependente, então a atomicidade não é necessária)
+    em vez de dois round-trips por palavra. No modo assíncrono os blocos são
+    enviados por uma thread própria, e falhas do Redis nunca chegam ao
+    chamador.
+    """
+
+    def __init__(self, cliente, config: Optional[dict] = None):
+        self.cliente = cliente
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self._fila: "queue.Queue" = queue.Queue(maxsize=self.config["MAX_PENDENTES"])
+        self._thread: Optional[threading.Thread] = None
+        self._trava = threading.Lock()
+
+    def _enviar_bloco(self, registros: List[dict]):
+        pipeline = self.cliente.pipeline(transaction=False)
+        for dados in registros:
+            chave = f"chave:{dados['palavra']}"
+            pipeline.hset(chave, mapping={campo: _valor_redis(v) for campo, v in dados.items()})
+            pipeline.expire(chave, self.config["TTL_S"])
+        inicio = time.perf_counter()
+        pipeline.execute()
+        duracao_pipeline.observe(time.perf_counter() - inicio)
+        round_trips.inc()
+        comandos_enviados.inc(2 * len(registros))
+        round_trips_economizados.inc(2 * len(registros) - 1)
+
+    def _enviar(self, registros: List[dict]) -> int:
+        enviados = 0
+        tamanho = self.config["TAMANHO_LOTE"]
+        for i in range(0, len(registros), tamanho):
+            bloco = registros[i:i + tamanho]
+            try:
+                self._enviar_bloco(bloco)
+                enviados += len(bloco)
+            except Exception as e:
+                palavras_descartadas.labels(motivo="erro").inc(len(bloco))
+                logger.error(f"❌ Falha ao gravar {len(bloco)} palavras no cache: {e}", exc_info=True)
+        return enviados
+
+    def gravar(self, registros: Iterable[dict]) -> int:
+        """Síncrono: retorna as palavras gravadas. Assíncrono: retorna as enfileiradas."""
+        registros = list(registros)
+        if not registros:
+            return 0
+        if not self.config["ASSINCRONO"]:
+            return self._enviar(registros)
+
+        self._iniciar()
+        enfileirados = 0
+        for dados in registros:
+            try:
+                self._fila.put_nowait(dados)
+                enfileirados += 1
+            except queue.Full:
+                palavras_descartadas.labels(motivo="fila_cheia").inc(len(registros) - enfileirados)
+                logger.warning(f"⚠️ Fila do cache cheia; {len(registros) - enfileirados} palavras não serão cacheadas.")
+                break
+        return enfileirados
+
+    # ---- Modo assíncrono ----
+    def _iniciar(self):
+        if self._thread is not None:
+            return
+        with self._trava:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name="escritor-cache", daemon=True)
+                self._thread.start()
+
+    def _executar(self):
+        tamanho = self.config["TAMANHO_LOTE"]
+        while True:
+            bloco = [self._fila.get()]
+            prazo = time.monotonic() + self.config["MAX_ESPERA_MS"] / 1000
+            while len(bloco) < tamanho:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    bloco.append(self._fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+            encerrar = bloco[-1] is None
+            bloco = [dados for dados in bloco if dados is not None]
+            if bloco:
+                self._enviar(bloco)
+            for _ in range(len(bloco) + encerrar):
+                self._fila.task_done()
+            if encerrar:
+                break
+
+    def aguardar(self):
+        """Bloqueia até o Redis receber tudo o que já foi enfileirado."""
+        if self._thread is not None:
+            self._fila.join()
+
+    def encerrar(self, timeout: Optional[float] = None):
+        if self._thread is not None and self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join(timeout)
+
+# Um escritor por cliente Redis no processo
+_escritores: dict = {}
+_trava_escritores = threading.Lock()
+
+def obter_escritor(cliente) -> EscritorCache:
+    with _trava_escritores:
+        escritor = _escritores.get(id(cliente))
+        if escritor is None:
+            escritor = _escritores[id(cliente)] = EscritorCache(cliente)
+            atexit.register(escritor.encerrar)
+        return escritor
@@ -1,11 +1,21 @@
 import uuid
 import logging
+from dataclasses import replace
 from datetime import datetime
-from database_connection import conectar_banco, cache
-from ml.relevance_predictor import prever_relevancia
-from keywords.utils.texto_helper import gerar_tags
+from database_connection import cache
+from ml.relevance_predictor import prever_relevancia_lote, PalavraAvaliada
+from ml.tagging import gerar_tags_lote
 from prometheus_client import Counter
 
+try:
+    from .fila_ingestao import obter_fila
+    from .cache_palavras import obter_escritor
+    from .esquema_palavras import normalizar_palavra
+except ImportError:
+    from fila_ingestao import obter_fila
+    from cache_palavras import obter_escritor
+    from esquema_palavras import normalizar_palavra
+
 # === Logger estruturado ===
 logger = logging.getLogger("coletor_integrator")
 
@@ -15,13 +25,20 @@ palavras_processadas = Counter(
     "Total de palavras processadas",
     ["tema", "origem"]
 )
+palavras_pontuadas = Counter(
+    "palavras_pontuadas_total",
+    "Palavras gravadas por quem calculou tags/escore (coletor ou integrador)",
+    ["origem", "pontuacao"]
+)
 
 def salvar_coleta(palavras, id_tema, origem, fonte="", metodo="semantico", dry_run=False, trace_id=None, verbose=True):
     """
     Processa e salva palavras-chave vinculadas a um tema no banco global
 
     Args:
-        palavras (list[str]): Lista de palavras a processar
+        palavras (list[str | PalavraAvaliada]): Palavras a processar. Itens
+            PalavraAvaliada com tags e escore preenchidos são gravados sem
+            nova passada de NER e do modelo de relevância
         id_tema (int): ID do tema (chave estrangeira vinda do Theme Manager)
         origem (str): Nome do coletor ou módulo
         fonte (str): Fonte original (URL, canal, subreddit...)
@@ -43,57 +60,84 @@ def salvar_coleta(palavras, id_tema, origem, fonte="", metodo="semantico", dry_r
             "registros": []
         }
 
-    db = conectar_banco()
     resultados = []
     agora = datetime.utcnow().isoformat()
     trace_id = trace_id or str(uuid.uuid4())
 
-    for palavra in palavras:
-        palavra = palavra.strip()
-        if not palavra:
+    avaliadas = []
+    for item in palavras:
+        avaliada = replace(item) if isinstance(item, PalavraAvaliada) else PalavraAvaliada(palavra=item)
+        avaliada.palavra = avaliada.palavra.strip()
+        if not avaliada.palavra:
             logger.warning("⚠️ Palavra em branco ignorada.")
             continue
+        avaliadas.append(avaliada)
 
+    # Só o que o coletor não pontuou passa por NER e pelo modelo (em lote, uma vez por tema)
+    sem_tags = [a for a in avaliadas if a.tags is None]
+    if sem_tags:
         try:
-            if verbose:
-                logger.info(f"🔁 Processando palavra: {palavra}")
-            tags = gerar_tags(palavra)
-            validado, escore = prever_relevancia(palavra, id_tema, origem, tags)
-
-            dados = {
-                "id_tema": id_tema,
-                "origem": origem,
-                "palavra": palavra,
-                "tags": ",".join(tags),
-                "escore": round(escore, 4),
-                "validado": validado,
-                "trace_id": trace_id,
-                "criado_em": agora,
-                "fonte": fonte,
-                "metodo_geracao": metodo
-            }
-
-            if not dry_run:
-                db.executar_modificacao("""
-                    INSERT INTO palavras_chave (
-                        id_tema, origem, palavra, tags, escore, validado, trace_id, criado_em, fonte, metodo_geracao
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, tuple(dados.values()))
-
-                if cache:
-                    cache_key = f"chave:{palavra}"
-                    cache.hmset(cache_key, dados)
-                    cache.expire(cache_key, 86400)
-
-            resultados.append(dados)
-            if verbose:
-                logger.info(f"✅ Palavra salva: {palavra} | Tema ID: {id_tema} | Origem: {origem}")
-
-            # Atualiza métrica Prometheus
-            palavras_processadas.labels(tema=str(id_tema), origem=origem).inc()
-
+            tags_por_palavra = gerar_tags_lote([a.palavra for a in sem_tags])
+        except Exception as e:
+            logger.error(f"❌ Falha ao gerar tags em lote: {e}", exc_info=True)
+            tags_por_palavra = [[] for _ in sem_tags]
+        for avaliada, tags in zip(sem_tags, tags_por_palavra):
+            avaliada.tags = tags
+
+    sem_escore = [a for a in avaliadas if a.escore is None or a.validado is None]
+    if sem_escore:
+        validos, escores = prever_relevancia_lote([(a.palavra, id_tema, origem, a.tags) for a in sem_escore])
+        for avaliada, validado, escore in zip(sem_escore, validos.tolist(), escores.tolist()):
+            avaliada.validado, avaliada.escore = validado, escore
+
+    reaproveitadas = len(avaliadas) - len(sem_escore)
+    palavras_pontuadas.labels(origem=origem, pontuacao="coletor").inc(reaproveitadas)
+    palavras_pontuadas.labels(origem=origem, pontuacao="integrador").inc(len(sem_escore))
+    if verbose and reaproveitadas:
+        logger.info(f"♻️ {reaproveitadas} palavras com tags/escore do coletor | {len(sem_escore)} pontuadas aqui")
+
+    for avaliada in avaliadas:
+        palavra, tags, validado, escore = avaliada.palavra, avaliada.tags, avaliada.validado, avaliada.escore
+        if verbose:
+            logger.info(f"🔁 Processando palavra: {palavra}")
+        resultados.append({
+            "id_tema": id_tema,
+            "origem": origem,
+            "palavra": palavra,
+            "tags": ",".join(tags),
+            "escore": round(escore, 4),
+            "validado": validado,
+            "trace_id": trace_id,
+            "criado_em": agora,
+            "fonte": fonte,
+            "metodo_geracao": metodo
+        })
+
+    if not dry_run and resultados:
+        # Um pedido por tema para o escritor único do processo; retorna após o commit da transação que o contém.
+        # Palavra já coletada para o tema/origem (mesma forma normalizada) tem escore e visto_em atualizados.
+        linhas = [
+            (
+                id_tema, origem, d["palavra"], normalizar_palavra(d["palavra"]), d["tags"], d["escore"], d["validado"],
+                trace_id, agora, agora, fonte, metodo
+            )
+            for d in resultados
+        ]
+        try:
+            obter_fila().gravar(linhas)
         except Exception as e:
-            logger.error(f"❌ Falha ao salvar '{palavra}': {e}", exc_info=True)
+            logger.error(f"❌ Falha ao salvar {len(resultados)} palavras | Tema ID: {id_tema}: {e}", exc_info=True)
+            resultados = []
+
+        if cache and resultados:
+            # HSET + EXPIRE em pipeline por bloco; com CACHE_PALAVRAS_ASSINCRONO=1 só enfileira
+            obter_escritor(cache).gravar(resultados)
+
+    if verbose:
+        for dados in resultados:
+            logger.info(f"✅ Palavra salva: {dados['palavra']} | Tema ID: {id_tema} | Origem: {origem}")
+    # Atualiza métrica Prometheus
+    palavras_processadas.labels(tema=str(id_tema), origem=origem).inc(len(resultados))
 
     if verbose:
         logger.info(f"📦 Total processado: {len(resultados)} palavras | Tema ID: {id_tema} | Trace ID: {trace_id}")
@@ -0,0 +1,49 @@
+# integrator/esquema_palavras.py
+# Esquema de palavras_chave (colunas da ingestão, UPSERT, índices) e a normalização usada na deduplicação
+
+import string
+import unicodedata
+
+_SEM_PONTUACAO = str.maketrans("", "", string.punctuation)
+
+def normalizar_palavra(palavra: str) -> str:
+    """
+    Chave de deduplicação: minúsculas, sem acentos, sem pontuação e com
+    espaços colapsados (mesmas regras de ml.feature_engineering.normalizar_texto).
+    "Melhor  Celular 2024!" e "melhor celular 2024" são a mesma palavra.
+    """
+    texto = unicodedata.normalize("NFKD", palavra.lower()).encode("ascii", "ignore").decode("utf-8")
+    return " ".join(texto.translate(_SEM_PONTUACAO).split())
+
+# A tabela é criada e evoluída pelas migrações versionadas (migracoes/, aplicadas por migrador.py).
+# criado_em: primeira coleta | visto_em: última coleta | ocorrencias: quantas vezes foi coletada
+
+# Índices dos padrões de consulta: palavras de um tema por data e melhores palavras validadas.
+# Busca por tema (+ origem) já é coberta pelo índice único (tema, origem, palavra_normalizada).
+INDICES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_palavras_tema_criado ON palavras_chave (tema, criado_em)",
+    "CREATE INDEX IF NOT EXISTS idx_palavras_validado_escore ON palavras_chave (validado, escore)",
+)
+
+# Colunas gravadas pela ingestão, na ordem dos parâmetros de UPSERT_SQL
+COLUNAS = (
+    "tema", "origem", "palavra", "palavra_normalizada", "tags", "escore", "validado",
+    "trace_id", "criado_em", "visto_em", "fonte", "metodo_geracao"
+)
+
+# Recoleta da mesma palavra atualiza escore/tags/validação e o último visto; criado_em, a grafia original,
+# fonte e método da primeira coleta são preservados
+UPSERT_SQL = f"""
+INSERT INTO palavras_chave ({', '.join(COLUNAS)})
+VALUES ({', '.join('?' for _ in COLUNAS)})
+ON CONFLICT (tema, origem, palavra_normalizada) DO UPDATE SET
+    tags = excluded.tags,
+    escore = excluded.escore,
+    validado = excluded.validado,
+    trace_id = excluded.trace_id,
+    visto_em = excluded.visto_em,
+    ocorrencias = palavras_chave.ocorrencias + 1
+"""
+
+# Enquanto a migração 0002 não criou o índice único (ON CONFLICT ainda sem alvo): insere e a fusão de duplicatas da migração trata
+INSERT_SQL = f"INSERT INTO palavras_chave ({', '.join(COLUNAS)}) VALUES ({', '.join('?' for _ in COLUNAS)})"
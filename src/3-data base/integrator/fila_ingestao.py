@@ -0,0 +1,201 @@
+# integrator/fila_ingestao.py
+# Fila de ingestão com escritor único: palavras_chave gravadas em lote (executemany de UPSERT) com transações limitadas por tamanho e tempo
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from prometheus_client import Counter, Histogram
+
+try:
+    from .esquema_palavras import UPSERT_SQL, INSERT_SQL
+except ImportError:
+    from esquema_palavras import UPSERT_SQL, INSERT_SQL
+
+logger = logging.getLogger("fila_ingestao")
+
+CONFIG_PADRAO = {
+    "DB_PATH": os.getenv("GLOBAL_KEYWORDS_DB", "global_keywords.db"),
+    "MAX_LINHAS": 5000,        # linhas por transação
+    "MAX_ESPERA_MS": 50.0,     # tempo máximo juntando pedidos antes do commit, com a fila sempre cheia
+    "MAX_PEDIDOS_FILA": 10000, # pedidos aguardando; acima disso os produtores bloqueiam
+    "BUSY_TIMEOUT_MS": 30000   # outros processos escrevendo no mesmo banco
+}
+
+# === Métricas Prometheus ===
+linhas_gravadas = Counter("ingestao_linhas_total", "Linhas gravadas (inseridas ou atualizadas) em palavras_chave pela fila de ingestão")
+falhas_transacao = Counter("ingestao_falhas_total", "Transações da fila de ingestão revertidas")
+linhas_por_transacao = Histogram(
+    "ingestao_linhas_por_transacao",
+    "Linhas por transação do escritor",
+    buckets=(1, 10, 50, 100, 500, 1000, 2500, 5000, 10000)
+)
+duracao_transacao = Histogram(
+    "ingestao_transacao_segundos",
+    "Duração de executemany + commit",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+@dataclass
+class _Pedido:
+    linhas: List[tuple]
+    futuro: Future = field(default_factory=Future)
+
+_ENCERRAR = object()
+
+class FilaIngestao:
+    """
+    Um escritor por processo, com conexão SQLite própria. Os produtores
+    (coletores, salvar_coleta) chamam `enviar` e recebem um Future que é
+    resolvido com o número de linhas quando a transação que as contém é
+    confirmada. O escritor junta o que já está na fila (group commit: sem
+    esperar por pedidos que ainda não chegaram), limitado a `MAX_LINHAS` e
+    `MAX_ESPERA_MS`, e grava tudo com um único `executemany` por transação.
+    Enquanto uma transação é gravada, os produtores seguintes se acumulam
+    para a próxima. Uma falha reverte a transação e propaga a exceção a
+    todos os pedidos do lote.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self._fila: "queue.Queue" = queue.Queue(maxsize=self.config["MAX_PEDIDOS_FILA"])
+        self._escritor: Optional[threading.Thread] = None
+        self._trava = threading.Lock()
+        self._encerrada = False
+
+    # ---- Produtores ----
+    def enviar(self, linhas: Sequence[Sequence]) -> Future:
+        """Enfileira linhas na ordem de `esquema_palavras.COLUNAS`. Bloqueia se a fila estiver cheia."""
+        if self._encerrada:
+            raise RuntimeError("Fila de ingestão encerrada.")
+        self._iniciar()
+        pedido = _Pedido([tuple(linha) for linha in linhas])
+        if not pedido.linhas:
+            pedido.futuro.set_result(0)
+            return pedido.futuro
+        self._fila.put(pedido)
+        return pedido.futuro
+
+    def gravar(self, linhas: Sequence[Sequence], timeout: Optional[float] = None) -> int:
+        """`enviar` + espera pelo commit."""
+        return self.enviar(linhas).result(timeout)
+
+    # ---- Escritor ----
+    def _iniciar(self):
+        if self._escritor is not None:
+            return
+        with self._trava:
+            if self._escritor is None:
+                self._escritor = threading.Thread(target=self._executar, name="escritor-ingestao", daemon=True)
+                self._escritor.start()
+
+    def _conectar(self) -> sqlite3.Connection:
+        # isolation_level=None: a transação é aberta e fechada explicitamente em _gravar_lote
+        conexao = sqlite3.connect(self.config["DB_PATH"], isolation_level=None, timeout=self.config["BUSY_TIMEOUT_MS"] / 1000)
+        conexao.execute("PRAGMA journal_mode=WAL")    # leitores não bloqueiam o escritor
+        conexao.execute("PRAGMA synchronous=NORMAL")  # fsync no checkpoint do WAL, não a cada commit
+        return conexao
+
+    def _proximo_lote(self) -> List[_Pedido]:
+        primeiro = self._fila.get()
+        if primeiro is _ENCERRAR:
+            return [primeiro]
+        lote, linhas = [primeiro], len(primeiro.linhas)
+        prazo = time.monotonic() + self.config["MAX_ESPERA_MS"] / 1000
+        while linhas < self.config["MAX_LINHAS"] and time.monotonic() < prazo:
+            try:
+                pedido = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            lote.append(pedido)
+            if pedido is _ENCERRAR:
+                break
+            linhas += len(pedido.linhas)
+        return lote
+
+    def _gravar_lote(self, conexao: sqlite3.Connection, pedidos: List[_Pedido]):
+        linhas = [linha for pedido in pedidos for linha in pedido.linhas]
+        inicio = time.perf_counter()
+        try:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                conexao.executemany(UPSERT_SQL, linhas)
+            except sqlite3.OperationalError as e:
+                if "ON CONFLICT" not in str(e):
+                    raise
+                # A conexão prepara com o esquema em memória: ler sqlite_master sob o lock recarrega o esquema
+                # se a migração já criou o índice único desde a última leitura
+                conexao.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                try:
+                    conexao.executemany(UPSERT_SQL, linhas)
+                except sqlite3.OperationalError as e:
+                    # Migração de deduplicação em andamento: o banco continua aceitando escrita
+                    if "ON CONFLICT" not in str(e):
+                        raise
+                    conexao.executemany(INSERT_SQL, linhas)
+            conexao.execute("COMMIT")
+        except Exception as e:
+            if conexao.in_transaction:
+                conexao.execute("ROLLBACK")
+            falhas_transacao.inc()
+            logger.error(f"❌ Falha ao gravar {len(linhas)} linhas ({len(pedidos)} pedidos): {e}", exc_info=True)
+            for pedido in pedidos:
+                pedido.futuro.set_exception(e)
+            return
+        duracao_transacao.observe(time.perf_counter() - inicio)
+        linhas_por_transacao.observe(len(linhas))
+        linhas_gravadas.inc(len(linhas))
+        for pedido in pedidos:
+            pedido.futuro.set_result(len(pedido.linhas))
+
+    def _executar(self):
+        conexao = None
+        try:
+            while True:
+                lote = self._proximo_lote()
+                encerrar = lote[-1] is _ENCERRAR
+                pedidos = [p for p in lote if p is not _ENCERRAR]
+                if pedidos:
+                    if conexao is None:
+                        try:
+                            conexao = self._conectar()
+                        except sqlite3.Error as e:
+                            # Produtores recebem o erro em vez de esperar para sempre; a próxima rodada tenta de novo
+                            logger.error(f"❌ Falha ao abrir {self.config['DB_PATH']}: {e}")
+                            for pedido in pedidos:
+                                pedido.futuro.set_exception(e)
+                    if conexao is not None:
+                        self._gravar_lote(conexao, pedidos)
+                if encerrar:
+                    break
+        finally:
+            if conexao is not None:
+                conexao.close()
+
+    def encerrar(self, timeout: Optional[float] = None):
+        """Grava o que está na fila e para o escritor."""
+        self._encerrada = True
+        if self._escritor is not None and self._escritor.is_alive():
+            self._fila.put(_ENCERRAR)
+            self._escritor.join(timeout)
+            logger.info("🛑 Fila de ingestão encerrada.")
+
+# Uma fila (e um escritor) por processo
+_fila_padrao: Optional[FilaIngestao] = None
+_trava_padrao = threading.Lock()
+
+def obter_fila() -> FilaIngestao:
+    global _fila_padrao
+    if _fila_padrao is None:
+        with _trava_padrao:
+            if _fila_padrao is None:
+                _fila_padrao = FilaIngestao()
+                atexit.register(_fila_padrao.encerrar)
+    return _fila_padrao
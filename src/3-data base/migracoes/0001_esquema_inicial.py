@@ -0,0 +1,24 @@
+# migracoes/0001_esquema_inicial.py
+# Tabela palavras_chave como criada pelo setup 1.0.0 (sem efeito em bancos que já a têm)
+
+from migrador import Sql
+
+DESCRICAO = "Tabela palavras_chave (esquema 1.0.0)"
+
+PASSOS = [
+    Sql("""
+        CREATE TABLE IF NOT EXISTS palavras_chave (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origem TEXT NOT NULL,
+            tema TEXT NOT NULL,
+            palavra TEXT NOT NULL,
+            tags TEXT,
+            escore REAL,
+            validado INTEGER,
+            trace_id TEXT,
+            criado_em TEXT,
+            fonte TEXT DEFAULT '',
+            metodo_geracao TEXT DEFAULT ''
+        )
+    """),
+]
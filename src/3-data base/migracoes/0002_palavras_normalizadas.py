@@ -0,0 +1,67 @@
+# migracoes/0002_palavras_normalizadas.py
+# palavra_normalizada + visto_em + ocorrencias, fusão das duplicatas e índice único do UPSERT da ingestão
+
+from integrator.esquema_palavras import normalizar_palavra
+from migrador import AdicionarColuna, Backfill, Sql
+
+DESCRICAO = "Deduplicação de palavras_chave por (tema, origem, palavra_normalizada)"
+
+FUNCOES = {"normalizar_palavra": (1, normalizar_palavra)}
+
+# Mesma chave (tema, origem, palavra_normalizada) com id menor: a linha de `t` é uma duplicata a fundir.
+# Sobrevive a linha mais antiga de cada chave; como ids só crescem, uma linha já processada nunca
+# ganha uma duplicata mais antiga depois, e inserções durante a migração entram nos lotes seguintes.
+_TEM_MAIS_ANTIGA = """
+    EXISTS (
+        SELECT 1 FROM palavras_chave AS p
+        WHERE p.tema = t.tema AND p.origem = t.origem AND p.palavra_normalizada = t.palavra_normalizada AND p.id < t.id
+    )
+"""
+
+PASSOS = [
+    AdicionarColuna("palavras_chave", "palavra_normalizada", "TEXT NOT NULL DEFAULT ''"),
+    AdicionarColuna("palavras_chave", "visto_em", "TEXT"),
+    AdicionarColuna("palavras_chave", "ocorrencias", "INTEGER NOT NULL DEFAULT 1"),
+    Backfill("palavras_chave", ("""
+        UPDATE palavras_chave SET
+            palavra_normalizada = normalizar_palavra(palavra),
+            visto_em = COALESCE(visto_em, criado_em)
+        WHERE id > :inicio AND id <= :fim AND palavra_normalizada = ''
+    """,), descricao="preenchimento de palavra_normalizada"),
+    # Índice provisório (não único) para a fusão abaixo não varrer a tabela a cada lote
+    Sql("CREATE INDEX IF NOT EXISTS idx_palavras_migracao_0002 ON palavras_chave (tema, origem, palavra_normalizada, id)"),
+    # Mesmo efeito do UPSERT da ingestão: a linha mais antiga (criado_em, grafia, fonte) soma as ocorrências
+    # e recebe tags/escore/validação/visto_em da duplicata mais recente do lote
+    Backfill("palavras_chave", (f"""
+        UPDATE palavras_chave AS s SET
+            ocorrencias = s.ocorrencias + d.total,
+            tags = u.tags,
+            escore = u.escore,
+            validado = u.validado,
+            trace_id = u.trace_id,
+            visto_em = COALESCE(u.visto_em, u.criado_em)
+        FROM (
+            SELECT
+                (SELECT MIN(p.id) FROM palavras_chave AS p
+                 WHERE p.tema = t.tema AND p.origem = t.origem AND p.palavra_normalizada = t.palavra_normalizada) AS alvo,
+                SUM(t.ocorrencias) AS total,
+                MAX(t.id) AS ultimo
+            FROM palavras_chave AS t
+            WHERE t.id > :inicio AND t.id <= :fim AND {_TEM_MAIS_ANTIGA}
+            GROUP BY alvo
+        ) AS d
+        JOIN palavras_chave AS u ON u.id = d.ultimo
+        WHERE s.id = d.alvo
+    """, f"""
+        DELETE FROM palavras_chave AS t
+        WHERE t.id > :inicio AND t.id <= :fim AND {_TEM_MAIS_ANTIGA}
+    """), descricao="fusão de duplicatas", ao_concluir=(
+        # Na mesma transação do último lote: nenhuma duplicata entra entre a fusão e o índice.
+        # Bancos criados pelo setup 1.1.0 já têm a restrição UNIQUE na tabela.
+        Sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_palavras_unica ON palavras_chave (tema, origem, palavra_normalizada)",
+            se="SELECT COUNT(*) = 0 FROM pragma_index_list('palavras_chave') WHERE \"unique\" = 1 AND origin = 'u'"
+        ),
+    )),
+    Sql("DROP INDEX IF EXISTS idx_palavras_migracao_0002"),
+]
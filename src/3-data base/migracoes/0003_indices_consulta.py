@@ -0,0 +1,9 @@
+# migracoes/0003_indices_consulta.py
+# Índices compostos dos padrões de consulta de palavras_chave
+
+from integrator.esquema_palavras import INDICES_SQL
+from migrador import Sql
+
+DESCRICAO = "Índices (tema, criado_em) e (validado, escore)"
+
+PASSOS = [Sql(indice) for indice in INDICES_SQL]
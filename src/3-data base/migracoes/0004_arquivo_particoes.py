@@ -0,0 +1,25 @@
+# migracoes/0004_arquivo_particoes.py
+# Manifesto das partições arquivadas de palavras_chave e índice de visto_em usado pelo arquivador
+
+from migrador import Sql
+
+DESCRICAO = "Manifesto arquivo_particoes e índice (visto_em) para o arquivamento"
+
+PASSOS = [
+    # Só arquivos registrados aqui fazem parte do arquivo: a linha é gravada na mesma transação que apaga as linhas quentes
+    Sql("""
+        CREATE TABLE IF NOT EXISTS arquivo_particoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            caminho TEXT NOT NULL UNIQUE,
+            mes TEXT NOT NULL,
+            origem TEXT NOT NULL,
+            formato TEXT NOT NULL,
+            linhas INTEGER NOT NULL,
+            id_min INTEGER NOT NULL,
+            id_max INTEGER NOT NULL,
+            criado_em TEXT NOT NULL
+        )
+    """),
+    Sql("CREATE INDEX IF NOT EXISTS idx_arquivo_particoes_mes_origem ON arquivo_particoes (mes, origem)"),
+    Sql("CREATE INDEX IF NOT EXISTS idx_palavras_visto_em ON palavras_chave (visto_em)"),
+]
@@ -0,0 +1,302 @@
+# migrador.py
+# Migrações versionadas do banco global (schema_info), com backfills em lotes retomáveis
+#
+# Uso:
+#   python "src/3-data base/migrador.py" --db global_keywords.db
+#   python "src/3-data base/migrador.py" --db global_keywords.db --status
+#   python "src/3-data base/migrador.py" --db global_keywords.db --lote 20000 --pausa-ms 5
+
+import argparse
+import importlib.util
+import logging
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger("migrador")
+
+DIRETORIO_MIGRACOES = Path(__file__).resolve().parent / "migracoes"
+PADRAO_ARQUIVO = re.compile(r"^(\d{4})_\w+\.py$")
+
+CONFIG_PADRAO = {
+    "LOTE": 10000,            # linhas (faixa de ids) por transação de backfill
+    "PAUSA_MS": 10.0,         # intervalo entre lotes para os escritores da aplicação entrarem
+    "BUSY_TIMEOUT_MS": 30000,
+    "LOG_A_CADA": 20          # lotes entre logs de progresso
+}
+
+CREATE_SCHEMA_INFO_SQL = """
+CREATE TABLE IF NOT EXISTS schema_info (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    versao TEXT NOT NULL,
+    criado_em TEXT NOT NULL
+);
+"""
+
+# Passos concluídos de migrações em andamento: uma migração interrompida retoma do passo/lote onde parou
+CREATE_PROGRESSO_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migracao_progresso (
+    versao TEXT NOT NULL,
+    passo INTEGER NOT NULL,
+    ultimo_id INTEGER NOT NULL DEFAULT 0,
+    concluido INTEGER NOT NULL DEFAULT 0,
+    atualizado_em TEXT NOT NULL,
+    PRIMARY KEY (versao, passo)
+);
+"""
+
+# =========================
+# PASSOS
+# =========================
+@dataclass
+class Sql:
+    """Um comando (DDL ou DML curto) numa transação. `se`: consulta que precisa retornar verdadeiro para o comando rodar."""
+    sql: str
+    se: Optional[str] = None
+
+@dataclass
+class AdicionarColuna:
+    """ALTER TABLE ADD COLUMN, ignorado se a coluna já existe (bancos criados por versões do setup que já a tinham)."""
+    tabela: str
+    coluna: str
+    definicao: str
+
+@dataclass
+class Backfill:
+    """
+    Comandos aplicados por faixa de id (`:inicio` < id <= `:fim`), um lote por
+    transação, com o progresso gravado na mesma transação. O limite superior é
+    relido a cada lote, então linhas inseridas durante a migração também entram.
+    `ao_concluir` roda na mesma transação que constata o fim da tabela (ex.: um
+    índice único que não pode perder linhas escritas entre o último lote e ele).
+    """
+    tabela: str
+    sqls: Tuple[str, ...]
+    descricao: str = ""
+    ao_concluir: Tuple[Sql, ...] = ()
+
+Passo = Union[Sql, AdicionarColuna, Backfill]
+
+@dataclass
+class Migracao:
+    versao: str
+    descricao: str
+    passos: List[Passo]
+    funcoes: Dict[str, Tuple[int, Callable]]
+
+# =========================
+# CARREGAMENTO
+# =========================
+def carregar_migracoes(diretorio: Path = DIRETORIO_MIGRACOES) -> List[Migracao]:
+    """Scripts `NNNN_nome.py` com DESCRICAO, PASSOS e opcionalmente FUNCOES (funções SQL em Python), em ordem."""
+    if str(Path(__file__).resolve().parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+    migracoes = []
+    for arquivo in sorted(diretorio.glob("*.py")):
+        correspondencia = PADRAO_ARQUIVO.match(arquivo.name)
+        if not correspondencia:
+            continue
+        spec = importlib.util.spec_from_file_location(f"migracao_{arquivo.stem}", arquivo)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        migracoes.append(Migracao(
+            versao=correspondencia.group(1),
+            descricao=modulo.DESCRICAO,
+            passos=list(modulo.PASSOS),
+            funcoes=getattr(modulo, "FUNCOES", {})
+        ))
+    versoes = [m.versao for m in migracoes]
+    if len(set(versoes)) != len(versoes):
+        raise ValueError(f"Versões de migração duplicadas em {diretorio}: {versoes}")
+    return migracoes
+
+# =========================
+# EXECUÇÃO
+# =========================
+class Migrador:
+    def __init__(self, db_path: Union[str, Path], config: Optional[dict] = None, diretorio: Path = DIRETORIO_MIGRACOES):
+        self.db_path = str(db_path)
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.migracoes = carregar_migracoes(diretorio)
+
+    def _conectar(self) -> sqlite3.Connection:
+        # Transações explícitas e curtas; WAL para leitores e escritores seguirem durante os backfills
+        conexao = sqlite3.connect(self.db_path, isolation_level=None, timeout=self.config["BUSY_TIMEOUT_MS"] / 1000)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute(CREATE_SCHEMA_INFO_SQL)
+        conexao.execute(CREATE_PROGRESSO_SQL)
+        return conexao
+
+    @staticmethod
+    def _aplicadas(conexao: sqlite3.Connection) -> set:
+        return {linha[0] for linha in conexao.execute("SELECT versao FROM schema_info")}
+
+    def pendentes(self) -> List[Migracao]:
+        conexao = self._conectar()
+        try:
+            aplicadas = self._aplicadas(conexao)
+        finally:
+            conexao.close()
+        return [m for m in self.migracoes if m.versao not in aplicadas]
+
+    def status(self) -> List[dict]:
+        conexao = self._conectar()
+        try:
+            aplicadas = dict(conexao.execute("SELECT versao, MAX(criado_em) FROM schema_info GROUP BY versao").fetchall())
+            progresso = {}
+            for versao, passo, ultimo_id, concluido in conexao.execute(
+                "SELECT versao, passo, ultimo_id, concluido FROM schema_migracao_progresso"
+            ):
+                progresso.setdefault(versao, []).append({"passo": passo, "ultimo_id": ultimo_id, "concluido": bool(concluido)})
+        finally:
+            conexao.close()
+        return [
+            {
+                "versao": m.versao,
+                "descricao": m.descricao,
+                "aplicada_em": aplicadas.get(m.versao),
+                "em_andamento": progresso.get(m.versao, []) if m.versao not in aplicadas else []
+            }
+            for m in self.migracoes
+        ]
+
+    def _progresso(self, conexao, versao: str, indice: int) -> Tuple[int, bool]:
+        linha = conexao.execute(
+            "SELECT ultimo_id, concluido FROM schema_migracao_progresso WHERE versao = ? AND passo = ?", (versao, indice)
+        ).fetchone()
+        return (linha[0], bool(linha[1])) if linha else (0, False)
+
+    def _registrar(self, conexao, versao: str, indice: int, ultimo_id: int = 0, concluido: bool = False):
+        conexao.execute("""
+            INSERT INTO schema_migracao_progresso (versao, passo, ultimo_id, concluido, atualizado_em)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (versao, passo) DO UPDATE SET
+                ultimo_id = excluded.ultimo_id, concluido = excluded.concluido, atualizado_em = excluded.atualizado_em
+        """, (versao, indice, ultimo_id, int(concluido), datetime.utcnow().isoformat()))
+
+    def _em_transacao(self, conexao, operacao):
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            resultado = operacao()
+            conexao.execute("COMMIT")
+            return resultado
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _rodar_sql(conexao, passo: Sql):
+        if passo.se is None or conexao.execute(passo.se).fetchone()[0]:
+            conexao.execute(passo.sql)
+
+    def _executar_sql(self, conexao, migracao: Migracao, indice: int, passo: Sql):
+        def operacao():
+            self._rodar_sql(conexao, passo)
+            self._registrar(conexao, migracao.versao, indice, concluido=True)
+        self._em_transacao(conexao, operacao)
+
+    def _adicionar_coluna(self, conexao, migracao: Migracao, indice: int, passo: AdicionarColuna):
+        def operacao():
+            colunas = {linha[1] for linha in conexao.execute(f"PRAGMA table_info({passo.tabela})")}
+            if passo.coluna not in colunas:
+                conexao.execute(f"ALTER TABLE {passo.tabela} ADD COLUMN {passo.coluna} {passo.definicao}")
+            self._registrar(conexao, migracao.versao, indice, concluido=True)
+        self._em_transacao(conexao, operacao)
+
+    def _backfill(self, conexao, migracao: Migracao, indice: int, passo: Backfill, ultimo_id: int):
+        lote, pausa = self.config["LOTE"], self.config["PAUSA_MS"] / 1000
+        inicio_passo, lotes, afetadas = time.perf_counter(), 0, 0
+        if ultimo_id:
+            logger.info(f"⏯️ {migracao.versao} passo {indice}: retomando {passo.descricao or passo.tabela} após id {ultimo_id}")
+
+        while True:
+            def operacao():
+                maximo = conexao.execute(f"SELECT COALESCE(MAX(id), 0) FROM {passo.tabela}").fetchone()[0]
+                if ultimo_id >= maximo:
+                    for final in passo.ao_concluir:
+                        self._rodar_sql(conexao, final)
+                    self._registrar(conexao, migracao.versao, indice, ultimo_id, concluido=True)
+                    return None, maximo, 0
+                fim = min(ultimo_id + lote, maximo)
+                linhas = sum(conexao.execute(sql, {"inicio": ultimo_id, "fim": fim}).rowcount for sql in passo.sqls)
+                self._registrar(conexao, migracao.versao, indice, fim)
+                return fim, maximo, linhas
+
+            fim, maximo, linhas = self._em_transacao(conexao, operacao)
+            if fim is None:
+                break
+            ultimo_id, lotes, afetadas = fim, lotes + 1, afetadas + linhas
+            if lotes % self.config["LOG_A_CADA"] == 0:
+                logger.info(
+                    f"⏳ {migracao.versao} passo {indice}: id {ultimo_id}/{maximo} ({100 * ultimo_id / maximo:.1f}%) | "
+                    f"{afetadas} linhas afetadas | {time.perf_counter() - inicio_passo:.1f}s"
+                )
+            if pausa:
+                time.sleep(pausa)
+
+        logger.info(f"✅ {migracao.versao} passo {indice}: {passo.descricao or passo.tabela} | {lotes} lotes | {afetadas} linhas afetadas")
+
+    def aplicar(self, migracao: Migracao, conexao: sqlite3.Connection):
+        logger.info(f"🔧 Aplicando migração {migracao.versao}: {migracao.descricao}")
+        for nome, (argumentos, funcao) in migracao.funcoes.items():
+            conexao.create_function(nome, argumentos, funcao, deterministic=True)
+
+        for indice, passo in enumerate(migracao.passos):
+            ultimo_id, concluido = self._progresso(conexao, migracao.versao, indice)
+            if concluido:
+                continue
+            inicio = time.perf_counter()
+            if isinstance(passo, Backfill):
+                self._backfill(conexao, migracao, indice, passo, ultimo_id)
+            elif isinstance(passo, AdicionarColuna):
+                self._adicionar_coluna(conexao, migracao, indice, passo)
+            else:
+                self._executar_sql(conexao, migracao, indice, passo)
+            logger.debug(f"{migracao.versao} passo {indice} concluído em {time.perf_counter() - inicio:.2f}s")
+
+        def concluir():
+            conexao.execute("INSERT INTO schema_info (versao, criado_em) VALUES (?, ?)", (migracao.versao, datetime.utcnow().isoformat()))
+            conexao.execute("DELETE FROM schema_migracao_progresso WHERE versao = ?", (migracao.versao,))
+        self._em_transacao(conexao, concluir)
+        logger.info(f"✅ Migração {migracao.versao} aplicada.")
+
+    def migrar(self) -> List[str]:
+        """Aplica as migrações pendentes em ordem e retorna as versões aplicadas."""
+        conexao = self._conectar()
+        try:
+            aplicadas = self._aplicadas(conexao)
+            pendentes = [m for m in self.migracoes if m.versao not in aplicadas]
+            if not pendentes:
+                logger.info("⏩ Banco já está na versão mais recente.")
+            for migracao in pendentes:
+                self.aplicar(migracao, conexao)
+            return [m.versao for m in pendentes]
+        finally:
+            conexao.close()
+
+def migrar(db_path: Union[str, Path], config: Optional[dict] = None) -> List[str]:
+    return Migrador(db_path, config).migrar()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Migrações versionadas do banco global de palavras-chave")
+    parser.add_argument("--db", default="global_keywords.db")
+    parser.add_argument("--status", action="store_true", help="Lista migrações aplicadas, pendentes e em andamento")
+    parser.add_argument("--lote", type=int, default=CONFIG_PADRAO["LOTE"])
+    parser.add_argument("--pausa-ms", type=float, default=CONFIG_PADRAO["PAUSA_MS"])
+    args = parser.parse_args()
+
+    migrador = Migrador(args.db, {"LOTE": args.lote, "PAUSA_MS": args.pausa_ms})
+    if args.status:
+        for m in migrador.status():
+            estado = f"aplicada em {m['aplicada_em']}" if m["aplicada_em"] else "pendente"
+            if m["em_andamento"]:
+                estado += f" | em andamento: {m['em_andamento']}"
+            print(f"{m['versao']}  {m['descricao']:<60} {estado}")
+    else:
+        migrador.migrar()
@@ -0,0 +1,137 @@
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import arquivador
+from arquivador import Arquivador, consultar_historico
+from migrador import migrar
+
+COLUNAS = ("tema", "origem", "palavra", "palavra_normalizada", "tags", "escore", "validado", "trace_id",
+           "criado_em", "visto_em", "ocorrencias", "fonte", "metodo_geracao")
+
+# Linhas antigas em 3 meses x 2 origens; as recentes ficam na tabela quente
+MESES_ANTIGOS = ("2024-01", "2024-02", "2024-03")
+ORIGENS = ("google", "reddit")
+
+def registros_de_teste():
+    agora = datetime.utcnow().isoformat()
+    registros = []
+    for mes in MESES_ANTIGOS:
+        for origem in ORIGENS:
+            for i in range(3):
+                palavra = f"palavra {mes} {origem} {i}"
+                registros.append(("seo", origem, palavra, palavra, '["seo"]', 0.5 + i / 10, 1, f"trace-{mes}",
+                                  f"{mes}-01T00:00:00", f"{mes}-1{i}T00:00:00", i + 1, "fonte", "teste"))
+    for i in range(2):
+        registros.append(("seo", "google", f"recente {i}", f"recente {i}", "[]", 0.9, 1, "trace-atual",
+                          agora, agora, 1, "fonte", "teste"))
+    return registros
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = tmp_path / "global_keywords.db"
+    migrar(caminho, {"PAUSA_MS": 0.0})
+    conexao = sqlite3.connect(caminho)
+    conexao.executemany(
+        f"INSERT INTO palavras_chave ({', '.join(COLUNAS)}) VALUES ({', '.join('?' for _ in COLUNAS)})",
+        registros_de_teste()
+    )
+    conexao.commit()
+    conexao.close()
+    return caminho
+
+def novo_arquivador(banco):
+    # Lote menor que uma partição: cada mês/origem é gravado em mais de uma parte
+    return Arquivador(banco, banco.parent / "arquivo", {"LOTE": 4, "PAUSA_MS": 0.0, "FORMATO": "ndjson"})
+
+def tabela_quente(banco):
+    conexao = sqlite3.connect(banco)
+    try:
+        return [linha[0] for linha in conexao.execute("SELECT palavra FROM palavras_chave ORDER BY id")]
+    finally:
+        conexao.close()
+
+def partes_em_disco(diretorio):
+    return sorted(p.relative_to(diretorio).as_posix() for p in diretorio.rglob("parte-*"))
+
+def manifesto(banco):
+    conexao = sqlite3.connect(banco)
+    try:
+        return sorted(linha[0] for linha in conexao.execute("SELECT caminho FROM arquivo_particoes"))
+    finally:
+        conexao.close()
+
+def test_linhas_arquivadas_voltam_inteiras_pela_consulta_historica(banco):
+    conexao = sqlite3.connect(banco)
+    originais = conexao.execute(f"SELECT id, {', '.join(COLUNAS)} FROM palavras_chave ORDER BY id").fetchall()
+    conexao.close()
+
+    resumo = novo_arquivador(banco).arquivar(idade_dias=30)
+
+    assert resumo["linhas"] == 18
+    assert tabela_quente(banco) == ["recente 0", "recente 1"]
+    assert partes_em_disco(banco.parent / "arquivo") == manifesto(banco)
+    assert all(p.startswith("mes=2024-0") for p in manifesto(banco))
+
+    historico = consultar_historico(
+        banco, f"SELECT id, {', '.join(COLUNAS)}, arquivado FROM palavras_chave_historico ORDER BY id"
+    )
+    assert [linha[:-1] for linha in historico] == originais
+    assert [linha[-1] for linha in historico] == [1] * 18 + [0] * 2
+
+def test_filtros_escolhem_as_particoes_carregadas(banco):
+    novo_arquivador(banco).arquivar(idade_dias=30)
+    sql = "SELECT substr(visto_em, 1, 7), origem, COUNT(*) FROM palavras_chave_historico WHERE arquivado = 1 GROUP BY 1, 2 ORDER BY 1, 2"
+
+    assert consultar_historico(banco, sql, desde="2024-02") == [
+        ("2024-02", "google", 3), ("2024-02", "reddit", 3), ("2024-03", "google", 3), ("2024-03", "reddit", 3)
+    ]
+    assert consultar_historico(banco, sql, ate="2024-01-31") == [("2024-01", "google", 3), ("2024-01", "reddit", 3)]
+    assert consultar_historico(banco, sql, desde="2024-02-01", ate="2024-02-28", origens=["reddit"]) == [("2024-02", "reddit", 3)]
+    # A tabela quente entra sempre, com qualquer filtro de partição
+    assert consultar_historico(banco, "SELECT COUNT(*) FROM palavras_chave_historico WHERE arquivado = 0", origens=["reddit"]) == [(2,)]
+
+def test_lote_que_falha_remove_as_partes_ja_gravadas(banco, monkeypatch):
+    gravar = arquivador._gravar_parte
+    chamadas = []
+
+    def gravar_e_falhar_na_segunda(caminho, registros, formato, nivel_zstd):
+        chamadas.append(caminho)
+        if len(chamadas) == 2:
+            raise OSError("disco cheio")
+        gravar(caminho, registros, formato, nivel_zstd)
+
+    monkeypatch.setattr(arquivador, "_gravar_parte", gravar_e_falhar_na_segunda)
+    # Um lote com as 6 linhas de janeiro: partes de google e reddit na mesma transação
+    instancia = Arquivador(banco, banco.parent / "arquivo", {"LOTE": 6, "PAUSA_MS": 0.0, "FORMATO": "ndjson"})
+    with pytest.raises(OSError):
+        instancia.arquivar(idade_dias=30)
+
+    assert chamadas[0].exists() is False
+    assert partes_em_disco(banco.parent / "arquivo") == []
+    assert manifesto(banco) == []
+    assert len(tabela_quente(banco)) == 20
+
+def test_limpeza_de_orfas_preserva_partes_registradas(banco):
+    instancia = novo_arquivador(banco)
+    instancia.arquivar(idade_dias=30)
+    diretorio = banco.parent / "arquivo"
+    registradas = manifesto(banco)
+
+    # Parte de um lote que gravou o arquivo e caiu antes do COMMIT
+    orfa = diretorio / "mes=2024-01" / "origem=google" / "parte-900-901.ndjson.gz"
+    orfa.write_bytes(b"")
+    conexao = sqlite3.connect(banco, isolation_level=None)
+    try:
+        assert instancia.limpar_orfaos(conexao) == 1
+    finally:
+        conexao.close()
+
+    assert not orfa.exists()
+    assert partes_em_disco(diretorio) == registradas
+    assert consultar_historico(banco, "SELECT COUNT(*) FROM palavras_chave_historico") == [(20,)]
@@ -0,0 +1,217 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from migrador import Migrador, Sql
+from integrator.esquema_palavras import COLUNAS, normalizar_palavra
+from integrator.fila_ingestao import FilaIngestao
+
+# Sem pausa entre lotes e com lotes pequenos: as duplicatas atravessam vários lotes
+CONFIG_TESTE = {"LOTE": 3, "PAUSA_MS": 0.0}
+
+# (id, palavra, tema, origem, escore, criado_em): 12 linhas, 2 palavras por chave normalizada
+LINHAS_LEGADAS = [
+    (1, "Melhor Celular", "celulares", "google", 0.1, "2024-01-01T00:00:00"),
+    (2, "SEO local", "seo", "reddit", 0.2, "2024-01-02T00:00:00"),
+    (3, "melhor celular", "celulares", "google", 0.3, "2024-01-03T00:00:00"),
+    (4, "seo  local!", "seo", "reddit", 0.4, "2024-01-04T00:00:00"),
+    (5, "Melhor celular", "celulares", "google", 0.5, "2024-01-05T00:00:00"),
+    (6, "SEO Local", "seo", "reddit", 0.6, "2024-01-06T00:00:00"),
+    (7, "melhor  celular", "celulares", "google", 0.7, "2024-01-07T00:00:00"),
+    (8, "seo local", "seo", "reddit", 0.8, "2024-01-08T00:00:00"),
+    (9, "MELHOR CELULAR", "celulares", "google", 0.9, "2024-01-09T00:00:00"),
+    (10, "Seo Local", "seo", "reddit", 0.95, "2024-01-10T00:00:00"),
+    (11, "melhor célular", "celulares", "google", 0.97, "2024-01-11T00:00:00"),
+    (12, "seo local.", "seo", "reddit", 0.99, "2024-01-12T00:00:00"),
+]
+
+def criar_banco_legado(caminho: Path):
+    """palavras_chave como o setup 1.0.0 criava, com duplicatas gravadas pelo INSERT antigo."""
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("""
+        CREATE TABLE palavras_chave (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origem TEXT NOT NULL,
+            tema TEXT NOT NULL,
+            palavra TEXT NOT NULL,
+            tags TEXT,
+            escore REAL,
+            validado INTEGER,
+            trace_id TEXT,
+            criado_em TEXT,
+            fonte TEXT DEFAULT '',
+            metodo_geracao TEXT DEFAULT ''
+        )
+    """)
+    conexao.executemany(
+        "INSERT INTO palavras_chave (id, palavra, tema, origem, escore, criado_em, tags, validado, trace_id, fonte) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)",
+        [(i, p, t, o, e, c, f'["tag{i}"]', f"trace-{i}", f"fonte-{i}") for i, p, t, o, e, c in LINHAS_LEGADAS]
+    )
+    conexao.commit()
+    conexao.close()
+
+def interromper_no_id(migrador: Migrador, id_falha: int):
+    """A normalização levanta na linha `id_falha`: o lote que a contém é desfeito, como numa queda do processo."""
+    palavra_falha = next(p for i, p, *_ in LINHAS_LEGADAS if i == id_falha)
+
+    def normalizar_ou_falhar(palavra):
+        if palavra == palavra_falha:
+            raise RuntimeError("processo interrompido")
+        return normalizar_palavra(palavra)
+
+    for migracao in migrador.migracoes:
+        if "normalizar_palavra" in migracao.funcoes:
+            migracao.funcoes["normalizar_palavra"] = (1, normalizar_ou_falhar)
+
+def linhas(caminho: Path, colunas: str = "*"):
+    conexao = sqlite3.connect(caminho)
+    conexao.row_factory = sqlite3.Row
+    try:
+        return [dict(linha) for linha in conexao.execute(f"SELECT {colunas} FROM palavras_chave ORDER BY id")]
+    finally:
+        conexao.close()
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = tmp_path / "global_keywords.db"
+    criar_banco_legado(caminho)
+    return caminho
+
+def test_fusao_mantem_a_linha_mais_antiga_com_os_dados_da_mais_recente(banco):
+    aplicadas = Migrador(banco, CONFIG_TESTE).migrar()
+
+    assert aplicadas == [m.versao for m in Migrador(banco).migracoes]
+    resultado = linhas(banco)
+    assert [r["id"] for r in resultado] == [1, 2]
+    celular, seo = resultado
+    # criado_em, grafia e fonte da primeira coleta; escore, tags, validação e visto_em da última
+    assert celular["palavra"] == "Melhor Celular" and celular["fonte"] == "fonte-1"
+    assert celular["criado_em"] == "2024-01-01T00:00:00"
+    assert celular["palavra_normalizada"] == "melhor celular"
+    assert celular["ocorrencias"] == 6
+    assert (celular["escore"], celular["tags"], celular["trace_id"]) == (0.97, '["tag11"]', "trace-11")
+    assert celular["visto_em"] == "2024-01-11T00:00:00"
+    assert (seo["ocorrencias"], seo["escore"], seo["visto_em"]) == (6, 0.99, "2024-01-12T00:00:00")
+
+    conexao = sqlite3.connect(banco)
+    try:
+        with pytest.raises(sqlite3.IntegrityError):
+            conexao.execute(
+                "INSERT INTO palavras_chave (tema, origem, palavra, palavra_normalizada) VALUES ('seo', 'reddit', 'SEO LOCAL', 'seo local')"
+            )
+        assert conexao.execute("SELECT COUNT(*) FROM schema_migracao_progresso").fetchone()[0] == 0
+    finally:
+        conexao.close()
+
+def test_migracao_interrompida_retoma_do_ultimo_lote_confirmado(banco):
+    migrador = Migrador(banco, CONFIG_TESTE)
+    interromper_no_id(migrador, 8)
+    with pytest.raises(sqlite3.OperationalError):
+        migrador.migrar()
+
+    # 0001 aplicada; 0002 parada no backfill (passo 3) com os lotes 1-3 e 4-6 confirmados e o 7-9 desfeito
+    em_andamento = {m["versao"]: m for m in Migrador(banco).status()}
+    assert em_andamento["0001"]["aplicada_em"] is not None
+    progresso = {p["passo"]: p for p in em_andamento["0002"]["em_andamento"]}
+    assert all(progresso[passo]["concluido"] for passo in (0, 1, 2))
+    assert progresso[3] == {"passo": 3, "ultimo_id": 6, "concluido": False}
+    assert [bool(r["palavra_normalizada"]) for r in linhas(banco, "palavra_normalizada")] == [True] * 6 + [False] * 6
+
+    aplicadas = Migrador(banco, CONFIG_TESTE).migrar()
+
+    assert aplicadas == ["0002", "0003", "0004"]
+    assert [(r["id"], r["ocorrencias"]) for r in linhas(banco)] == [(1, 6), (2, 6)]
+    assert all(m["em_andamento"] == [] and m["aplicada_em"] for m in Migrador(banco).status())
+
+def test_adicionar_coluna_ignora_colunas_de_bancos_ja_atualizados(tmp_path):
+    # Banco criado pelo setup 1.1.0: as colunas novas e a restrição UNIQUE já fazem parte da tabela
+    caminho = tmp_path / "global_keywords.db"
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("""
+        CREATE TABLE palavras_chave (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origem TEXT NOT NULL,
+            tema TEXT NOT NULL,
+            palavra TEXT NOT NULL,
+            palavra_normalizada TEXT NOT NULL DEFAULT '',
+            tags TEXT,
+            escore REAL,
+            validado INTEGER,
+            trace_id TEXT,
+            criado_em TEXT,
+            visto_em TEXT,
+            ocorrencias INTEGER NOT NULL DEFAULT 1,
+            fonte TEXT DEFAULT '',
+            metodo_geracao TEXT DEFAULT '',
+            UNIQUE (tema, origem, palavra_normalizada)
+        )
+    """)
+    conexao.execute(
+        "INSERT INTO palavras_chave (origem, tema, palavra, palavra_normalizada, criado_em, visto_em, ocorrencias) "
+        "VALUES ('google', 'seo', 'SEO local', 'seo local', '2024-01-01', '2024-02-01', 4)"
+    )
+    conexao.commit()
+    conexao.close()
+
+    Migrador(caminho, CONFIG_TESTE).migrar()
+
+    conexao = sqlite3.connect(caminho)
+    try:
+        colunas = [linha[1] for linha in conexao.execute("PRAGMA table_info(palavras_chave)")]
+        indices_unicos = conexao.execute(
+            "SELECT COUNT(*) FROM pragma_index_list('palavras_chave') WHERE \"unique\" = 1"
+        ).fetchone()[0]
+    finally:
+        conexao.close()
+    assert len(colunas) == len(set(colunas))
+    assert indices_unicos == 1  # a restrição da tabela; idx_palavras_unica não é criado de novo
+    assert linhas(caminho, "palavra_normalizada, visto_em, ocorrencias") == [
+        {"palavra_normalizada": "seo local", "visto_em": "2024-02-01", "ocorrencias": 4}
+    ]
+    assert Migrador(caminho, CONFIG_TESTE).migrar() == []
+
+def test_passo_sql_condicional_so_roda_quando_a_consulta_e_verdadeira(tmp_path):
+    conexao = sqlite3.connect(tmp_path / "teste.db")
+    conexao.execute("CREATE TABLE t (x INTEGER)")
+    Migrador._rodar_sql(conexao, Sql("INSERT INTO t VALUES (1)", se="SELECT COUNT(*) = 0 FROM t"))
+    Migrador._rodar_sql(conexao, Sql("INSERT INTO t VALUES (2)", se="SELECT COUNT(*) = 0 FROM t"))
+    assert conexao.execute("SELECT x FROM t").fetchall() == [(1,)]
+    conexao.close()
+
+def test_fila_de_ingestao_insere_enquanto_o_indice_unico_nao_existe(banco):
+    migrador = Migrador(banco, CONFIG_TESTE)
+    interromper_no_id(migrador, 8)
+    with pytest.raises(sqlite3.OperationalError):
+        migrador.migrar()
+
+    def linha(palavra, escore, visto_em):
+        valores = {
+            "tema": "seo", "origem": "reddit", "palavra": palavra, "palavra_normalizada": normalizar_palavra(palavra),
+            "tags": "[]", "escore": escore, "validado": 1, "trace_id": "fila", "criado_em": visto_em,
+            "visto_em": visto_em, "fonte": "fila", "metodo_geracao": "teste"
+        }
+        return tuple(valores[coluna] for coluna in COLUNAS)
+
+    fila = FilaIngestao({"DB_PATH": str(banco), "MAX_ESPERA_MS": 0.0})
+    try:
+        # Sem idx_palavras_unica o UPSERT não tem alvo: as duas linhas entram como duplicatas
+        assert fila.gravar([linha("seo local", 0.5, "2024-03-01T00:00:00")], timeout=10) == 1
+        assert fila.gravar([linha("SEO local", 0.6, "2024-03-02T00:00:00")], timeout=10) == 1
+        assert len(linhas(banco)) == 14
+
+        Migrador(banco, CONFIG_TESTE).migrar()
+        seo = linhas(banco)[1]
+        assert (seo["id"], seo["ocorrencias"], seo["escore"], seo["visto_em"]) == (2, 8, 0.6, "2024-03-02T00:00:00")
+
+        # Com o índice criado a mesma fila passa a usar o UPSERT
+        fila.gravar([linha("Seo Local", 0.7, "2024-03-03T00:00:00")], timeout=10)
+    finally:
+        fila.encerrar(timeout=10)
+    seo = linhas(banco)[1]
+    assert len(linhas(banco)) == 2
+    assert (seo["ocorrencias"], seo["escore"], seo["visto_em"]) == (9, 0.7, "2024-03-03T00:00:00")
@@ -0,0 +1,245 @@
+# benchmarks/bench_coletores.py
+# Benchmark ponta a ponta dos coletores contra respostas gravadas (cassete + servidor de replay)
+#
+# Gravar (acessa os sites reais uma vez):
+#   python src/4-colector/benchmarks/bench_coletores.py --gravar --cassete fixtures/coletores.json.gz --fontes reddit,youtube
+# Medir (offline):
+#   python src/4-colector/benchmarks/bench_coletores.py --cassete fixtures/coletores.json.gz --saida bench_coletores.json
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "utils"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus_sintetico import TEMAS  # noqa: E402
+from coleta import journal_execucao  # noqa: E402
+from coleta.cassete import Cassete, ServidorReplay, gravando  # noqa: E402
+from coleta.coletor_base import ColetorSincrono, ContextoExecucao, executar_coletor  # noqa: E402
+from coleta.exportador_streaming import ExportadorStreaming  # noqa: E402
+from coleta.fetch_engine import FetchEngine  # noqa: E402
+from coleta.registro_coletores import obter_coletor, listar_coletores  # noqa: E402
+from ml.nlp_registry import modelo_preguicoso, COMPONENTES_SO_NER  # noqa: E402
+
+# Replay sem limitação de taxa: o objetivo é medir parse → tags → escore → gravação
+CONFIG_ENGINE_REPLAY = {
+    "CONCORRENCIA_POR_HOST": 64,
+    "CACHE": {"ATIVO": False},
+    "RATE_LIMIT": {"TAXA_INICIAL": 1e6, "TAXA_MAXIMA": 1e6, "RAJADA": 1e6}
+}
+
+def obter_fonte(nome):
+    coletor = obter_coletor(nome)
+    if isinstance(coletor, ColetorSincrono):
+        # instagram/twitter/trends não passam pelo FetchEngine: não há como gravá-los nem isolá-los da rede
+        print(f"{nome}: fonte sem HTTP pelo FetchEngine, ignorada")
+        return None
+    return coletor
+
+# =========================
+# MEDIÇÃO POR ETAPA
+# =========================
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+def pico_rss_mb():
+    # ru_maxrss é em KB no Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+class Medidor:
+    def __init__(self):
+        self.duracoes = defaultdict(list)
+        self.palavras = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, etapa, duracao):
+        with self._lock:
+            self.duracoes[etapa].append(duracao)
+
+    def envolver(self, etapa, funcao):
+        def cronometrada(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self.registrar(etapa, time.perf_counter() - inicio)
+        return cronometrada
+
+    def relatorio(self):
+        return {
+            etapa: {
+                "chamadas": len(d),
+                "p50_ms": round(percentil(d, 50) * 1000, 3),
+                "p95_ms": round(percentil(d, 95) * 1000, 3),
+                "total_s": round(sum(d), 3)
+            }
+            for etapa, d in self.duracoes.items()
+        }
+
+class NlpCronometrado:
+    """Mede cada chamada de `nlp.pipe` (um lote por tema) consumindo o gerador inteiro."""
+
+    def __init__(self, nlp, medidor):
+        self.nlp = nlp
+        self.medidor = medidor
+
+    def pipe(self, textos, **kwargs):
+        inicio = time.perf_counter()
+        docs = list(self.nlp.pipe(textos, **kwargs))
+        self.medidor.registrar("tags", time.perf_counter() - inicio)
+        return iter(docs)
+
+    def __call__(self, texto):
+        return self.nlp(texto)
+
+def instrumentar(coletor, medidor, diretorio_saida):
+    coletar_original = coletor.coletar
+    filtrar_original = coletor.filtrar
+
+    async def coletar(tema, fetcher):
+        inicio = time.perf_counter()
+        try:
+            return await coletar_original(tema, fetcher)
+        finally:
+            medidor.registrar("coleta", time.perf_counter() - inicio)
+
+    def filtrar(tema, textos, contexto):
+        inicio = time.perf_counter()
+        palavras = filtrar_original(tema, textos, contexto)
+        medidor.registrar("filtragem", time.perf_counter() - inicio)
+        medidor.palavras += len(palavras)
+        return palavras
+
+    def exportador(trace_id):
+        return ExportadorStreaming(diretorio_saida, f"{coletor.nome}_{trace_id}")
+
+    coletor.coletar = coletar
+    coletor.filtrar = filtrar
+    coletor.exportador = exportador
+    return coletor
+
+def contexto_bench(fetcher, medidor, persistir):
+    if persistir:
+        base = ContextoExecucao.padrao()
+        obter_id_tema, salvar = base.obter_id_tema, base.salvar
+        fabrica_sessao = base.fabrica_sessao
+    else:
+        ids = itertools.count(1)
+        obter_id_tema = lambda **kwargs: next(ids)  # noqa: E731
+        salvar = lambda **kwargs: None  # noqa: E731
+        fabrica_sessao = lambda: type("SessaoNula", (), {"close": lambda self: None})()  # noqa: E731
+
+    from ml.relevance_predictor import prever_relevancia_lote
+    return ContextoExecucao(
+        fetcher=fetcher,
+        nlp=NlpCronometrado(modelo_preguicoso("pt_core_news_md", desativar=COMPONENTES_SO_NER), medidor),
+        fabrica_sessao=fabrica_sessao,
+        obter_id_tema=obter_id_tema,
+        prever=medidor.envolver("relevancia", prever_relevancia_lote),
+        salvar=medidor.envolver("persistencia", salvar)
+    )
+
+# =========================
+# MODOS
+# =========================
+def gravar(args, fontes, temas):
+    cassete = Cassete.carregar(args.cassete) if args.cassete.exists() else Cassete(args.cassete)
+    fetcher = FetchEngine({"CACHE": {"ATIVO": False}}).iniciar()
+    try:
+        with gravando(fetcher, cassete):
+            for nome in fontes:
+                coletor = obter_fonte(nome)
+                if coletor is None:
+                    continue
+
+                async def coletar_todos():
+                    return await asyncio.gather(*(coletor.coletar(t, fetcher) for t in temas))
+
+                resultados = fetcher.executar(coletar_todos())
+                cassete.registrar_temas(nome, temas)
+                print(f"{nome}: {len(temas)} temas, {sum(len(r) for r in resultados)} títulos gravados")
+    finally:
+        fetcher.encerrar()
+
+def medir(args, fontes, temas_padrao):
+    cassete = Cassete.carregar(args.cassete)
+    resultados = []
+    with ServidorReplay(cassete, latencia_ms=args.latencia_ms) as servidor, tempfile.TemporaryDirectory() as tmp:
+        journal_execucao.CONFIG_PADRAO["DIRETORIO"] = Path(tmp) / "journal"
+        fetcher = FetchEngine({**CONFIG_ENGINE_REPLAY, "URL_REPLAY": servidor.url_base}).iniciar()
+        modelo_preguicoso("pt_core_news_md", desativar=COMPONENTES_SO_NER)("aquecimento")
+        try:
+            for nome in fontes:
+                coletor = obter_fonte(nome)
+                if coletor is None:
+                    continue
+                temas = cassete.temas(nome) or temas_padrao
+                medidor = Medidor()
+                instrumentar(coletor, medidor, Path(tmp) / "saida")
+                contexto = contexto_bench(fetcher, medidor, args.persistir)
+                inicio = time.perf_counter()
+                resumo = executar_coletor(coletor, temas=temas, contexto=contexto)
+                duracao = time.perf_counter() - inicio
+                resultados.append({
+                    "fonte": nome,
+                    "temas": len(temas),
+                    "temas_processados": resumo.temas_processados,
+                    "falhas": len(resumo.falhos),
+                    "palavras": medidor.palavras,
+                    "duracao_s": round(duracao, 3),
+                    "temas_por_s": round(len(temas) / duracao, 2),
+                    "palavras_por_s": round(medidor.palavras / duracao, 2),
+                    "etapas": medidor.relatorio(),
+                    "pico_rss_mb": pico_rss_mb()
+                })
+        finally:
+            fetcher.encerrar()
+    return {"respostas_servidas": servidor.atendidas, "respostas_ausentes": len(servidor.faltas), "resultados": resultados}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta dos coletores (offline)")
+    parser.add_argument("--cassete", type=Path, required=True)
+    parser.add_argument("--fontes", help="Lista separada por vírgula (padrão: todas as registradas)")
+    parser.add_argument("--temas", help="Arquivo JSON com temas (padrão: temas gravados no cassete)")
+    parser.add_argument("--gravar", action="store_true", help="Grava o cassete acessando os sites reais")
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="Latência simulada no servidor de replay")
+    parser.add_argument("--persistir", action="store_true", help="Usa o banco real em vez de um destino nulo")
+    parser.add_argument("--saida", type=Path)
+    args = parser.parse_args()
+
+    fontes = args.fontes.split(",") if args.fontes else listar_coletores()
+    temas = json.loads(args.temas.read_text(encoding="utf-8")) if args.temas else TEMAS
+
+    if args.gravar:
+        gravar(args, fontes, temas)
+        return
+
+    relatorio = medir(args, fontes, temas)
+    print(f"{'fonte':<22} {'temas/s':>10} {'palavras/s':>12} {'coleta p50/p95 ms':>20} {'relevância p50/p95 ms':>24} {'RSS MB':>8}")
+    for r in relatorio["resultados"]:
+        coleta = r["etapas"].get("coleta", {})
+        relevancia = r["etapas"].get("relevancia", {})
+        print(
+            f"{r['fonte']:<22} {r['temas_por_s']:>10} {r['palavras_por_s']:>12} "
+            f"{str(coleta.get('p50_ms')) + '/' + str(coleta.get('p95_ms')):>20} "
+            f"{str(relevancia.get('p50_ms')) + '/' + str(relevancia.get('p95_ms')):>24} {r['pico_rss_mb']:>8}"
+        )
+    if args.saida:
+        args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_floresta.py
+# Benchmark do modelo de relevância: pickle sklearn (joblib) vs. floresta compilada em arrays numpy
+#
+# Uso: python src/4-colector/benchmarks/bench_floresta.py --arvores 200 --saida bench_floresta.json
+#      python src/4-colector/benchmarks/bench_floresta.py --modelo src/ml/modelo_relevancia.pkl
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "utils"))
+
+from ml.feature_engineering import FEATURES_NUMERICAS, DIM_EMBEDDING  # noqa: E402
+from ml.floresta_compilada import FlorestaCompilada, exportar_floresta  # noqa: E402
+
+N_COLUNAS = len(FEATURES_NUMERICAS) + DIM_EMBEDDING
+
+def dados_sinteticos(quantidade: int, semente: int = 42):
+    """Matriz no formato das features (escalares inteiros + embedding) com rótulo dependente de poucas colunas."""
+    rng = np.random.default_rng(semente)
+    X = np.empty((quantidade, N_COLUNAS), dtype=np.float32)
+    X[:, :len(FEATURES_NUMERICAS)] = rng.integers(0, 12, size=(quantidade, len(FEATURES_NUMERICAS)))
+    X[:, len(FEATURES_NUMERICAS):] = rng.normal(size=(quantidade, DIM_EMBEDDING))
+    y = ((X[:, 0] > 5) ^ (X[:, 10] * X[:, 42] > 0.3) | (rng.random(quantidade) < 0.1)).astype(np.int64)
+    return X, y
+
+def treinar_sintetico(arvores: int, amostras: int):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = dados_sinteticos(amostras)
+    # max_depth=None, como o melhor caso da grade de train_relevance_model costuma escolher
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("clf", RandomForestClassifier(n_estimators=arvores, random_state=42, n_jobs=-1))
+    ]).fit(X, y)
+
+def tamanho_mb(caminho: Path) -> float:
+    arquivos = caminho.rglob("*") if caminho.is_dir() else [caminho]
+    return round(sum(f.stat().st_size for f in arquivos if f.is_file()) / 2**20, 2)
+
+def medir_carga(carregar, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        carregar()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    modelo = carregar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return modelo, {"carga_s_min": round(min(tempos), 4), "memoria_pico_mb": round(pico / 2**20, 2)}
+
+def medir_predicao(modelo, X: np.ndarray, batch: int, minimo_s: float = 1.0):
+    predicoes, inicio = 0, time.perf_counter()
+    while time.perf_counter() - inicio < minimo_s:
+        for i in range(0, len(X), batch):
+            modelo.predict_proba(X[i:i + batch])
+            predicoes += len(X[i:i + batch])
+            if time.perf_counter() - inicio >= minimo_s:
+                break
+    return round(predicoes / (time.perf_counter() - inicio), 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga, memória e predições/s: sklearn vs. floresta compilada")
+    parser.add_argument("--modelo", type=Path, help="Pickle treinado (padrão: floresta sintética)")
+    parser.add_argument("--arvores", type=int, default=200)
+    parser.add_argument("--amostras-treino", type=int, default=5000)
+    parser.add_argument("--batches", default="1,32,1024")
+    parser.add_argument("--repeticoes-carga", type=int, default=3)
+    parser.add_argument("--saida", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho_pickle = args.modelo
+        if caminho_pickle is None:
+            caminho_pickle = Path(tmp) / "modelo.pkl"
+            joblib.dump(treinar_sintetico(args.arvores, args.amostras_treino), caminho_pickle)
+        caminho_compilado = Path(tmp) / "compilado"
+        exportar_floresta(joblib.load(caminho_pickle), caminho_compilado)
+
+        sklearn, carga_sklearn = medir_carga(lambda: joblib.load(caminho_pickle), args.repeticoes_carga)
+        compilada, carga_compilada = medir_carga(lambda: FlorestaCompilada.carregar(caminho_compilado), args.repeticoes_carga)
+        _, carga_mmap = medir_carga(lambda: FlorestaCompilada.carregar(caminho_compilado, mmap_mode="r"), args.repeticoes_carga)
+
+        X, _ = dados_sinteticos(4096, semente=7)
+        diferenca = float(np.abs(sklearn.predict_proba(X)[:, 1] - compilada.predict_proba(X)[:, 1]).max())
+
+        resultados = {
+            "sklearn": {"disco_mb": tamanho_mb(caminho_pickle), **carga_sklearn},
+            "compilada": {"disco_mb": tamanho_mb(caminho_compilado), **carga_compilada},
+            "compilada_mmap": carga_mmap
+        }
+        for batch in (int(b) for b in args.batches.split(",")):
+            resultados["sklearn"][f"predicoes_por_s_batch_{batch}"] = medir_predicao(sklearn, X, batch)
+            resultados["compilada"][f"predicoes_por_s_batch_{batch}"] = medir_predicao(compilada, X, batch)
+
+    relatorio = {"floresta": compilada.meta, "diferenca_maxima_escore": diferenca, "resultados": resultados}
+    for nome, r in resultados.items():
+        print(f"{nome:<16} " + " | ".join(f"{k}={v}" for k, v in r.items()))
+    print(f"Diferença máxima de escore: {diferenca:.2e}")
+    if args.saida:
+        args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
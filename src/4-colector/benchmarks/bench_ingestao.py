@@ -0,0 +1,120 @@
+# benchmarks/bench_ingestao.py
+# Benchmark da ingestão em palavras_chave: commit por linha vs. fila com escritor único (executemany)
+#
+# Uso: python src/4-colector/benchmarks/bench_ingestao.py --produtores 16 --linhas-por-pedido 50 --saida bench_ingestao.json
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "3-data base" / "integrator"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "3-data base"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus_sintetico import gerar_textos  # noqa: E402
+from esquema_palavras import UPSERT_SQL, normalizar_palavra  # noqa: E402
+from fila_ingestao import FilaIngestao  # noqa: E402
+from migrador import migrar  # noqa: E402
+
+def criar_banco(caminho: Path):
+    migrar(caminho)
+
+def gerar_pedidos(produtores: int, pedidos: int, linhas: int):
+    textos = gerar_textos(linhas * 10)
+    agora = datetime.utcnow().isoformat()
+    return [
+        [
+            [
+                (p * pedidos + i, "bench", texto, normalizar_palavra(texto), "", 0.5, 1, "bench", agora, agora, "", "semantico")
+                for texto in (textos[(i * linhas + j) % len(textos)] for j in range(linhas))
+            ]
+            for i in range(pedidos)
+        ]
+        for p in range(produtores)
+    ]
+
+def executar_produtores(pedidos_por_produtor, gravar):
+    erros = []
+    def produtor(pedidos):
+        try:
+            for linhas in pedidos:
+                gravar(linhas)
+        except Exception as e:
+            erros.append(e)
+    threads = [threading.Thread(target=produtor, args=(p,)) for p in pedidos_por_produtor]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if erros:
+        raise erros[0]
+    return time.perf_counter() - inicio
+
+def medir_por_linha(caminho: Path, pedidos_por_produtor):
+    """Comportamento anterior: cada produtor com sua conexão, um UPSERT e um commit por palavra."""
+    local = threading.local()
+    def gravar(linhas):
+        if not hasattr(local, "conexao"):
+            local.conexao = sqlite3.connect(caminho, timeout=60)
+        for linha in linhas:
+            local.conexao.execute(UPSERT_SQL, linha)
+            local.conexao.commit()
+    return executar_produtores(pedidos_por_produtor, gravar)
+
+def medir_fila(caminho: Path, pedidos_por_produtor, max_linhas: int, max_espera_ms: float):
+    fila = FilaIngestao({"DB_PATH": str(caminho), "MAX_LINHAS": max_linhas, "MAX_ESPERA_MS": max_espera_ms})
+    try:
+        return executar_produtores(pedidos_por_produtor, fila.gravar)
+    finally:
+        fila.encerrar()
+
+def contar(caminho: Path) -> int:
+    # Soma de ocorrências = linhas enviadas, inclusive as recoletas que viraram UPDATE
+    with sqlite3.connect(caminho) as conexao:
+        return conexao.execute("SELECT COALESCE(SUM(ocorrencias), 0) FROM palavras_chave").fetchone()[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Linhas/s gravadas em palavras_chave com vários produtores")
+    parser.add_argument("--produtores", type=int, default=16)
+    parser.add_argument("--pedidos", type=int, default=200, help="Pedidos (temas) por produtor")
+    parser.add_argument("--linhas-por-pedido", type=int, default=50)
+    parser.add_argument("--max-linhas", type=int, default=5000)
+    parser.add_argument("--max-espera-ms", type=float, default=50.0)
+    parser.add_argument("--pedidos-por-linha", type=int, default=5, help="Pedidos por produtor no cenário por linha (é lento)")
+    parser.add_argument("--saida", type=Path)
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome, pedidos, medir in (
+            ("UPSERT + commit por linha", args.pedidos_por_linha, lambda c, p: medir_por_linha(c, p)),
+            ("fila com escritor único", args.pedidos, lambda c, p: medir_fila(c, p, args.max_linhas, args.max_espera_ms))
+        ):
+            caminho = Path(tmp) / f"bench_{len(resultados)}.db"
+            criar_banco(caminho)
+            pedidos_por_produtor = gerar_pedidos(args.produtores, pedidos, args.linhas_por_pedido)
+            duracao = medir(caminho, pedidos_por_produtor)
+            linhas = contar(caminho)
+            resultados.append({
+                "cenario": nome,
+                "produtores": args.produtores,
+                "linhas": linhas,
+                "duracao_s": round(duracao, 4),
+                "linhas_por_s": round(linhas / duracao, 1)
+            })
+
+    relatorio = {"linhas_por_pedido": args.linhas_por_pedido, "resultados": resultados}
+    for r in resultados:
+        print(f"{r['cenario']:<30} {r['linhas']:>8} linhas {r['linhas_por_s']:>12} linhas/s")
+    if args.saida:
+        args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
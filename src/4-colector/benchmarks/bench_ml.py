@@ -0,0 +1,169 @@
+# benchmarks/bench_ml.py
+# Benchmark do caminho quente de ML: extração de features, predição de relevância e carga do modelo
+#
+# Uso: python src/4-colector/benchmarks/bench_ml.py --saida bench_ml.json
+#      python src/4-colector/benchmarks/bench_ml.py --modelo src/ml/modelo_relevancia.pkl --compilado src/ml/modelo_relevancia_compilado
+#      python src/4-colector/benchmarks/bench_ml.py --comparar bench_ml_main.json --tolerancia 0.2   (CI: sai com código 1 em regressão)
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "utils"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_floresta import treinar_sintetico  # noqa: E402
+from corpus_sintetico import gerar_amostras  # noqa: E402
+from ml.feature_engineering import extrair_features_lote, nlp  # noqa: E402
+from ml.floresta_compilada import exportar_floresta  # noqa: E402
+from ml.nlp_registry import relatorio_modelos  # noqa: E402
+from ml.relevance_predictor import RelevancePredictor  # noqa: E402
+
+def pico_rss_mb() -> float:
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (2**20 if sys.platform == "darwin" else 1024), 1)
+
+def commit_atual() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+def medir_vazao(funcao, amostras, batch: int, minimo_s: float) -> dict:
+    """Chama `funcao` em lotes de `batch` até `minimo_s` segundos; latência medida por chamada."""
+    latencias, itens = [], 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < minimo_s:
+        for i in range(0, len(amostras), batch):
+            lote = amostras[i:i + batch]
+            t0 = time.perf_counter()
+            funcao(lote)
+            latencias.append(time.perf_counter() - t0)
+            itens += len(lote)
+            if time.perf_counter() - inicio >= minimo_s:
+                break
+    duracao = time.perf_counter() - inicio
+    latencias_ms = np.asarray(latencias) * 1000
+    return {
+        "batch": batch,
+        "chamadas": len(latencias),
+        "itens_por_s": round(itens / duracao, 1),
+        "p50_ms": round(float(np.percentile(latencias_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencias_ms, 99)), 3)
+    }
+
+def medir_carga(criar, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        criar()
+        tempos.append(time.perf_counter() - inicio)
+    return round(min(tempos), 4)
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> list:
+    """Regressões de vazão (itens_por_s) acima da tolerância, por etapa e batch."""
+    regressoes = []
+    for etapa in ("features", "predicao"):
+        base_por_batch = {r["batch"]: r for r in base.get(etapa, [])}
+        for r in atual[etapa]:
+            anterior = base_por_batch.get(r["batch"])
+            if anterior and r["itens_por_s"] < anterior["itens_por_s"] * (1 - tolerancia):
+                queda = 1 - r["itens_por_s"] / anterior["itens_por_s"]
+                regressoes.append(f"{etapa} batch={r['batch']}: {anterior['itens_por_s']} -> {r['itens_por_s']} itens/s (-{queda:.0%})")
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Features/s, predições/s, latência p50/p99, carga do modelo e pico de RSS")
+    parser.add_argument("--quantidade", type=int, default=2048, help="Amostras do corpus sintético")
+    parser.add_argument("--batches", default="1,32,1024")
+    parser.add_argument("--minimo-s", type=float, default=2.0, help="Duração mínima de cada medição")
+    parser.add_argument("--modelo", type=Path, help="Pickle treinado (padrão: floresta sintética de --arvores árvores)")
+    parser.add_argument("--compilado", type=Path, help="Diretório da floresta compilada (padrão: exportada do pickle)")
+    parser.add_argument("--arvores", type=int, default=100)
+    parser.add_argument("--repeticoes-carga", type=int, default=3)
+    parser.add_argument("--saida", type=Path)
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Queda de vazão aceita antes de falhar (0.2 = 20%%)")
+    args = parser.parse_args()
+    for nome in ("relevance_predictor", "floresta_compilada", "nlp_registry"):
+        logging.getLogger(nome).setLevel(logging.WARNING)
+
+    amostras = gerar_amostras(args.quantidade)
+    batches = [int(b) for b in args.batches.split(",")]
+    rss_inicial = pico_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho_pickle = args.modelo
+        if caminho_pickle is None:
+            caminho_pickle = Path(tmp) / "modelo.pkl"
+            joblib.dump(treinar_sintetico(args.arvores, 5000), caminho_pickle)
+        caminho_compilado = args.compilado
+        if caminho_compilado is None:
+            caminho_compilado = Path(tmp) / "compilado"
+            exportar_floresta(joblib.load(caminho_pickle), caminho_compilado)
+
+        # ---- Carga ----
+        inicio = time.perf_counter()
+        nlp("aquecimento")
+        carga = {
+            "spacy_s": round(time.perf_counter() - inicio, 4),
+            "pickle_s": medir_carga(lambda: RelevancePredictor(str(caminho_pickle), None, mmap_mode=None), args.repeticoes_carga),
+            "compilado_s": medir_carga(lambda: RelevancePredictor(str(caminho_pickle), str(caminho_compilado), mmap_mode=None), args.repeticoes_carga),
+            "compilado_mmap_s": medir_carga(lambda: RelevancePredictor(str(caminho_pickle), str(caminho_compilado), mmap_mode="r"), args.repeticoes_carga)
+        }
+        preditor = RelevancePredictor(str(caminho_pickle), str(caminho_compilado), intervalo_recarga=0)
+        rss_apos_carga = pico_rss_mb()
+
+        # ---- Vazão e latência ----
+        features = [medir_vazao(extrair_features_lote, amostras, b, args.minimo_s) for b in batches]
+        predicao = [medir_vazao(preditor.prever_lote, amostras, b, args.minimo_s) for b in batches]
+
+    relatorio = {
+        "data": datetime.now().isoformat(),
+        "commit": commit_atual(),
+        "ambiente": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+            "maquina": platform.machine()
+        },
+        "amostras": len(amostras),
+        "modelo": type(preditor.modelo).__name__,
+        "spacy": relatorio_modelos(),
+        "carga": carga,
+        "features": features,
+        "predicao": predicao,
+        "rss_pico_mb": {"inicial": rss_inicial, "apos_carga": rss_apos_carga, "final": pico_rss_mb()}
+    }
+
+    print("Carga: " + " | ".join(f"{k}={v}" for k, v in carga.items()))
+    for etapa in ("features", "predicao"):
+        for r in relatorio[etapa]:
+            print(f"{etapa:<9} batch={r['batch']:<5} {r['itens_por_s']:>10} itens/s | p50={r['p50_ms']} ms | p99={r['p99_ms']} ms")
+    print(f"Pico de RSS: {relatorio['rss_pico_mb']} MB")
+    if args.saida:
+        args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.comparar:
+        regressoes = comparar(relatorio, json.loads(args.comparar.read_text(encoding="utf-8")), args.tolerancia)
+        for r in regressoes:
+            print(f"❌ Regressão: {r}")
+        if regressoes:
+            sys.exit(1)
+        print(f"✅ Sem regressões acima de {args.tolerancia:.0%} em relação a {args.comparar}")
+
+if __name__ == "__main__":
+    main()
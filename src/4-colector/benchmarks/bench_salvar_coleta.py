@@ -0,0 +1,88 @@
+# benchmarks/bench_salvar_coleta.py
+# Benchmark da gravação: salvar_coleta repontuando as palavras vs. reaproveitando tags/escore do coletor
+#
+# Uso: python src/4-colector/benchmarks/bench_salvar_coleta.py --temas 20 --palavras-por-tema 50 --saida bench_salvar.json
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "utils"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus_sintetico import gerar_textos  # noqa: E402
+from ml.nlp_registry import obter_modelo, COMPONENTES_SO_NER  # noqa: E402
+from ml.relevance_predictor import prever_relevancia_lote, PalavraAvaliada  # noqa: E402
+from ml.tagging import gerar_tags_lote  # noqa: E402
+from utils.persistence.coletor_integrator import salvar_coleta  # noqa: E402
+
+ORIGEM = "bench"
+
+def filtrar_como_coletor(palavras, nlp):
+    """Reproduz ColetorBase.filtrar sem o corte por escore: é o trabalho que o coletor já fez."""
+    tags_por_palavra = gerar_tags_lote(palavras, nlp=nlp)
+    validos, escores = prever_relevancia_lote([(p, "bench", ORIGEM, t) for p, t in zip(palavras, tags_por_palavra)])
+    return [
+        PalavraAvaliada(palavra=p, tags=t, escore=e, validado=v)
+        for p, t, v, e in zip(palavras, tags_por_palavra, validos.tolist(), escores.tolist())
+    ]
+
+def medir(nome, lotes, dry_run):
+    cpu_inicio, inicio = time.process_time(), time.perf_counter()
+    total = 0
+    for id_tema, palavras in enumerate(lotes, start=1):
+        relatorio = salvar_coleta(palavras, id_tema=id_tema, origem=ORIGEM, dry_run=dry_run, verbose=False)
+        total += relatorio["quantidade_processada"]
+    cpu, duracao = time.process_time() - cpu_inicio, time.perf_counter() - inicio
+    return {
+        "cenario": nome,
+        "palavras": total,
+        "cpu_s": round(cpu, 4),
+        "duracao_s": round(duracao, 4),
+        "cpu_ms_por_palavra": round(cpu * 1000 / total, 4),
+        "palavras_por_s": round(total / duracao, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU por palavra gravada, com e sem pontuação do coletor")
+    parser.add_argument("--temas", type=int, default=20)
+    parser.add_argument("--palavras-por-tema", type=int, default=50)
+    parser.add_argument("--modelo", default="pt_core_news_md")
+    parser.add_argument("--persistir", action="store_true", help="Grava no banco/Redis (padrão: dry_run)")
+    parser.add_argument("--saida", type=Path)
+    args = parser.parse_args()
+    logging.getLogger("relevance_predictor").setLevel(logging.WARNING)
+
+    nlp = obter_modelo(args.modelo, COMPONENTES_SO_NER)
+    textos = gerar_textos(args.temas * args.palavras_por_tema)
+    lotes = [textos[i:i + args.palavras_por_tema] for i in range(0, len(textos), args.palavras_por_tema)]
+
+    # Aquecimento: modelo spaCy e preditor carregados antes de medir
+    salvar_coleta(["aquecimento"], id_tema=0, origem=ORIGEM, dry_run=True, verbose=False)
+    avaliadas = [filtrar_como_coletor(lote, nlp) for lote in lotes]
+    dry_run = not args.persistir
+
+    repontuando = medir("strings (salvar_coleta repontua)", lotes, dry_run)
+    reaproveitando = medir("PalavraAvaliada (tags/escore do coletor)", avaliadas, dry_run)
+    economia_ms = repontuando["cpu_ms_por_palavra"] - reaproveitando["cpu_ms_por_palavra"]
+    relatorio = {
+        "temas": args.temas,
+        "palavras_por_tema": args.palavras_por_tema,
+        "dry_run": dry_run,
+        "resultados": [repontuando, reaproveitando],
+        "cpu_ms_economizado_por_palavra": round(economia_ms, 4),
+        "economia_pct": round(100 * economia_ms / repontuando["cpu_ms_por_palavra"], 1)
+    }
+
+    for r in relatorio["resultados"]:
+        print(f"{r['cenario']:<45} {r['cpu_ms_por_palavra']:>10} ms CPU/palavra {r['palavras_por_s']:>10} palavras/s")
+    print(f"Economia: {relatorio['cpu_ms_economizado_por_palavra']} ms CPU/palavra ({relatorio['economia_pct']}%)")
+    if args.saida:
+        args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
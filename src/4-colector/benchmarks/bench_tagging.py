@@ -0,0 +1,66 @@
+# benchmarks/bench_tagging.py
+# Benchmark de geração de tags: nlp(texto) por título vs. gerar_tags_lote (nlp.pipe)
+#
+# Uso: python src/4-colector/benchmarks/bench_tagging.py --quantidade 2000 --saida bench_tagging.json
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "utils"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus_sintetico import gerar_textos  # noqa: E402
+from ml.nlp_registry import obter_modelo, relatorio_modelos, COMPONENTES_SO_NER  # noqa: E402
+from ml.tagging import gerar_tags_lote  # noqa: E402
+
+def medir(nome, funcao, textos):
+    inicio = time.perf_counter()
+    tags = funcao(textos)
+    duracao = time.perf_counter() - inicio
+    total_tags = sum(len(t) for t in tags)
+    return {
+        "cenario": nome,
+        "textos": len(textos),
+        "tags": total_tags,
+        "duracao_s": round(duracao, 4),
+        "textos_por_s": round(len(textos) / duracao, 1),
+        "tags_por_s": round(total_tags / duracao, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tagging NER em lote")
+    parser.add_argument("--quantidade", type=int, default=2000)
+    parser.add_argument("--modelo", default="pt_core_news_md")
+    parser.add_argument("--batch-sizes", default="32,256,1024")
+    parser.add_argument("--n-process", default="1,2")
+    parser.add_argument("--saida", type=Path)
+    args = parser.parse_args()
+
+    textos = gerar_textos(args.quantidade)
+    nlp = obter_modelo(args.modelo, COMPONENTES_SO_NER)
+    nlp("aquecimento")
+
+    resultados = [medir(
+        "nlp(texto) por título",
+        lambda ts: [list({e.text.lower() for e in nlp(t).ents}) for t in ts],
+        textos
+    )]
+    for n_process in (int(n) for n in args.n_process.split(",")):
+        for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+            resultados.append(medir(
+                f"nlp.pipe batch_size={batch_size} n_process={n_process}",
+                lambda ts: gerar_tags_lote(ts, nlp=nlp, batch_size=batch_size, n_process=n_process),
+                textos
+            ))
+
+    relatorio = {"modelo": relatorio_modelos(), "resultados": resultados}
+    for r in resultados:
+        print(f"{r['cenario']:<45} {r['textos_por_s']:>10} textos/s {r['tags_por_s']:>10} tags/s")
+    if args.saida:
+        args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
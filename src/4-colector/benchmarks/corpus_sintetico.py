@@ -0,0 +1,43 @@
+# benchmarks/corpus_sintetico.py
+# Corpus sintético de títulos/palavras-chave em português para benchmarks
+
+import random
+from typing import List, Tuple
+
+TEMAS = [
+    "marketing digital", "funil de vendas", "inteligência artificial", "receitas fitness",
+    "investimentos", "viagem para Portugal", "home office", "energia solar",
+    "educação financeira", "cuidados com pets", "Python para iniciantes", "SEO local"
+]
+
+MODELOS = [
+    "Como começar com {tema} em {ano}",
+    "Melhores dicas de {tema} para iniciantes",
+    "{tema}: guia completo passo a passo",
+    "O que ninguém te conta sobre {tema} no Brasil",
+    "Top 10 ferramentas de {tema} mais barato",
+    "Vale a pena investir em {tema} em São Paulo?",
+    "Tendências de {tema} para {ano} segundo o Google",
+    "{tema} em promoção na Amazon",
+    "Por que {tema} é funcional para pequenas empresas",
+    "Curso de {tema} da Universidade de Lisboa"
+]
+
+ORIGENS = ["reddit", "youtube", "quora", "google_autocomplete", "amazon", "medium"]
+
+def gerar_textos(quantidade: int, semente: int = 42) -> List[str]:
+    rng = random.Random(semente)
+    return [
+        rng.choice(MODELOS).format(tema=rng.choice(TEMAS), ano=rng.choice([2023, 2024, 2025]))
+        for _ in range(quantidade)
+    ]
+
+def gerar_amostras(quantidade: int, semente: int = 42) -> List[Tuple[str, str, str, List[str]]]:
+    """Tuplas (texto, tema, origem, tags) no formato consumido pelo RelevancePredictor."""
+    rng = random.Random(semente)
+    amostras = []
+    for texto in gerar_textos(quantidade, semente):
+        tema = next((t for t in TEMAS if t in texto), rng.choice(TEMAS))
+        tags = [tema.lower()] if rng.random() < 0.5 else []
+        amostras.append((texto, tema, rng.choice(ORIGENS), tags))
+    return amostras
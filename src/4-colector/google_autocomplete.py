@@ -1,16 +1,15 @@
-import uuid
-import json
-import time
+import asyncio
 import logging
-import csv
 import requests
 from pathlib import Path
+from functools import partial
 from urllib.parse import quote
-from sqlalchemy.orm import sessionmaker
-from database_connection import engine
-from theme_manager.utils.lookup_tema_id import get_id_tema
-from utils.persistence.coletor_integrator import salvar_coleta
 from ml.autocomplete_ranker import ranquear_sugestoes
+from coleta.fetch_engine import obter_engine
+from coleta.expansao_autocomplete import expandir_tema
+from coleta.exportador_streaming import ExportadorStreaming
+from coleta.coletor_base import ColetorBase, FalhaColeta, executar_coletor
+from coleta.registro_coletores import registrar_coletor
 
 # =========================
 # CONFIGURAÇÕES GLOBAIS
@@ -22,13 +21,18 @@ CONFIG = {
     "METODO": "autocomplete+ml",
     "ESCOREG_MINIMO": 0.5,
     "DRY_RUN": False,
-    "CHECKPOINT_PATH": Path("checkpoints/google_autocomplete_falhos.json"),
     "EXPORTAR_JSON": True,
-    "EXPORTAR_NDJSON": True,
     "EXPORTAR_CSV": True,
     "WEBHOOK_URL": "",
     "MAX_RETRIES": 3,
-    "BACKOFF_BASE": 2
+    "BACKOFF_BASE": 2,
+    "MODO": "simples",  # "simples" (uma consulta por tema) ou "expansao" (alphabet soup recursivo)
+    "EXPANSAO": {
+        "PROFUNDIDADE": 1,  # com 150 requisições o nível 1 já esgota o orçamento (ver expansao_autocomplete)
+        "ORCAMENTO_POR_TEMA": 150,
+        "CONCORRENCIA": 16,
+        "TEMAS_EM_VOO": 8
+    }
 }
 
 # =========================
@@ -51,107 +55,85 @@ def notificar_webhook(mensagem, trace_id):
 # =========================
 # FUNÇÃO DE COLETA COM RETRY E BACKOFF
 # =========================
-def buscar_sugestoes(termo):
+async def buscar_sugestoes_async(termo, fetcher=None, orcamento=None):
+    """
+    Sugestões do endpoint para `termo`. Lista vazia só quando ele respondeu 200
+    sem sugestões; bloqueio, erro HTTP ou de rede em todas as tentativas levanta
+    FalhaColeta. Com `orcamento` (expansão), cada tentativa enviada consome uma
+    requisição e a busca desiste quando ele acaba.
+    """
+    fetcher = fetcher or obter_engine()
     url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={quote(termo)}"
+    ultimo_erro = None
     for tentativa in range(CONFIG["MAX_RETRIES"]):
+        if orcamento is not None and not orcamento.consumir():
+            raise FalhaColeta(f"[{termo}] Orçamento de requisições do tema esgotado (último erro: {ultimo_erro})")
         try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
+            response = await fetcher.buscar(url)
+            if response.status == 200:
                 return response.json()[1]
-            elif response.status_code in (403, 429):
-                logger.warning(f"[{termo}] Bloqueio detectado: {response.status_code}. Cooldown...")
-                time.sleep(60 * (tentativa + 1))
+            ultimo_erro = f"HTTP {response.status}"
+            if response.status in (403, 429):
+                # O limitador do engine já colocou o domínio em cooldown (Retry-After/AIMD);
+                # a próxima tentativa espera na fila do domínio sem travar os demais hosts.
+                logger.warning(f"[{termo}] Bloqueio detectado: {response.status}. Domínio em cooldown...")
+                continue
             else:
-                logger.warning(f"[{termo}] Erro HTTP {response.status_code}")
+                logger.warning(f"[{termo}] Erro HTTP {response.status}")
         except Exception as e:
+            ultimo_erro = e
             logger.error(f"[{termo}] Erro de rede: {e}")
         backoff = CONFIG["BACKOFF_BASE"] ** tentativa
-        time.sleep(backoff)
-    return []
+        await asyncio.sleep(backoff)
+    raise FalhaColeta(f"[{termo}] Sem resposta válida após {CONFIG['MAX_RETRIES']} tentativas: {ultimo_erro}")
+
+def buscar_sugestoes(termo):
+    return obter_engine().executar(buscar_sugestoes_async(termo))
 
 # =========================
-# EXECUÇÃO PRINCIPAL
+# EXPANSÃO RECURSIVA (ALPHABET SOUP)
 # =========================
-def executar_autocomplete(temas):
-    trace_id = str(uuid.uuid4())
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    resultados_gerais = {}
-    falhos = []
+async def expandir_sugestoes_async(tema, fetcher=None):
+    fetcher = fetcher or obter_engine()
+    resultado = await expandir_tema(tema, partial(buscar_sugestoes_async, fetcher=fetcher), CONFIG["EXPANSAO"])
+    return resultado.sugestoes
 
-    output_base = f"output/autocomplete_{trace_id}"
-    json_path = Path(f"{output_base}.json")
-    ndjson_path = Path(f"{output_base}.ndjson")
-    csv_path = Path(f"{output_base}.csv")
+# =========================
+# EXECUÇÃO PRINCIPAL
+# =========================
+@registrar_coletor
+class ColetorGoogleAutocomplete(ColetorBase):
+    nome = CONFIG["ORIGEM"]
+    config = CONFIG
 
-    for tema in temas:
-        try:
-            id_tema = get_id_tema(
-                session=session,
-                nome_nicho=CONFIG["NOME_NICHO"],
-                nome_tema=tema,
-                criar_se_nao_existir=True,
-                trace_id=trace_id
-            )
-        except ValueError as e:
-            logger.error(f"[{trace_id}] Erro ao obter tema '{tema}': {e}")
-            falhos.append(tema)
-            continue
+    def __init__(self, modo=None):
+        self.modo = modo or CONFIG["MODO"]
+        self.janela = CONFIG["EXPANSAO"]["TEMAS_EM_VOO"] if self.modo == "expansao" else None
 
-        sugestoes = buscar_sugestoes(tema)
-        if not sugestoes:
-            falhos.append(tema)
-            continue
+    async def coletar(self, tema, fetcher):
+        if self.modo == "expansao":
+            return await expandir_sugestoes_async(tema, fetcher)
+        return await buscar_sugestoes_async(tema, fetcher)
 
+    def filtrar(self, tema, sugestoes, contexto):
         ranqueadas = ranquear_sugestoes(sugestoes, tema, CONFIG["ORIGEM"])
         palavras_validas = [p for p, score in ranqueadas if score >= CONFIG["ESCOREG_MINIMO"]]
         escores = [score for _, score in ranqueadas if score >= CONFIG["ESCOREG_MINIMO"]]
         media = round(sum(escores) / len(escores), 3) if escores else 0
+        logger.info(f"Tema '{tema}' - escore médio: {media} - total: {len(palavras_validas)}")
+        return palavras_validas
 
-        logger.info(f"[{trace_id}] Tema '{tema}' - escore médio: {media} - total: {len(palavras_validas)}")
-
-        salvar_coleta(
-            palavras=palavras_validas,
-            id_tema=id_tema,
-            origem=CONFIG["ORIGEM"],
-            fonte=CONFIG["FONTE"],
-            metodo=CONFIG["METODO"],
-            trace_id=trace_id,
-            dry_run=CONFIG["DRY_RUN"]
+    def exportador(self, trace_id):
+        return ExportadorStreaming(
+            Path("output"), f"autocomplete_{trace_id}",
+            exportar_csv=CONFIG["EXPORTAR_CSV"], exportar_json=CONFIG["EXPORTAR_JSON"]
         )
 
-        resultados_gerais[tema] = palavras_validas
-        time.sleep(1)
-
-    Path("output").mkdir(parents=True, exist_ok=True)
-
-    if CONFIG["EXPORTAR_JSON"]:
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(resultados_gerais, f, ensure_ascii=False, indent=2)
-
-    if CONFIG["EXPORTAR_NDJSON"]:
-        with open(ndjson_path, "w", encoding="utf-8") as f:
-            for tema, palavras in resultados_gerais.items():
-                for palavra in palavras:
-                    f.write(json.dumps({"tema": tema, "keyword": palavra}) + "\n")
-
-    if CONFIG["EXPORTAR_CSV"]:
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["tema", "keyword"])
-            for tema, palavras in resultados_gerais.items():
-                for palavra in palavras:
-                    writer.writerow([tema, palavra])
-
-    if falhos:
-        CONFIG["CHECKPOINT_PATH"].parent.mkdir(parents=True, exist_ok=True)
-        with open(CONFIG["CHECKPOINT_PATH"], "w", encoding="utf-8") as f:
-            json.dump({"falhos": falhos}, f, ensure_ascii=False, indent=2)
-        logger.warning(f"Temas com falha salvos para reprocessamento: {falhos}")
+    def apos_execucao(self, resumo):
+        notificar_webhook("✅ Coleta Google Autocomplete finalizada", resumo.trace_id)
 
-    logger.info(f"✅ Coleta concluída com {len(resultados_gerais)} temas processados | trace_id={trace_id}")
-    notificar_webhook("✅ Coleta Google Autocomplete finalizada", trace_id)
-    session.close()
+def executar_autocomplete(temas, modo=None, run_id=None, contexto=None):
+    return executar_coletor(ColetorGoogleAutocomplete(modo), temas=temas, run_id=run_id, contexto=contexto)
 
 # =========================
 # RODAR COLETA
@@ -1,12 +1,8 @@
-import uuid
-import json
-import time
 import logging
 from pathlib import Path
-from sqlalchemy.orm import sessionmaker
-from database_connection import engine
-from theme_manager.utils.lookup_tema_id import get_id_tema
-from utils.persistence.coletor_integrator import salvar_coleta
+from coleta.exportador_streaming import ExportadorStreaming
+from coleta.coletor_base import ColetorSincrono, executar_coletor
+from coleta.registro_coletores import registrar_coletor
 
 # Simula importações do código original
 from ml.trends_ranking import ranquear_trends
@@ -24,8 +20,7 @@ CONFIG = {
     "ESCOREG_MINIMO": 0.5,
     "DRY_RUN": False,
     "EXPORTAR_JSON": True,
-    "OUTPUT_DIR": Path("output/trends/"),
-    "CHECKPOINT_PATH": Path("checkpoints/google_trends_falhos.json")
+    "OUTPUT_DIR": Path("output/trends/")
 }
 
 # ==============================
@@ -37,65 +32,29 @@ logging.basicConfig(level=logging.INFO)
 # ==============================
 # EXECUÇÃO PRINCIPAL
 # ==============================
-def executar_google_trends():
-    trace_id = str(uuid.uuid4())
-    Session = sessionmaker(bind=engine)
-    session = Session()
+@registrar_coletor
+class ColetorGoogleTrends(ColetorSincrono):
+    nome = CONFIG["ORIGEM"]
+    config = CONFIG
 
-    temas = carregar_temas_agendados()
-    falhos = []
-    resultados = {}
+    def carregar_temas(self):
+        return carregar_temas_agendados()
 
-    for tema in temas:
-        try:
-            id_tema = get_id_tema(
-                session=session,
-                nome_nicho=CONFIG["NOME_NICHO"],
-                nome_tema=tema,
-                criar_se_nao_existir=True,
-                trace_id=trace_id
-            )
-        except ValueError as e:
-            logger.error(f"[{trace_id}] Erro ao buscar tema '{tema}': {e}")
-            falhos.append(tema)
-            continue
+    def coletar_sincrono(self, tema):
+        return coletar_dados_do_google(tema)
 
-        try:
-            dados = coletar_dados_do_google(tema)
-            ranqueadas = ranquear_trends(dados, tema)
-            palavras_validas = [p for p, score in ranqueadas if score >= CONFIG["ESCOREG_MINIMO"]]
-            resultados[tema] = palavras_validas
+    def filtrar(self, tema, dados, contexto):
+        ranqueadas = ranquear_trends(dados, tema)
+        return [p for p, score in ranqueadas if score >= CONFIG["ESCOREG_MINIMO"]]
 
-            if not CONFIG["DRY_RUN"]:
-                salvar_coleta(
-                    palavras=palavras_validas,
-                    id_tema=id_tema,
-                    origem=CONFIG["ORIGEM"],
-                    fonte=CONFIG["FONTE"],
-                    metodo=CONFIG["METODO"],
-                    trace_id=trace_id,
-                    dry_run=False
-                )
+    def exportador(self, trace_id):
+        # Só JSON (montado a partir do NDJSON gravado tema a tema)
+        return ExportadorStreaming(
+            CONFIG["OUTPUT_DIR"], f"trends_{trace_id}", exportar_csv=False, exportar_json=CONFIG["EXPORTAR_JSON"]
+        )
 
-        except Exception as e:
-            logger.error(f"[{trace_id}] Falha ao processar tema '{tema}': {e}")
-            falhos.append(tema)
-
-    # Exportar JSON
-    if CONFIG["EXPORTAR_JSON"]:
-        CONFIG["OUTPUT_DIR"].mkdir(parents=True, exist_ok=True)
-        with open(CONFIG["OUTPUT_DIR"] / f"trends_{trace_id}.json", "w", encoding="utf-8") as f:
-            json.dump(resultados, f, ensure_ascii=False, indent=2)
-
-    # Checkpoints
-    if falhos:
-        CONFIG["CHECKPOINT_PATH"].parent.mkdir(parents=True, exist_ok=True)
-        with open(CONFIG["CHECKPOINT_PATH"], "w", encoding="utf-8") as f:
-            json.dump({"falhos": falhos}, f, ensure_ascii=False, indent=2)
-        logger.warning(f"[{trace_id}] Temas com falha salvos para reprocessamento: {falhos}")
-
-    logger.info(f"✅ Coleta finalizada com {len(resultados)} temas processados | trace_id={trace_id}")
-    session.close()
+def executar_google_trends(run_id=None, contexto=None):
+    return executar_coletor(ColetorGoogleTrends(), run_id=run_id, contexto=contexto)
 
 # ==============================
 # EXECUÇÃO DIRETA
@@ -0,0 +1,83 @@
+import uuid
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from coleta.coletor_base import ContextoExecucao, executar_coletor
+from coleta.registro_coletores import obter_coletor, listar_coletores
+from ml.nlp_registry import relatorio_modelos
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+CONFIG = {
+    "MAX_FONTES_PARALELAS": 4
+}
+
+# =========================
+# LOGGING
+# =========================
+logger = logging.getLogger("multi_coletor")
+logging.basicConfig(level=logging.INFO)
+
+# =========================
+# EXECUÇÃO MULTI-FONTE
+# =========================
+def executar_fontes(nomes=None, run_id=None, max_paralelo=None, contexto=None):
+    """
+    Executa as fontes em paralelo num único processo. Todas compartilham o
+    mesmo contexto (pool HTTP, modelo spaCy, preditor e banco), então o custo
+    de aquecimento é pago uma vez. Cada fonte tem seu journal sob o mesmo
+    run_id, e repetir o run_id retoma só os temas pendentes de cada uma.
+    """
+    nomes = nomes or listar_coletores()
+    run_id = run_id or str(uuid.uuid4())
+    contexto = contexto or ContextoExecucao.padrao()
+    coletores = {nome: obter_coletor(nome) for nome in nomes}
+
+    # Carrega modelo e preditor antes de abrir as threads
+    contexto.nlp("aquecimento")
+    contexto.prever([("aquecimento", "aquecimento", "multi_coletor", [])])
+
+    resumos = {}
+    max_paralelo = max_paralelo or CONFIG["MAX_FONTES_PARALELAS"]
+    logger.info(f"🚀 Executando {len(coletores)} fontes (até {max_paralelo} em paralelo) | run_id={run_id}")
+    with ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="coletor") as pool:
+        futuros = {
+            pool.submit(executar_coletor, coletor, run_id=run_id, contexto=contexto): nome
+            for nome, coletor in coletores.items()
+        }
+        for futuro in as_completed(futuros):
+            nome = futuros[futuro]
+            try:
+                resumos[nome] = futuro.result()
+            except Exception as e:
+                logger.error(f"❌ Fonte '{nome}' interrompida: {e}", exc_info=True)
+                resumos[nome] = None
+
+    for nome, resumo in sorted(resumos.items()):
+        if resumo is None:
+            logger.info(f"  {nome:<22} sem resultado")
+        else:
+            logger.info(
+                f"  {nome:<22} {resumo.temas_processados:>5} temas | {len(resumo.falhos):>4} falhas | {resumo.duracao_s}s"
+            )
+    logger.info(f"🧠 Modelos: {relatorio_modelos()}")
+    logger.info(f"🌐 HTTP: {contexto.fetcher.estatisticas()}")
+    return resumos
+
+# =========================
+# MAIN
+# =========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa várias fontes de coleta num único processo")
+    parser.add_argument("--fontes", help="Lista separada por vírgula (padrão: todas)")
+    parser.add_argument("--run-id", help="Retoma uma execução anterior")
+    parser.add_argument("--paralelas", type=int, default=CONFIG["MAX_FONTES_PARALELAS"])
+    parser.add_argument("--listar", action="store_true", help="Lista as fontes disponíveis")
+    args = parser.parse_args()
+
+    if args.listar:
+        print("\n".join(listar_coletores()))
+    else:
+        fontes = [f.strip() for f in args.fontes.split(",")] if args.fontes else None
+        executar_fontes(fontes, run_id=args.run_id, max_paralelo=args.paralelas)
@@ -1,17 +1,10 @@
-import uuid
-import json
-import time
 import logging
-import csv
-import requests
 from pathlib import Path
+from urllib.parse import quote
 from bs4 import BeautifulSoup
-from sqlalchemy.orm import sessionmaker
-from database_connection import engine
-from theme_manager.utils.lookup_tema_id import get_id_tema
-from utils.persistence.coletor_integrator import salvar_coleta
-from ml.relevance_predictor import prever_relevancia
-import spacy
+from coleta.fetch_engine import obter_engine
+from coleta.coletor_base import ColetorBase, FalhaColeta, executar_coletor
+from coleta.registro_coletores import registrar_coletor
 
 # =========================
 # CONFIG
@@ -24,121 +17,49 @@ CONFIG = {
     "ESCOREG_MINIMO": 0.5,
     "DRY_RUN": False,
     "EXPORTAR_CSV": True,
-    "EXPORTAR_NDJSON": True,
     "OUTPUT_DIR": Path("output/pinterest/"),
-    "CHECKPOINT_PATH": Path("checkpoints/pinterest_falhos.json"),
     "TEMAS_PATH": Path("themes_agendados.json"),
     "WEBHOOK_URL": ""
 }
 
 # =========================
-# LOGGING E NLP
+# LOGGING
 # =========================
 logger = logging.getLogger("pinterest_collector")
 logging.basicConfig(level=logging.INFO)
-nlp = spacy.load("pt_core_news_md")
-
-def gerar_tags(texto):
-    doc = nlp(texto)
-    return list(set([ent.text.lower() for ent in doc.ents]))
 
 # =========================
 # FUNÇÃO DE COLETA
 # =========================
-def coletar_titulos_pinterest(tema):
-    url = f"https://www.pinterest.com/search/pins/?q={requests.utils.quote(tema)}"
+async def coletar_titulos_pinterest_async(tema, fetcher=None):
+    fetcher = fetcher or obter_engine()
+    url = f"https://www.pinterest.com/search/pins/?q={quote(tema)}"
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            logger.warning(f"Erro HTTP {response.status_code} para o tema: {tema}")
-            return []
-        soup = BeautifulSoup(response.text, "html.parser")
-        return [tag.get_text(strip=True) for tag in soup.find_all("h3") if tag.get_text(strip=True)]
+        response = await fetcher.buscar(url, headers=headers)
     except Exception as e:
-        logger.error(f"Erro ao buscar no Pinterest: {e}")
-        return []
+        raise FalhaColeta(f"Erro ao buscar no Pinterest: {e}") from e
+    if response.status != 200:
+        raise FalhaColeta(f"Erro HTTP {response.status} para o tema: {tema}")
+    soup = BeautifulSoup(response.texto, "html.parser")
+    return [tag.get_text(strip=True) for tag in soup.find_all("h3") if tag.get_text(strip=True)]
+
+def coletar_titulos_pinterest(tema):
+    return obter_engine().executar(coletar_titulos_pinterest_async(tema))
 
 # =========================
 # EXECUÇÃO PRINCIPAL
 # =========================
-def executar_pinterest():
-    trace_id = str(uuid.uuid4())
-    resultados = {}
-    falhos = []
-
-    if not CONFIG["TEMAS_PATH"].exists():
-        logger.error("Arquivo de temas não encontrado.")
-        return
-
-    with open(CONFIG["TEMAS_PATH"], "r", encoding="utf-8") as f:
-        temas = json.load(f)
-
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    for tema in temas:
-        try:
-            id_tema = get_id_tema(
-                session=session,
-                nome_nicho=CONFIG["NOME_NICHO"],
-                nome_tema=tema,
-                criar_se_nao_existir=True,
-                trace_id=trace_id
-            )
-        except ValueError as e:
-            logger.error(f"[{trace_id}] Erro ao obter tema '{tema}': {e}")
-            falhos.append(tema)
-            continue
-
-        titulos = coletar_titulos_pinterest(tema)
-        palavras_validadas = []
-
-        for titulo in titulos:
-            tags = gerar_tags(titulo)
-            validado, escore = prever_relevancia(titulo, tema, CONFIG["ORIGEM"], tags)
-            if validado and escore >= CONFIG["ESCOREG_MINIMO"]:
-                palavras_validadas.append(titulo)
-
-        resultados[tema] = palavras_validadas
-
-        if not CONFIG["DRY_RUN"]:
-            salvar_coleta(
-                palavras=palavras_validadas,
-                id_tema=id_tema,
-                origem=CONFIG["ORIGEM"],
-                fonte=CONFIG["FONTE"],
-                metodo=CONFIG["METODO"],
-                trace_id=trace_id,
-                dry_run=False
-            )
-
-        time.sleep(1)
-
-    session.close()
-    CONFIG["OUTPUT_DIR"].mkdir(parents=True, exist_ok=True)
-
-    if CONFIG["EXPORTAR_CSV"]:
-        with open(CONFIG["OUTPUT_DIR"] / f"pinterest_keywords_{trace_id}.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["tema", "keyword"])
-            for tema, palavras in resultados.items():
-                for palavra in palavras:
-                    writer.writerow([tema, palavra])
-
-    if CONFIG["EXPORTAR_NDJSON"]:
-        with open(CONFIG["OUTPUT_DIR"] / f"pinterest_keywords_{trace_id}.ndjson", "w", encoding="utf-8") as f:
-            for tema, palavras in resultados.items():
-                for palavra in palavras:
-                    f.write(json.dumps({"tema": tema, "keyword": palavra}) + "\n")
+@registrar_coletor
+class ColetorPinterest(ColetorBase):
+    nome = CONFIG["ORIGEM"]
+    config = CONFIG
 
-    if falhos:
-        CONFIG["CHECKPOINT_PATH"].parent.mkdir(parents=True, exist_ok=True)
-        with open(CONFIG["CHECKPOINT_PATH"], "w", encoding="utf-8") as f:
-            json.dump({"falhos": falhos}, f, ensure_ascii=False, indent=2)
-        logger.warning(f"Temas com falha salvos para reprocessamento: {falhos}")
+    async def coletar(self, tema, fetcher):
+        return await coletar_titulos_pinterest_async(tema, fetcher)
 
-    logger.info(f"✅ Coleta Pinterest finalizada com {len(resultados)} temas processados | trace_id={trace_id}")
+def executar_pinterest(run_id=None, contexto=None):
+    return executar_coletor(ColetorPinterest(), run_id=run_id, contexto=contexto)
 
 # =========================
 # MAIN
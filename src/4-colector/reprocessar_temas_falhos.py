@@ -1,4 +1,5 @@
 import json
+import time
 import uuid
 import logging
 from pathlib import Path
@@ -7,6 +8,7 @@ from sqlalchemy.orm import sessionmaker
 from database_connection import engine
 from theme_manager.utils.lookup_tema_id import get_id_tema
 from utils.persistence.coletor_integrator import salvar_coleta
+from coleta.journal_execucao import JournalExecucao, falhas_pendentes, STATUS_OK, STATUS_FALHA
 
 TRACE_ID = str(uuid.uuid4())
 logger = logging.getLogger("reprocessador")
@@ -17,7 +19,7 @@ logging.basicConfig(level=logging.INFO)
 # ==========================
 CONFIG = {
     "NOME_NICHO": "geral",
-    "CAMINHO_FALHOS": Path("checkpoints/temas_falhos.json"),
+    "DIRETORIO_JOURNAL": Path("checkpoints/journal"),
     "CAMINHO_VARIACOES": Path("variacoes_geradas"),
     "EXPORTAR_JSON": True,
     "EXPORTAR_CSV": True,
@@ -40,24 +42,24 @@ def gerar_variacoes(tema):
 # EXECUÇÃO PRINCIPAL
 # ==========================
 def reprocessar_temas():
-    if not CONFIG["CAMINHO_FALHOS"].exists():
-        logger.error("Arquivo de temas falhos não encontrado.")
-        return
-
-    with open(CONFIG["CAMINHO_FALHOS"], "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    temas = data.get("falhos", [])
-    if not temas:
+    # (coletor, tema) cuja última entrada nos journals ainda é falha
+    falhas = falhas_pendentes(CONFIG["DIRETORIO_JOURNAL"])
+    if not falhas:
         logger.info("Nenhum tema para reprocessar.")
         return
 
+    coletores_por_tema = {}
+    for coletor, tema in falhas:
+        coletores_por_tema.setdefault(tema, []).append(coletor)
+    journal = JournalExecucao(CONFIG["ORIGEM"], TRACE_ID, {"DIRETORIO": CONFIG["DIRETORIO_JOURNAL"]})
+
     Session = sessionmaker(bind=engine)
     session = Session()
     resultados = {}
     now_str = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    for tema in temas:
+    for tema, coletores in coletores_por_tema.items():
+        inicio = time.perf_counter()
         try:
             id_tema = get_id_tema(
                 session=session,
@@ -68,6 +70,8 @@ def reprocessar_temas():
             )
         except Exception as e:
             logger.error(f"[{TRACE_ID}] Falha ao buscar id_tema para '{tema}': {e}")
+            for coletor in coletores:
+                journal.registrar(tema, STATUS_FALHA, time.perf_counter() - inicio, erro=str(e), coletor=coletor)
             continue
 
         try:
@@ -84,10 +88,17 @@ def reprocessar_temas():
                 dry_run=False
             )
 
+            # Um sucesso posterior no journal resolve a falha original de cada coletor
+            for coletor in coletores:
+                journal.registrar(tema, STATUS_OK, time.perf_counter() - inicio, itens=len(palavras), coletor=coletor)
+
         except Exception as e:
             logger.error(f"[{TRACE_ID}] Erro ao salvar coleta de '{tema}': {e}")
+            for coletor in coletores:
+                journal.registrar(tema, STATUS_FALHA, time.perf_counter() - inicio, erro=str(e), coletor=coletor)
 
     session.close()
+    journal.fechar()
 
     CONFIG["CAMINHO_VARIACOES"].mkdir(parents=True, exist_ok=True)
     if CONFIG["EXPORTAR_JSON"]:
@@ -0,0 +1,119 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "utils"))
+
+from coleta.coletor_base import FalhaColeta
+from coleta.expansao_autocomplete import CONFIG_PADRAO, OrcamentoRequisicoes, TriePrefixos, expandir_tema
+
+class BuscaFalsa:
+    """
+    `buscar` do autocomplete sem rede: consome o orçamento a cada tentativa,
+    como google_autocomplete.buscar_sugestoes_async, e registra as requisições.
+    `respostas(consulta)` devolve as sugestões ou levanta a falha da consulta;
+    consultas em `instaveis` falham na primeira tentativa e respondem na segunda.
+    """
+
+    def __init__(self, respostas, instaveis=(), tentativas=3):
+        self.respostas = respostas
+        self.instaveis = set(instaveis)
+        self.tentativas = tentativas
+        self.requisicoes = []
+
+    async def __call__(self, consulta, orcamento=None):
+        for tentativa in range(self.tentativas):
+            if orcamento is not None and not orcamento.consumir():
+                raise FalhaColeta(f"Orçamento esgotado antes de '{consulta}'")
+            self.requisicoes.append(consulta)
+            await asyncio.sleep(0)
+            if consulta in self.instaveis and tentativa == 0:
+                continue  # 429: tenta de novo
+            return self.respostas(consulta)
+        raise FalhaColeta(f"HTTP 429 para '{consulta}'")
+
+def saturadas(consulta):
+    """O endpoint devolve o máximo de sugestões: o prefixo não está esgotado e nada é podado."""
+    return [f"{consulta} sugestao {i}" for i in range(CONFIG_PADRAO["SUGESTOES_POR_CONSULTA"])]
+
+def expandir(tema, busca, **config):
+    return asyncio.run(expandir_tema(tema, busca, config))
+
+def test_trie_poda_extensoes_de_prefixo_esgotado():
+    trie = TriePrefixos()
+    trie.marcar_consulta("SEO  local", saturada=False)
+    trie.marcar_consulta("marketing", saturada=True)
+
+    assert trie.coberto("seo local")
+    assert trie.coberto("seo local a")
+    assert not trie.coberto("seo")
+    # Prefixo saturado: só a própria consulta está coberta, as extensões ainda têm sugestões novas
+    assert trie.coberto("marketing")
+    assert not trie.coberto("marketing digital")
+
+def test_prefixo_com_poucas_sugestoes_nao_e_expandido():
+    busca = BuscaFalsa(lambda consulta: ["seo local"] if consulta == "seo" else saturadas(consulta))
+
+    resultado = expandir("seo", busca, PERGUNTAS=False, PROFUNDIDADE=2)
+
+    # "seo" esgotado no nível 0: as extensões do nível 1 ("seo" e "seo local" + a..z/0..9) saem pela trie
+    assert busca.requisicoes == ["seo"]
+    assert resultado.podadas == 72
+    assert resultado.sugestoes == ["seo local"]
+
+@pytest.mark.parametrize("profundidade, orcamento", [(1, 150), (2, 150), (2, 40), (1, 7)])
+def test_requisicoes_nunca_passam_do_orcamento(profundidade, orcamento):
+    # Parte das consultas precisa de retentativa: limitar só o número de consultas deixaria o orçamento estourar
+    instaveis = {f"seo {c}" for c in "abcdefghijkl"} | {"como seo", "qual seo"}
+    busca = BuscaFalsa(saturadas, instaveis=instaveis)
+
+    resultado = expandir("seo", busca, PROFUNDIDADE=profundidade, ORCAMENTO_POR_TEMA=orcamento)
+
+    assert len(busca.requisicoes) <= orcamento
+    assert resultado.requisicoes == len(busca.requisicoes)
+    if profundidade == 2:
+        assert len(busca.requisicoes) == orcamento  # sobra trabalho: o orçamento é usado até o fim
+
+def test_orcamento_conta_cada_tentativa():
+    orcamento = OrcamentoRequisicoes(2)
+    assert orcamento.consumir() and orcamento.consumir()
+    assert not orcamento.consumir()
+    assert (orcamento.usadas, orcamento.restante) == (2, 0)
+
+def test_consulta_com_falha_nao_marca_a_trie():
+    def respostas(consulta):
+        if consulta == "seo":
+            raise FalhaColeta("HTTP 403 para 'seo'")
+        return []
+
+    busca = BuscaFalsa(respostas, tentativas=1)
+    resultado = expandir("seo", busca, PERGUNTAS=False, PROFUNDIDADE=1)
+
+    # Se a falha tivesse marcado "seo" como esgotado, as extensões teriam sido podadas
+    assert resultado.falhas == 1
+    assert resultado.podadas == 0
+    assert "seo a" in busca.requisicoes and "seo 9" in busca.requisicoes
+    assert len(busca.requisicoes) == 1 + 36
+
+def test_primeira_falha_e_levantada_quando_nenhuma_consulta_responde():
+    def respostas(consulta):
+        raise FalhaColeta(f"HTTP 429 para '{consulta}'")
+
+    busca = BuscaFalsa(respostas, tentativas=1)
+    with pytest.raises(FalhaColeta, match="HTTP 429 para 'seo'$"):
+        expandir("seo", busca, PROFUNDIDADE=1)
+    # Nenhuma resposta, nenhuma poda: o tema, as perguntas e as extensões do tema foram tentados
+    assert len(busca.requisicoes) == 1 + 9 + 36
+
+def test_uma_resposta_vazia_basta_para_o_tema_nao_falhar():
+    def respostas(consulta):
+        if consulta != "seo":
+            raise FalhaColeta(f"HTTP 429 para '{consulta}'")
+        return []
+
+    resultado = expandir("seo", BuscaFalsa(respostas, tentativas=1), PROFUNDIDADE=1)
+
+    assert resultado.sugestoes == []
+    assert resultado.falhas == 9
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "utils"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from coleta.coletor_base import ContextoExecucao, executar_coletor
+from coleta.fetch_engine import RespostaHTTP
+from coleta.journal_execucao import JournalExecucao, falhas_pendentes, STATUS_FALHA, STATUS_OK
+from reddit_collector import ColetorReddit
+
+class FetcherFalso:
+    """Responde toda busca com o mesmo status (ou levanta `erro`) e executa `mapear` em sequência."""
+
+    def __init__(self, status=200, texto="", erro=None):
+        self.status, self.texto, self.erro = status, texto, erro
+
+    async def buscar(self, url, headers=None, timeout=None, usar_cache=True):
+        if self.erro is not None:
+            raise self.erro
+        return RespostaHTTP(url=url, status=self.status, texto=self.texto)
+
+    def mapear(self, funcao, itens, janela=None):
+        for item in itens:
+            yield item, asyncio.run(funcao(item))
+
+def contexto_falso(fetcher):
+    return ContextoExecucao(
+        fetcher=fetcher,
+        nlp=None,
+        fabrica_sessao=MagicMock(),
+        obter_id_tema=MagicMock(return_value=1),
+        prever=MagicMock(),
+        salvar=MagicMock()
+    )
+
+def executar(fetcher, temas, run_id="execucao-teste"):
+    coletor = ColetorReddit()
+    coletor.filtrar = lambda tema, textos, contexto: textos
+    return executar_coletor(coletor, temas=temas, run_id=run_id, contexto=contexto_falso(fetcher))
+
+def ultimo_registro(tema, run_id="execucao-teste"):
+    with JournalExecucao("reddit", run_id) as journal:
+        return journal.estado[tema]
+
+@pytest.fixture(autouse=True)
+def diretorio_temporario(tmp_path, monkeypatch):
+    # journal (checkpoints/journal) e exportações usam caminhos relativos
+    monkeypatch.chdir(tmp_path)
+
+@pytest.mark.parametrize("fetcher", [
+    FetcherFalso(status=429),
+    FetcherFalso(status=403),
+    FetcherFalso(erro=asyncio.TimeoutError()),
+], ids=["429", "403", "timeout"])
+def test_falha_da_fonte_registra_status_falha(fetcher):
+    resumo = executar(fetcher, ["marketing digital"])
+
+    assert resumo.falhos == ["marketing digital"]
+    registro = ultimo_registro("marketing digital")
+    assert registro["status"] == STATUS_FALHA
+    assert registro["erro"]
+    assert falhas_pendentes(Path("checkpoints/journal")) == [("reddit", "marketing digital")]
+
+def test_resposta_sem_resultados_nao_e_falha():
+    resumo = executar(FetcherFalso(status=200, texto="<html></html>"), ["marketing digital"])
+
+    assert resumo.falhos == []
+    registro = ultimo_registro("marketing digital")
+    assert registro["status"] == STATUS_OK
+    assert registro["itens"] == 0
+    assert falhas_pendentes(Path("checkpoints/journal")) == []
+
+def test_tema_falho_e_coletado_de_novo_ao_retomar():
+    executar(FetcherFalso(status=429), ["seo", "funil de vendas"])
+    resumo = executar(FetcherFalso(status=200, texto="<h3>seo local</h3>"), ["seo", "funil de vendas"])
+
+    assert resumo.falhos == []
+    assert ultimo_registro("seo")["itens"] == 1
+    assert falhas_pendentes(Path("checkpoints/journal")) == []
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "utils"))
+
+from ml.floresta_compilada import FlorestaCompilada, exportar_floresta
+
+class ScalerFloat64(StandardScaler):
+    """transform do sklearn antigo: `X -= mean_; X /= scale_` no lugar, em float64 arredondado para o dtype de X."""
+
+    def transform(self, X, copy=None):
+        X = np.array(X, dtype=np.float32)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+def dados(n=1500, n_features=12, seed=0):
+    # Escala e deslocamento grandes e valores repetidos: limiares caem entre vizinhos que o arredondamento do scaler separa
+    rng = np.random.default_rng(seed)
+    X = (1000.0 + 0.01 * rng.integers(0, 400, size=(n, n_features))).astype(np.float32)
+    y = ((X[:, 0] + X[:, 1] - X[:, 2]) > 1002.0).astype(np.int64)
+    return X, y
+
+@pytest.mark.parametrize("scaler, aritmetica", [
+    (StandardScaler(), None),
+    (ScalerFloat64(), "float64"),
+    (None, "float32"),
+], ids=["scaler-instalado", "scaler-float64", "sem-scaler"])
+def test_floresta_exportada_e_mapeada_reproduz_predict_proba(tmp_path, scaler, aritmetica):
+    X, y = dados()
+    etapas = [("scaler", scaler)] if scaler is not None else []
+    modelo = Pipeline(etapas + [("clf", RandomForestClassifier(n_estimators=25, max_depth=12, random_state=0))])
+    modelo.fit(X[:1000], y[:1000])
+
+    destino = exportar_floresta(modelo, tmp_path / "modelo_compilado", X_verificacao=X[1000:])
+    compilada = FlorestaCompilada.carregar(destino, mmap_mode="r")
+
+    assert isinstance(compilada.limiar, np.memmap)
+    if aritmetica is not None:
+        assert compilada.aritmetica_scaler == aritmetica
+    X_novo, _ = dados(n=2000, seed=1)
+    esperado = modelo.predict_proba(X_novo)
+    obtido = compilada.predict_proba(X_novo)
+    assert obtido.shape == esperado.shape
+    # Folhas guardadas em float32: só o arredondamento da média das árvores difere
+    np.testing.assert_allclose(obtido, esperado, rtol=0, atol=1e-6)
+    np.testing.assert_array_equal(obtido[:, 1] >= 0.5, esperado[:, 1] >= 0.5)
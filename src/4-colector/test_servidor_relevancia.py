@@ -0,0 +1,55 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "utils"))
+
+from ml.servidor_relevancia import ServidorRelevancia
+
+class PreditorFalso:
+    """Pontua pelo tamanho do texto e, como extrair_features_lote, quebra com texto que não é string."""
+
+    modelo = object()
+
+    def __init__(self):
+        self.lotes = []
+
+    def prever_lote(self, itens, usar_cache=True, threshold=0.5):
+        self.lotes.append(list(itens))
+        escores = np.array([len(texto.lower()) / 100 for texto, _, _, _ in itens])
+        return np.ones(len(itens), dtype=bool), escores
+
+async def enviar_concorrentes(preditor, corpos):
+    servidor = ServidorRelevancia(preditor=preditor, config={"JANELA_MS": 200.0})
+    async with TestClient(TestServer(servidor.aplicacao())) as cliente:
+        async def enviar(corpo):
+            resposta = await cliente.post("/prever", json=corpo)
+            return resposta.status, await resposta.json()
+        return await asyncio.gather(*(enviar(corpo) for corpo in corpos))
+
+def test_pedido_invalido_recebe_400_sem_derrubar_o_lote():
+    preditor = PreditorFalso()
+    validos = [{"itens": [[f"palavra chave {i}", "tema", "origem", []]], "threshold": 0.0} for i in range(3)]
+    invalidos = [
+        {"itens": [[None, "tema", "origem", []]]},
+        {"itens": [["texto", 7, "origem", []]]},
+        {"itens": [["texto", "tema", ["origem"], []]]},
+        {"itens": [["texto", "tema", "origem", [1]]]},
+    ]
+
+    respostas = asyncio.run(enviar_concorrentes(preditor, validos[:2] + invalidos + validos[2:]))
+
+    status = [codigo for codigo, _ in respostas]
+    assert status == [200, 200, 400, 400, 400, 400, 200]
+    for codigo, corpo in respostas:
+        if codigo == 200:
+            assert corpo["validos"] == [True]
+            assert corpo["escores"] == [len("palavra chave 0") / 100]
+        else:
+            assert corpo["erro"]
+    # os três pedidos válidos foram agrupados numa única chamada ao modelo
+    assert len(preditor.lotes) == 1
+    assert [texto for texto, _, _, _ in preditor.lotes[0]] == [f"palavra chave {i}" for i in range(3)]
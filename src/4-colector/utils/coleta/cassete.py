@@ -0,0 +1,150 @@
+# src/coleta/cassete.py
+# Gravação de respostas HTTP em fixtures e replay via servidor stub local
+
+import asyncio
+import gzip
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger("cassete")
+
+# Cabeçalhos que descrevem a conexão/codificação original e não valem para o replay
+CABECALHOS_IGNORADOS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+# =========================
+# CASSETE
+# =========================
+class Cassete:
+    """
+    Conjunto de respostas GET indexadas pela URL original, salvo como JSON
+    (ou JSON gzip, se o arquivo terminar em `.gz`). `metadados` guarda, por
+    exemplo, os temas gravados de cada fonte para o replay repetir a coleta.
+    """
+
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self.respostas: Dict[str, dict] = {}
+        self.metadados: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _abrir(self, modo: str):
+        if self.caminho.suffix == ".gz":
+            return gzip.open(self.caminho, modo + "t", encoding="utf-8")
+        return open(self.caminho, modo, encoding="utf-8")
+
+    @classmethod
+    def carregar(cls, caminho: Path) -> "Cassete":
+        cassete = cls(caminho)
+        with cassete._abrir("r") as f:
+            dados = json.load(f)
+        cassete.respostas = dados.get("respostas", {})
+        cassete.metadados = dados.get("metadados", {})
+        logger.info(f"📼 Cassete {cassete.caminho.name}: {len(cassete.respostas)} respostas.")
+        return cassete
+
+    def salvar(self):
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self._abrir("w") as f:
+            json.dump({"metadados": self.metadados, "respostas": self.respostas}, f, ensure_ascii=False)
+        logger.info(f"💾 Cassete {self.caminho.name} salvo com {len(self.respostas)} respostas.")
+
+    def registrar(self, url: str, status: int, headers: dict, texto: str):
+        headers = {k: v for k, v in headers.items() if k.lower() not in CABECALHOS_IGNORADOS}
+        with self._lock:
+            self.respostas[url] = {"status": status, "headers": headers, "texto": texto}
+
+    def obter(self, url: str) -> Optional[dict]:
+        return self.respostas.get(url)
+
+    def registrar_temas(self, fonte: str, temas: List[str]):
+        self.metadados.setdefault("temas", {})[fonte] = list(temas)
+
+    def temas(self, fonte: str) -> Optional[List[str]]:
+        return self.metadados.get("temas", {}).get(fonte)
+
+@contextmanager
+def gravando(fetcher, cassete: Cassete):
+    """Anexa o cassete ao FetchEngine enquanto o bloco roda e salva ao final."""
+    fetcher.gravador = cassete
+    try:
+        yield cassete
+    finally:
+        fetcher.gravador = None
+        cassete.salvar()
+
+# =========================
+# SERVIDOR DE REPLAY
+# =========================
+class ServidorReplay:
+    """
+    Servidor HTTP local que responde `GET /replay?url=<url original>` com a
+    resposta gravada (404 se a URL não estiver no cassete). Usado com
+    `FetchEngine({"URL_REPLAY": servidor.url_base})`, o caminho de rede real
+    (pool aiohttp, limitador, parse) é exercitado sem sair da máquina.
+    """
+
+    def __init__(self, cassete: Cassete, host: str = "127.0.0.1", porta: int = 0, latencia_ms: float = 0.0):
+        self.cassete = cassete
+        self.host = host
+        self.porta = porta
+        self.latencia_ms = latencia_ms
+        self.atendidas = 0
+        self.faltas: List[str] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url_base(self) -> str:
+        return f"http://{self.host}:{self.porta}"
+
+    async def _responder(self, request: web.Request) -> web.Response:
+        url = request.query.get("url", "")
+        if self.latencia_ms:
+            await asyncio.sleep(self.latencia_ms / 1000)
+        gravada = self.cassete.obter(url)
+        if gravada is None:
+            self.faltas.append(url)
+            return web.Response(status=404, text=f"URL não gravada: {url}")
+        self.atendidas += 1
+        return web.Response(status=gravada["status"], text=gravada["texto"], headers=gravada["headers"])
+
+    async def _subir(self):
+        app = web.Application()
+        app.router.add_get("/replay", self._responder)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.porta).start()
+        self.porta = self._runner.addresses[0][1]  # porta 0 = escolhida pelo sistema
+
+    def iniciar(self) -> "ServidorReplay":
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="replay-http", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._subir(), self._loop).result()
+        logger.info(f"📡 Servidor de replay em {self.url_base}")
+        return self
+
+    def encerrar(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        if self.faltas:
+            logger.warning(f"⚠️ Replay: {len(self.faltas)} URLs ausentes do cassete (ex.: {self.faltas[:3]})")
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.encerrar()
+        return False
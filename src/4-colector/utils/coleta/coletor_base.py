@@ -0,0 +1,250 @@
+# src/coleta/coletor_base.py
+# Interface comum dos coletores e o loop tema a tema compartilhado por todos
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+from coleta.exportador_streaming import ExportadorStreaming
+from coleta.journal_execucao import JournalExecucao, STATUS_OK, STATUS_FALHA
+
+logger = logging.getLogger("coletor_base")
+
+class FalhaColeta(Exception):
+    """
+    A fonte não deu uma resposta válida para o tema (bloqueio 403/429, erro
+    HTTP, timeout ou erro de rede) depois das tentativas do coletor. Levantada
+    por `coletar` para que o journal registre STATUS_FALHA em vez de uma
+    coleta vazia; lista vazia significa só "a fonte respondeu sem resultados".
+    """
+
+# =========================
+# RECURSOS COMPARTILHADOS
+# =========================
+@dataclass
+class ContextoExecucao:
+    """
+    Recursos de processo usados por todos os coletores: pool HTTP, modelo
+    spaCy, preditor, fábrica de sessões e gravação no banco. Um único
+    contexto pode ser passado a várias execuções simultâneas.
+    """
+    fetcher: Any
+    nlp: Any
+    fabrica_sessao: Callable[[], Any]
+    obter_id_tema: Callable[..., int]
+    prever: Callable[..., Any]      # em lote: [(texto, tema, origem, tags)] -> (validos, escores)
+    salvar: Callable[..., Any]
+
+    @classmethod
+    def padrao(cls) -> "ContextoExecucao":
+        # Importações tardias: dependem do banco e dos modelos, que só devem ser tocados na execução
+        from sqlalchemy.orm import sessionmaker
+        from database_connection import engine
+        from theme_manager.utils.lookup_tema_id import get_id_tema
+        from utils.persistence.coletor_integrator import salvar_coleta
+        if os.getenv("RELEVANCIA_SOCKET"):
+            # Modelo compartilhado no servidor local (ml.servidor_relevancia), com micro-batching entre processos
+            from ml.cliente_relevancia import prever_relevancia_lote
+        else:
+            from ml.relevance_predictor import prever_relevancia_lote
+        from ml.nlp_registry import modelo_preguicoso, COMPONENTES_SO_NER
+        from coleta.fetch_engine import obter_engine
+
+        return cls(
+            fetcher=obter_engine(),
+            nlp=modelo_preguicoso("pt_core_news_md", desativar=COMPONENTES_SO_NER),
+            fabrica_sessao=sessionmaker(bind=engine),
+            obter_id_tema=get_id_tema,
+            prever=prever_relevancia_lote,
+            salvar=salvar_coleta
+        )
+
+@dataclass
+class ResumoExecucao:
+    coletor: str
+    trace_id: str
+    temas_processados: int = 0
+    falhos: List[str] = field(default_factory=list)
+    duracao_s: float = 0.0
+
+# =========================
+# INTERFACE DO COLETOR
+# =========================
+class ColetorBase:
+    """
+    Cada coletor define `nome`, `config` (o CONFIG do módulo) e `coletar`.
+    O restante do loop (tema no banco, tags, relevância, gravação, exportação
+    e journal) é o mesmo para todas as fontes e fica em `executar_coletor`.
+    """
+
+    nome: str = ""
+    config: dict = {}
+    janela: Optional[int] = None     # temas em voo no FetchEngine (None = padrão do engine)
+    falha_se_vazio: bool = False     # coleta vazia conta como falha do tema
+    opcoes_tags: dict = {}           # repassadas a gerar_tags_lote (ex.: entidades sem minúsculas nem deduplicação)
+
+    def carregar_temas(self) -> Optional[List[str]]:
+        caminho = Path(self.config.get("TEMAS_PATH", "themes_agendados.json"))
+        if not caminho.exists():
+            logger.error(f"[{self.nome}] Arquivo de temas não encontrado.")
+            return None
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def coletar(self, tema: str, fetcher) -> List[str]:
+        raise NotImplementedError
+
+    def filtrar(self, tema: str, textos: List[str], contexto: ContextoExecucao) -> List[Union[str, "PalavraAvaliada"]]:
+        """
+        Padrão: tags em lote + modelo de relevância (uma predição por tema) com
+        o escore mínimo do coletor. Devolve as palavras com tags e escore para
+        que a gravação não repita o trabalho; coletores com ranking próprio
+        podem devolver só as strings.
+        """
+        from ml.tagging import gerar_tags_lote
+        from ml.relevance_predictor import PalavraAvaliada
+
+        tags_por_texto = gerar_tags_lote(textos, nlp=contexto.nlp, **self.opcoes_tags)
+        validos, escores = contexto.prever([(texto, tema, self.nome, tags) for texto, tags in zip(textos, tags_por_texto)])
+        aprovados = validos & (escores >= self.config["ESCOREG_MINIMO"])
+        return [
+            PalavraAvaliada(palavra=texto, tags=tags, escore=escore, validado=True)
+            for texto, tags, escore, aprovado in zip(textos, tags_por_texto, escores.tolist(), aprovados)
+            if aprovado
+        ]
+
+    def exportador(self, trace_id: str) -> ExportadorStreaming:
+        return ExportadorStreaming(
+            self.config["OUTPUT_DIR"],
+            f"{self.nome}_keywords_{trace_id}",
+            exportar_csv=self.config.get("EXPORTAR_CSV", True),
+            exportar_json=self.config.get("EXPORTAR_JSON", False)
+        )
+
+    def apos_tema(self, tema: str, palavras: List[str], trace_id: str):
+        pass
+
+    def apos_execucao(self, resumo: ResumoExecucao):
+        pass
+
+class ColetorSincrono(ColetorBase):
+    """
+    Para fontes sem cliente assíncrono (scraping com requests, APIs de
+    terceiros, simulações): `coletar_sincrono` roda em thread, com no máximo
+    `janela` temas em paralelo e pausa opcional de `intervalo_s` após cada tema.
+    """
+
+    janela: Optional[int] = 1
+    intervalo_s: float = 0.0
+
+    def coletar_sincrono(self, tema: str) -> List[str]:
+        raise NotImplementedError
+
+    async def coletar(self, tema: str, fetcher) -> List[str]:
+        resultado = await asyncio.to_thread(self.coletar_sincrono, tema)
+        if self.intervalo_s:
+            await asyncio.sleep(self.intervalo_s)
+        return resultado
+
+# =========================
+# LOOP COMPARTILHADO
+# =========================
+def executar_coletor(
+    coletor: ColetorBase,
+    temas: Optional[List[str]] = None,
+    run_id: Optional[str] = None,
+    contexto: Optional[ContextoExecucao] = None
+) -> Optional[ResumoExecucao]:
+    inicio_execucao = time.perf_counter()
+    contexto = contexto or ContextoExecucao.padrao()
+    trace_id = run_id or str(uuid.uuid4())
+    config = coletor.config
+
+    if temas is None:
+        temas = coletor.carregar_temas()
+        if temas is None:
+            return None
+
+    exportador = coletor.exportador(trace_id)
+    journal = JournalExecucao(coletor.nome, trace_id)
+    temas = journal.pendentes(temas, confirmado=exportador.ja_concluido)
+    resumo = ResumoExecucao(coletor=coletor.nome, trace_id=trace_id)
+    fetcher = contexto.fetcher
+
+    async def coletar_seguro(tema):
+        try:
+            return await coletor.coletar(tema, fetcher)
+        except Exception as e:
+            return e
+
+    def falhar(tema, inicio, erro):
+        resumo.falhos.append(tema)
+        journal.registrar(tema, STATUS_FALHA, time.perf_counter() - inicio, erro=str(erro))
+
+    session = contexto.fabrica_sessao()
+    try:
+        # Em caso de erro os context managers só gravam o que já foi processado; o run_id pode ser retomado
+        with exportador, journal:
+            for tema, textos in fetcher.mapear(coletar_seguro, temas, janela=coletor.janela):
+                inicio = time.perf_counter()
+                try:
+                    id_tema = contexto.obter_id_tema(
+                        session=session,
+                        nome_nicho=config["NOME_NICHO"],
+                        nome_tema=tema,
+                        criar_se_nao_existir=True,
+                        trace_id=trace_id
+                    )
+                except ValueError as e:
+                    logger.error(f"[{trace_id}] Erro ao obter tema '{tema}': {e}")
+                    falhar(tema, inicio, e)
+                    continue
+
+                if isinstance(textos, Exception):
+                    logger.error(f"[{trace_id}] Falha na coleta do tema '{tema}': {textos}")
+                    falhar(tema, inicio, textos)
+                    continue
+                if not textos and coletor.falha_se_vazio:
+                    falhar(tema, inicio, "coleta vazia")
+                    continue
+
+                try:
+                    avaliadas = coletor.filtrar(tema, textos, contexto)
+                    palavras = [getattr(a, "palavra", a) for a in avaliadas]
+                    if not config["DRY_RUN"]:
+                        contexto.salvar(
+                            palavras=avaliadas,
+                            id_tema=id_tema,
+                            origem=coletor.nome,
+                            fonte=config["FONTE"],
+                            metodo=config["METODO"],
+                            trace_id=trace_id,
+                            dry_run=False
+                        )
+                except Exception as e:
+                    logger.error(f"[{trace_id}] Falha ao processar tema '{tema}': {e}")
+                    falhar(tema, inicio, e)
+                    continue
+
+                exportador.escrever_tema(tema, palavras)
+                journal.registrar(tema, STATUS_OK, time.perf_counter() - inicio, itens=len(palavras))
+                coletor.apos_tema(tema, palavras, trace_id)
+    finally:
+        session.close()
+    resumo.temas_processados = len(exportador.temas_concluidos)
+
+    if resumo.falhos:
+        logger.warning(f"[{coletor.nome}] Temas com falha registrados em {journal.caminho}: {resumo.falhos}")
+    resumo.duracao_s = round(time.perf_counter() - inicio_execucao, 3)
+    logger.info(
+        f"✅ Coleta {coletor.nome} finalizada com {resumo.temas_processados} temas processados "
+        f"em {resumo.duracao_s}s | trace_id={trace_id}"
+    )
+    coletor.apos_execucao(resumo)
+    return resumo
@@ -0,0 +1,190 @@
+# src/coleta/expansao_autocomplete.py
+# Expansão recursiva "alphabet soup" de sugestões de autocomplete
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("expansao_autocomplete")
+
+# =========================
+# CONFIGURAÇÕES PADRÃO
+# =========================
+ALFABETO = "abcdefghijklmnopqrstuvwxyz"
+DIGITOS = "0123456789"
+PREFIXOS_PERGUNTA = ["como", "o que é", "qual", "quais", "quando", "onde", "por que", "quanto", "melhor"]
+
+# Cada nível multiplica as consultas por 36 (a..z, 0..9) por semente: com o orçamento padrão o nível 1
+# (tema + ~100 sugestões do nível 0 como sementes) já o consome inteiro. O nível 2 só é alcançado com
+# orçamentos na casa dos milhares ou com ALFABETO/NUMEROS restritos.
+CONFIG_PADRAO = {
+    "PROFUNDIDADE": 1,               # níveis abaixo do tema
+    "ORCAMENTO_POR_TEMA": 150,       # máximo de requisições HTTP enviadas por tema, contando as retentativas
+    "CONCORRENCIA": 16,              # consultas simultâneas por tema
+    "ALFABETO": True,
+    "NUMEROS": True,
+    "PERGUNTAS": True,
+    "SUGESTOES_POR_CONSULTA": 10     # o endpoint devolve no máximo 10; abaixo disso o prefixo está esgotado
+}
+
+# =========================
+# TRIE DE PREFIXOS
+# =========================
+class _No:
+    __slots__ = ("filhos", "consultado", "saturado")
+
+    def __init__(self):
+        self.filhos: Dict[str, "_No"] = {}
+        self.consultado = False
+        self.saturado = False
+
+class TriePrefixos:
+    """
+    Registra as consultas já feitas. Se um prefixo consultado devolveu menos
+    sugestões que o limite do endpoint, todas as completações dele já foram
+    vistas e nenhuma extensão desse prefixo precisa ser consultada.
+    """
+
+    def __init__(self):
+        self.raiz = _No()
+
+    @staticmethod
+    def _normalizar(texto: str) -> str:
+        return " ".join(texto.lower().split())
+
+    def marcar_consulta(self, consulta: str, saturada: bool):
+        no = self.raiz
+        for caractere in self._normalizar(consulta):
+            no = no.filhos.setdefault(caractere, _No())
+        no.consultado = True
+        no.saturado = saturada
+
+    def coberto(self, consulta: str) -> bool:
+        no = self.raiz
+        for caractere in self._normalizar(consulta):
+            if no.consultado and not no.saturado:
+                return True
+            no = no.filhos.get(caractere)
+            if no is None:
+                return False
+        return no.consultado
+
+# =========================
+# ORÇAMENTO
+# =========================
+class OrcamentoRequisicoes:
+    """
+    Contador de requisições de um tema. A função de busca chama `consumir`
+    antes de cada tentativa enviada (retentativas incluídas) e desiste quando
+    ele devolve False; como o loop de eventos é único, não precisa de lock.
+    """
+
+    def __init__(self, limite: int):
+        self.limite = limite
+        self.usadas = 0
+
+    @property
+    def restante(self) -> int:
+        return max(self.limite - self.usadas, 0)
+
+    def consumir(self) -> bool:
+        if self.usadas >= self.limite:
+            return False
+        self.usadas += 1
+        return True
+
+# =========================
+# EXPANSÃO EM LARGURA
+# =========================
+@dataclass
+class ResultadoExpansao:
+    tema: str
+    sugestoes: List[str] = field(default_factory=list)
+    requisicoes: int = 0
+    falhas: int = 0
+    podadas: int = 0
+    profundidade_atingida: int = 0
+
+def _expansoes(consulta: str, config: dict) -> List[str]:
+    sufixos = ""
+    if config["ALFABETO"]:
+        sufixos += ALFABETO
+    if config["NUMEROS"]:
+        sufixos += DIGITOS
+    return [f"{consulta} {s}" for s in sufixos]
+
+async def expandir_tema(
+    tema: str,
+    buscar: Callable[..., Awaitable[List[str]]],
+    config: Optional[dict] = None
+) -> ResultadoExpansao:
+    """
+    Expande o tema em largura. O nível 0 consulta o tema e os prefixos de
+    pergunta; cada nível seguinte consulta semente + a..z/0..9, tendo como
+    sementes o próprio tema (nível 1) e as sugestões novas do nível anterior.
+
+    `buscar` recebe a consulta e `orcamento=` (do tema), consome uma unidade por
+    requisição enviada e devolve a lista de sugestões de uma resposta real;
+    bloqueio, timeout ou erro de rede devem levantar exceção. Só respostas
+    reais marcam o prefixo na trie (uma consulta que falhou não poda nada).
+    Se nenhuma consulta do tema teve resposta, a primeira falha é levantada.
+    """
+    config = {**CONFIG_PADRAO, **(config or {})}
+    resultado = ResultadoExpansao(tema=tema)
+    trie = TriePrefixos()
+    vistas: Dict[str, None] = {}
+    semaforo = asyncio.Semaphore(config["CONCORRENCIA"])
+    orcamento = OrcamentoRequisicoes(config["ORCAMENTO_POR_TEMA"])
+    respondidas, primeira_falha = 0, None
+
+    async def consultar(consulta: str) -> List[str]:
+        async with semaforo:
+            return await buscar(consulta, orcamento=orcamento)
+
+    nivel = [tema]
+    if config["PERGUNTAS"]:
+        nivel += [f"{p} {tema}" for p in PREFIXOS_PERGUNTA]
+
+    for profundidade in range(config["PROFUNDIDADE"] + 1):
+        candidatas = []
+        for consulta in dict.fromkeys(nivel):
+            if trie.coberto(consulta):
+                resultado.podadas += 1
+            else:
+                candidatas.append(consulta)
+        candidatas = candidatas[:orcamento.restante]
+        if not candidatas:
+            break
+
+        respostas = await asyncio.gather(*(consultar(c) for c in candidatas), return_exceptions=True)
+        resultado.requisicoes = orcamento.usadas
+        resultado.profundidade_atingida = profundidade
+
+        novas = []
+        for consulta, sugestoes in zip(candidatas, respostas):
+            if isinstance(sugestoes, Exception):
+                logger.warning(f"[{tema}] Falha ao expandir '{consulta}': {sugestoes}")
+                resultado.falhas += 1
+                primeira_falha = primeira_falha or sugestoes
+                continue
+            respondidas += 1
+            trie.marcar_consulta(consulta, saturada=len(sugestoes) >= config["SUGESTOES_POR_CONSULTA"])
+            for sugestao in sugestoes:
+                chave = sugestao.strip().lower()
+                if chave and chave not in vistas:
+                    vistas[chave] = None
+                    resultado.sugestoes.append(sugestao.strip())
+                    novas.append(chave)
+
+        sementes = ([tema] if profundidade == 0 else []) + novas
+        nivel = [e for semente in sementes for e in _expansoes(semente, config)]
+
+    if not respondidas and primeira_falha is not None:
+        raise primeira_falha
+    logger.info(
+        f"[{tema}] Expansão: {len(resultado.sugestoes)} sugestões | {resultado.requisicoes} requisições "
+        f"| {resultado.falhas} consultas com falha "
+        f"| {resultado.podadas} podadas pela trie | profundidade {resultado.profundidade_atingida}"
+    )
+    return resultado
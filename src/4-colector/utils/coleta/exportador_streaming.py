@@ -0,0 +1,210 @@
+# src/coleta/exportador_streaming.py
+# Exportação incremental (NDJSON/CSV por tema) com retomada após falha
+
+import csv
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger("exportador_streaming")
+
+# =========================
+# CONFIGURAÇÕES PADRÃO
+# =========================
+CONFIG_PADRAO = {
+    "FLUSH_A_CADA_TEMAS": 20,       # temas acumulados antes de gravar em disco
+    "FLUSH_INTERVALO_S": 5.0,       # ou este intervalo, o que vier primeiro
+    "FSYNC": True
+}
+
+class ExportadorStreaming:
+    """
+    Grava `<base>.ndjson` (e opcionalmente `<base>.csv`) tema a tema e registra
+    os temas concluídos em `<base>.temas`, sempre depois que as linhas do tema
+    já estão em disco. Ao reabrir o mesmo `base`, linhas de temas não
+    confirmados (gravação interrompida) são descartadas e a coleta pode seguir
+    a partir do próximo tema pendente.
+
+    O NDJSON é sempre gravado, pois é a fonte de verdade: o JSON "bonito" é
+    montado a partir dele em `finalizar`, sem manter a execução inteira em
+    memória. O `.temas` é mantido após a finalização, de modo que reabrir uma
+    execução concluída não refaz nenhum tema.
+    """
+
+    def __init__(
+        self,
+        diretorio: Path,
+        base: str,
+        exportar_csv: bool = True,
+        exportar_json: bool = False,
+        config: Optional[dict] = None
+    ):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.caminho_ndjson = self.diretorio / f"{base}.ndjson"
+        self.caminho_csv = self.diretorio / f"{base}.csv"
+        self.caminho_json = self.diretorio / f"{base}.json"
+        self.caminho_temas = self.diretorio / f"{base}.temas"
+        self.exportar_csv = exportar_csv
+        self.exportar_json = exportar_json
+
+        self.temas_concluidos: Dict[str, int] = self._recuperar()
+        self._pendentes: List[Tuple[str, List[str]]] = []
+        self._temas_pendentes: Set[str] = set()
+        self._ultimo_flush = time.monotonic()
+
+        self._f_ndjson = open(self.caminho_ndjson, "a", encoding="utf-8")
+        self._f_temas = open(self.caminho_temas, "a", encoding="utf-8")
+        self._f_csv = None
+        self._csv = None
+        if self.exportar_csv:
+            novo = not self.caminho_csv.exists() or self.caminho_csv.stat().st_size == 0
+            self._f_csv = open(self.caminho_csv, "a", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._f_csv)
+            if novo:
+                self._csv.writerow(["tema", "keyword"])
+
+    # ---- Retomada ----
+    def _recuperar(self) -> Dict[str, int]:
+        """Lê temas confirmados e corta do NDJSON qualquer sobra de tema não confirmado."""
+        if not self.caminho_temas.exists():
+            for caminho in (self.caminho_ndjson, self.caminho_csv):
+                caminho.unlink(missing_ok=True)
+            return {}
+
+        concluidos: Dict[str, int] = {}
+        with open(self.caminho_temas, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    break  # última linha truncada
+                concluidos[registro["tema"]] = registro["total"]
+
+        esperado = dict(concluidos)
+        offset_valido = 0
+        if self.caminho_ndjson.exists():
+            with open(self.caminho_ndjson, "rb") as f:
+                for linha in f:
+                    try:
+                        tema = json.loads(linha)["tema"]
+                    except (json.JSONDecodeError, KeyError, UnicodeDecodeError):
+                        break
+                    if esperado.get(tema, 0) <= 0:
+                        break
+                    esperado[tema] -= 1
+                    offset_valido += len(linha)
+            if offset_valido < self.caminho_ndjson.stat().st_size:
+                with open(self.caminho_ndjson, "r+b") as f:
+                    f.truncate(offset_valido)
+                logger.warning(f"✂️ {self.caminho_ndjson.name}: linhas de tema não confirmado descartadas.")
+
+        if self.exportar_csv:
+            # CSV não tem offsets confiáveis (campos com quebra de linha): é regravado a partir do NDJSON.
+            with open(self.caminho_csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["tema", "keyword"])
+                for tema, palavra in self._ler_ndjson():
+                    writer.writerow([tema, palavra])
+
+        if concluidos:
+            logger.info(f"⏩ Retomando exportação {self.caminho_ndjson.stem}: {len(concluidos)} temas já gravados.")
+        return concluidos
+
+    def ja_concluido(self, tema: str) -> bool:
+        return tema in self.temas_concluidos
+
+    # ---- Escrita ----
+    def escrever_tema(self, tema: str, palavras: List[str]):
+        if tema in self.temas_concluidos or tema in self._temas_pendentes:
+            logger.warning(f"⚠️ Tema '{tema}' já exportado nesta execução; ignorado.")
+            return
+        self._pendentes.append((tema, list(palavras)))
+        self._temas_pendentes.add(tema)
+        if (
+            len(self._pendentes) >= self.config["FLUSH_A_CADA_TEMAS"]
+            or time.monotonic() - self._ultimo_flush >= self.config["FLUSH_INTERVALO_S"]
+        ):
+            self.flush()
+
+    def flush(self):
+        if not self._pendentes:
+            return
+        for tema, palavras in self._pendentes:
+            for palavra in palavras:
+                self._f_ndjson.write(json.dumps({"tema": tema, "keyword": palavra}, ensure_ascii=False) + "\n")
+                if self._csv is not None:
+                    self._csv.writerow([tema, palavra])
+        self._sincronizar(self._f_ndjson, self._f_csv)
+
+        # Só confirma os temas depois que as linhas estão em disco
+        for tema, palavras in self._pendentes:
+            self._f_temas.write(json.dumps({"tema": tema, "total": len(palavras)}, ensure_ascii=False) + "\n")
+            self.temas_concluidos[tema] = len(palavras)
+        self._sincronizar(self._f_temas)
+
+        self._pendentes.clear()
+        self._temas_pendentes.clear()
+        self._ultimo_flush = time.monotonic()
+
+    def _sincronizar(self, *arquivos):
+        for f in arquivos:
+            if f is None:
+                continue
+            f.flush()
+            if self.config["FSYNC"]:
+                os.fsync(f.fileno())
+
+    # ---- Finalização ----
+    def _ler_ndjson(self) -> Iterator[Tuple[str, str]]:
+        if not self.caminho_ndjson.exists():
+            return
+        with open(self.caminho_ndjson, "r", encoding="utf-8") as f:
+            for linha in f:
+                registro = json.loads(linha)
+                yield registro["tema"], registro["keyword"]
+
+    def _gravar_json(self):
+        """Monta {tema: [palavras]} em streaming; as linhas de um tema são contíguas no NDJSON."""
+        temporario = self.caminho_json.with_suffix(".json.tmp")
+        linhas = self._ler_ndjson()
+        proxima = next(linhas, None)
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write("{")
+            for i, (tema, total) in enumerate(self.temas_concluidos.items()):
+                palavras = []
+                for _ in range(total):
+                    palavras.append(proxima[1])
+                    proxima = next(linhas, None)
+                corpo = json.dumps(palavras, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+                f.write(("," if i else "") + f"\n  {json.dumps(tema, ensure_ascii=False)}: {corpo}")
+            f.write("\n}\n" if self.temas_concluidos else "}\n")
+        temporario.replace(self.caminho_json)
+
+    def fechar(self):
+        self.flush()
+        for f in (self._f_ndjson, self._f_csv, self._f_temas):
+            if f is not None and not f.closed:
+                f.close()
+
+    def finalizar(self) -> int:
+        """Grava o que estiver pendente e gera o JSON. Retorna o total de temas exportados."""
+        self.fechar()
+        if self.exportar_json:
+            self._gravar_json()
+        return len(self.temas_concluidos)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Em caso de erro só grava o que já foi processado; a execução pode ser retomada.
+        if exc_type is None:
+            self.finalizar()
+        else:
+            self.fechar()
+        return False
@@ -0,0 +1,265 @@
+# src/coleta/fetch_engine.py
+# Runtime assíncrono compartilhado de requisições HTTP para os coletores
+
+import asyncio
+import atexit
+import json
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+import aiohttp
+
+from coleta.http_cache import HttpCache
+from coleta.rate_limiter import RateLimiterDominio
+
+logger = logging.getLogger("fetch_engine")
+
+# =========================
+# CONFIGURAÇÕES PADRÃO
+# =========================
+CONFIG_PADRAO = {
+    "CONCORRENCIA_GLOBAL": 200,      # conexões simultâneas no pool inteiro
+    "CONCORRENCIA_POR_HOST": 4,      # requisições simultâneas por domínio
+    "LIMITES_POR_HOST": {},          # ex.: {"www.amazon.com": 2}
+    "JANELA_EM_VOO": 200,            # temas buscados à frente do processamento
+    "TIMEOUT": 10,
+    "KEEPALIVE_TIMEOUT": 30,
+    "USER_AGENT": "Mozilla/5.0",
+    "RATE_LIMIT": {},                # repassado ao RateLimiterDominio
+    "CACHE": {},                     # repassado ao HttpCache; {"ATIVO": False} desliga
+    "THREADS_CACHE": 4,              # leituras/gravações do cache (SQLite, gzip, disco) fora do event loop
+    "URL_REPLAY": None               # ex.: "http://127.0.0.1:8765": envia tudo ao ServidorReplay local
+}
+
+# =========================
+# RESPOSTA NORMALIZADA
+# =========================
+@dataclass
+class RespostaHTTP:
+    url: str
+    status: int
+    texto: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    do_cache: bool = False
+
+    def json(self) -> Any:
+        return json.loads(self.texto)
+
+# =========================
+# ENGINE
+# =========================
+class FetchEngine:
+    """
+    Pool HTTP keep-alive com limite de concorrência por host.
+
+    O event loop roda em uma thread dedicada, de modo que coletores síncronos
+    possam submeter corrotinas e consumir os resultados na ordem dos temas
+    enquanto as próximas buscas já estão em andamento.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._sessao: Optional[aiohttp.ClientSession] = None
+        self._semaforos_host: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self.limitador = RateLimiterDominio(self.config["RATE_LIMIT"])
+        self.cache: Optional[HttpCache] = None  # aberto em iniciar e fechado em encerrar
+        self._executor_cache: Optional[ThreadPoolExecutor] = None
+        self.gravador = None  # Cassete que recebe as respostas vindas da rede (modo gravação)
+
+    # ---- Ciclo de vida ----
+    @property
+    def ativo(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def iniciar(self) -> "FetchEngine":
+        with self._lock:
+            if self.ativo:
+                return self
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="fetch-engine", daemon=True)
+            self._thread.start()
+            if self.config["CACHE"].get("ATIVO", True):
+                self.cache = HttpCache(self.config["CACHE"])
+                self._executor_cache = ThreadPoolExecutor(self.config["THREADS_CACHE"], thread_name_prefix="http-cache")
+            asyncio.run_coroutine_threadsafe(self._criar_sessao(), self._loop).result()
+            logger.info(
+                f"🌐 FetchEngine iniciado | global={self.config['CONCORRENCIA_GLOBAL']} "
+                f"| por_host={self.config['CONCORRENCIA_POR_HOST']}"
+            )
+        return self
+
+    async def _criar_sessao(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.config["CONCORRENCIA_GLOBAL"],
+            keepalive_timeout=self.config["KEEPALIVE_TIMEOUT"],
+            ttl_dns_cache=300
+        )
+        self._sessao = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config["TIMEOUT"]),
+            headers={"User-Agent": self.config["USER_AGENT"]}
+        )
+
+    def encerrar(self):
+        with self._lock:
+            if not self.ativo:
+                return
+            asyncio.run_coroutine_threadsafe(self._sessao.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            estatisticas = self.estatisticas()
+            if self._executor_cache is not None:
+                self._executor_cache.shutdown(wait=True)
+                self._executor_cache = None
+            if self.cache is not None:
+                # Depois do executor: nenhuma leitura ou gravação em andamento usa o índice SQLite
+                self.cache.fechar()
+                self.cache = None
+            self._loop = None
+            self._thread = None
+            self._sessao = None
+            self._semaforos_host.clear()
+            self.limitador = RateLimiterDominio(self.config["RATE_LIMIT"])
+            logger.info(f"🔚 FetchEngine encerrado. | {estatisticas}")
+
+    # ---- Requisições ----
+    def _semaforo(self, host: str) -> asyncio.Semaphore:
+        semaforo = self._semaforos_host.get(host)
+        if semaforo is None:
+            limite = self.config["LIMITES_POR_HOST"].get(host, self.config["CONCORRENCIA_POR_HOST"])
+            semaforo = asyncio.Semaphore(limite)
+            self._semaforos_host[host] = semaforo
+        return semaforo
+
+    async def _no_executor_cache(self, funcao: Callable, *args) -> Any:
+        # O cache faz consultas SQLite, gzip e escrita em disco: na thread do loop travaria todas as buscas em voo
+        return await asyncio.get_running_loop().run_in_executor(self._executor_cache, funcao, *args)
+
+    async def buscar(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        usar_cache: bool = True,
+        registrar_taxa: bool = True
+    ) -> RespostaHTTP:
+        """
+        Executa um GET respeitando o limite de concorrência e a taxa do domínio.
+        Respostas 403/429 colocam apenas esse domínio em cooldown. Com
+        `registrar_taxa=False` o chamador informa o limitador ele mesmo (ex.:
+        CAPTCHA servido com 200), uma única vez por resposta.
+
+        Com o cache ativo, respostas frescas não saem para a rede e respostas
+        expiradas são revalidadas com If-None-Match/If-Modified-Since.
+
+        Erros de rede são propagados (aiohttp.ClientError / asyncio.TimeoutError),
+        como acontecia com requests.get nos coletores.
+        """
+        cache = self.cache if usar_cache else None
+        entrada = await self._no_executor_cache(cache.obter, url) if cache is not None else None
+        if entrada is not None and entrada.fresca:
+            await self._no_executor_cache(cache.registrar_hit, entrada)
+            return self._resposta_do_cache(entrada)
+        if entrada is not None:
+            headers = {**(headers or {}), **entrada.headers_revalidacao()}
+
+        host = urlsplit(url).hostname or ""
+        kwargs = {"headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        destino = url
+        if self.config["URL_REPLAY"]:
+            # limitador, semáforo e cache continuam chaveados pelo host original
+            destino = f"{self.config['URL_REPLAY']}/replay?url={quote(url, safe='')}"
+        await self.limitador.adquirir(host)
+        async with self._semaforo(host):
+            async with self._sessao.get(destino, **kwargs) as resp:
+                if registrar_taxa:
+                    self.limitador.registrar_resposta(host, resp.status, resp.headers)
+                if resp.status == 304 and entrada is not None:
+                    await self._no_executor_cache(cache.registrar_hit, entrada, True)
+                    return self._resposta_do_cache(entrada)
+                texto = await resp.text(errors="replace")
+                if cache is not None:
+                    cache.registrar_miss(url)
+                    if resp.status == 200:
+                        await self._no_executor_cache(cache.armazenar, url, resp.status, resp.headers, texto)
+                if self.gravador is not None:
+                    self.gravador.registrar(url, resp.status, dict(resp.headers), texto)
+                url_final = url if destino != url else str(resp.url)
+                return RespostaHTTP(url=url_final, status=resp.status, texto=texto, headers=dict(resp.headers))
+
+    @staticmethod
+    def _resposta_do_cache(entrada) -> RespostaHTTP:
+        return RespostaHTTP(url=entrada.url, status=entrada.status, texto=entrada.texto, headers=entrada.headers, do_cache=True)
+
+    async def invalidar_cache(self, url: str):
+        """Descarta a resposta armazenada (ex.: página de CAPTCHA servida com 200)."""
+        if self.cache is not None:
+            await self._no_executor_cache(self.cache.invalidar, url)
+
+    def estatisticas(self) -> dict:
+        return {
+            "cache": self.cache.estatisticas() if self.cache is not None else None,
+            "rate_limit": self.limitador.estado()
+        }
+
+    # ---- Ponte síncrona ----
+    def submeter(self, coro: Awaitable) -> Future:
+        if not self.ativo:
+            self.iniciar()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def executar(self, coro: Awaitable) -> Any:
+        return self.submeter(coro).result()
+
+    def mapear(
+        self,
+        funcao: Callable[[Any], Awaitable],
+        itens: Iterable,
+        janela: Optional[int] = None
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        Aplica `funcao` (assíncrona) a cada item com até `janela` itens em voo.
+
+        Os pares (item, resultado) são entregues na ordem de entrada, então o
+        loop síncrono do coletor segue processando tema a tema enquanto as
+        buscas seguintes já estão em andamento.
+        """
+        janela = janela or self.config["JANELA_EM_VOO"]
+        pendentes = deque()
+        for item in itens:
+            pendentes.append((item, self.submeter(funcao(item))))
+            if len(pendentes) >= janela:
+                item_pronto, futuro = pendentes.popleft()
+                yield item_pronto, futuro.result()
+        while pendentes:
+            item_pronto, futuro = pendentes.popleft()
+            yield item_pronto, futuro.result()
+
+# =========================
+# INSTÂNCIA COMPARTILHADA
+# =========================
+_engine_padrao: Optional[FetchEngine] = None
+_engine_lock = threading.Lock()
+
+def obter_engine(config: Optional[dict] = None) -> FetchEngine:
+    """
+    Retorna o FetchEngine do processo, criando-o no primeiro uso.
+    A configuração só é aplicada na criação.
+    """
+    global _engine_padrao
+    with _engine_lock:
+        if _engine_padrao is None:
+            _engine_padrao = FetchEngine(config)
+            atexit.register(_engine_padrao.encerrar)
+    return _engine_padrao.iniciar()
@@ -0,0 +1,260 @@
+# src/coleta/http_cache.py
+# Cache persistente de respostas HTTP (endereçado por conteúdo) para os coletores
+
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+from prometheus_client import Counter
+
+logger = logging.getLogger("http_cache")
+
+# =========================
+# CONFIGURAÇÕES PADRÃO
+# =========================
+CONFIG_PADRAO = {
+    "ATIVO": True,
+    "DIRETORIO": Path("checkpoints/http_cache"),
+    "TTL_PADRAO": 3600,                   # segundos
+    "TTL_POR_HOST": {
+        "suggestqueries.google.com": 6 * 3600
+    },
+    "TAMANHO_MAXIMO_MB": 512,
+    "FRACAO_APOS_EVICCAO": 0.9            # despeja até 90% do limite para evitar evicções seguidas
+}
+
+# =========================
+# MÉTRICAS
+# =========================
+consultas_cache_http = Counter(
+    "http_cache_consultas_total",
+    "Consultas ao cache HTTP dos coletores por resultado (hit, miss, revalidado)",
+    ["host", "resultado"]
+)
+
+CRIAR_INDICE_SQL = """
+CREATE TABLE IF NOT EXISTS respostas (
+    chave TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    hash_conteudo TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    tamanho INTEGER NOT NULL,
+    armazenado_em REAL NOT NULL,
+    acessado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_respostas_acessado_em ON respostas (acessado_em);
+CREATE INDEX IF NOT EXISTS idx_respostas_hash ON respostas (hash_conteudo);
+"""
+
+@dataclass
+class EntradaCache:
+    chave: str
+    url: str
+    status: int
+    headers: Dict[str, str]
+    texto: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    armazenado_em: float
+    ttl: float
+
+    @property
+    def fresca(self) -> bool:
+        return time.time() - self.armazenado_em < self.ttl
+
+    def headers_revalidacao(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class HttpCache:
+    """
+    Índice SQLite (url -> hash do corpo) + corpos gzip em `objetos/<hash[:2]>/<hash>.gz`.
+
+    Corpos idênticos servidos por URLs diferentes ocupam um único arquivo.
+    Entradas expiradas com ETag/Last-Modified são revalidadas com GET condicional;
+    o tamanho total é limitado por evicção LRU (coluna acessado_em).
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.diretorio = Path(self.config["DIRETORIO"])
+        self.dir_objetos = self.diretorio / "objetos"
+        self.dir_objetos.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.diretorio / "indice.db", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(CRIAR_INDICE_SQL)
+        self._tamanho_total = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        self.contadores = {"hits": 0, "misses": 0, "revalidados": 0, "armazenados": 0, "despejados": 0, "bytes_economizados": 0}
+
+    # ---- Utilidades ----
+    @staticmethod
+    def gerar_chave(url: str) -> str:
+        return hashlib.sha256(f"GET {url}".encode("utf-8")).hexdigest()
+
+    def ttl_para(self, host: str) -> float:
+        return self.config["TTL_POR_HOST"].get(host, self.config["TTL_PADRAO"])
+
+    def _caminho_objeto(self, hash_conteudo: str) -> Path:
+        return self.dir_objetos / hash_conteudo[:2] / f"{hash_conteudo}.gz"
+
+    def _contar(self, host: str, resultado: str, bytes_economizados: int = 0):
+        # Chamado das threads do executor do FetchEngine; não pode ser chamado com self._lock adquirido
+        with self._lock:
+            self.contadores[resultado] += 1
+            self.contadores["bytes_economizados"] += bytes_economizados
+        consultas_cache_http.labels(host=host, resultado=resultado).inc()
+
+    # ---- Leitura ----
+    def obter(self, url: str) -> Optional[EntradaCache]:
+        """Retorna a entrada armazenada (fresca ou não) ou None. Não altera contadores."""
+        chave = self.gerar_chave(url)
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT hash_conteudo, status, headers, etag, last_modified, armazenado_em, host "
+                "FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+        if linha is None:
+            return None
+        hash_conteudo, status, headers, etag, last_modified, armazenado_em, host = linha
+        try:
+            with gzip.open(self._caminho_objeto(hash_conteudo), "rt", encoding="utf-8") as f:
+                texto = f.read()
+        except OSError:
+            # Só descarta a linha se ela ainda aponta para o objeto que sumiu (pode ter sido substituída agora)
+            self._remover(chave, hash_conteudo)
+            return None
+        return EntradaCache(
+            chave=chave, url=url, status=status, headers=json.loads(headers), texto=texto,
+            etag=etag, last_modified=last_modified, armazenado_em=armazenado_em, ttl=self.ttl_para(host)
+        )
+
+    def registrar_hit(self, entrada: EntradaCache, revalidado: bool = False):
+        agora = time.time()
+        host = urlsplit(entrada.url).hostname or ""
+        with self._lock, self._conn:
+            if revalidado:
+                self._conn.execute(
+                    "UPDATE respostas SET armazenado_em = ?, acessado_em = ? WHERE chave = ?",
+                    (agora, agora, entrada.chave)
+                )
+            else:
+                self._conn.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, entrada.chave))
+        self._contar(host, "revalidados" if revalidado else "hits", len(entrada.texto.encode("utf-8")))
+
+    def registrar_miss(self, url: str):
+        self._contar(urlsplit(url).hostname or "", "misses")
+
+    # ---- Escrita ----
+    def armazenar(self, url: str, status: int, headers: Mapping[str, str], texto: str):
+        if "no-store" in (headers.get("Cache-Control") or "").lower():
+            return
+        corpo = texto.encode("utf-8")
+        hash_conteudo = hashlib.sha256(corpo).hexdigest()
+        agora = time.time()
+        chave = self.gerar_chave(url)
+        # Corpo e linha sob o mesmo lock: uma evicção concorrente não apaga o objeto antes da linha que o referencia
+        with self._lock, self._conn:
+            self._gravar_objeto(hash_conteudo, corpo)
+            anterior = self._conn.execute(
+                "SELECT tamanho, hash_conteudo FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            self._tamanho_total += len(corpo) - (anterior[0] if anterior else 0)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas "
+                "(chave, url, host, hash_conteudo, status, headers, etag, last_modified, tamanho, armazenado_em, acessado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    chave, url, urlsplit(url).hostname or "", hash_conteudo, status,
+                    json.dumps(dict(headers)), headers.get("ETag"), headers.get("Last-Modified"),
+                    len(corpo), agora, agora
+                )
+            )
+            # A URL mudou de corpo (SERPs mudam a cada busca): o objeto antigo sai se ninguém mais o usa
+            if anterior and anterior[1] != hash_conteudo:
+                self._liberar_objeto(anterior[1])
+            self.contadores["armazenados"] += 1
+        self._despejar_se_necessario()
+
+    def invalidar(self, url: str):
+        self._remover(self.gerar_chave(url))
+
+    def _gravar_objeto(self, hash_conteudo: str, corpo: bytes):
+        caminho = self._caminho_objeto(hash_conteudo)
+        if caminho.exists():
+            return
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_suffix(".tmp")
+        with gzip.open(temporario, "wb") as f:
+            f.write(corpo)
+        temporario.replace(caminho)
+
+    def _liberar_objeto(self, hash_conteudo: str):
+        """Apaga o corpo do disco se nenhuma resposta o referencia. Chamado com self._lock adquirido."""
+        em_uso = self._conn.execute(
+            "SELECT 1 FROM respostas WHERE hash_conteudo = ? LIMIT 1", (hash_conteudo,)
+        ).fetchone()
+        if not em_uso:
+            self._caminho_objeto(hash_conteudo).unlink(missing_ok=True)
+
+    def _remover(self, chave: str, hash_conteudo: Optional[str] = None):
+        with self._lock, self._conn:
+            linha = self._conn.execute("SELECT tamanho, hash_conteudo FROM respostas WHERE chave = ?", (chave,)).fetchone()
+            if linha and hash_conteudo in (None, linha[1]):
+                self._tamanho_total -= linha[0]
+                self._conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                self._liberar_objeto(linha[1])
+
+    def _despejar_se_necessario(self):
+        limite = self.config["TAMANHO_MAXIMO_MB"] * 1024 * 1024
+        if self._tamanho_total <= limite:
+            return
+        with self._lock:
+            total = self._tamanho_total
+            alvo = limite * self.config["FRACAO_APOS_EVICCAO"]
+            despejados = []
+            for chave, hash_conteudo, tamanho in self._conn.execute(
+                "SELECT chave, hash_conteudo, tamanho FROM respostas ORDER BY acessado_em ASC"
+            ).fetchall():
+                if total <= alvo:
+                    break
+                despejados.append((chave, hash_conteudo))
+                total -= tamanho
+            with self._conn:
+                self._conn.executemany("DELETE FROM respostas WHERE chave = ?", [(c,) for c, _ in despejados])
+            self._tamanho_total = total
+            for hash_conteudo in {h for _, h in despejados}:
+                self._liberar_objeto(hash_conteudo)
+            self.contadores["despejados"] += len(despejados)
+        logger.info(f"🧹 Cache HTTP: {len(despejados)} respostas despejadas (LRU)")
+
+    # ---- Métricas ----
+    def estatisticas(self) -> dict:
+        with self._lock:
+            contadores = dict(self.contadores)
+        consultas = contadores["hits"] + contadores["revalidados"] + contadores["misses"]
+        economizadas = contadores["hits"] + contadores["revalidados"]
+        return {
+            **contadores,
+            "taxa_acerto": round(economizadas / consultas, 4) if consultas else 0.0
+        }
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
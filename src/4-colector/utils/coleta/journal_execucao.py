@@ -0,0 +1,136 @@
+# src/coleta/journal_execucao.py
+# Journal append-only de progresso por tema (um arquivo por coletor + trace_id)
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("journal_execucao")
+
+# =========================
+# CONFIGURAÇÕES PADRÃO
+# =========================
+CONFIG_PADRAO = {
+    "DIRETORIO": Path("checkpoints/journal"),
+    "FSYNC": True
+}
+
+STATUS_OK = "ok"
+STATUS_FALHA = "falha"
+
+def _ler_registros(caminho: Path) -> Iterator[dict]:
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                logger.warning(f"⚠️ {caminho.name}: linha truncada ignorada.")
+                return
+
+class JournalExecucao:
+    """
+    Registra, a cada tema processado, uma linha `{coletor, trace_id, tema,
+    status, duracao_s, itens, erro, registrado_em}` em
+    `<DIRETORIO>/<coletor>_<trace_id>.ndjson`. Reabrir o mesmo coletor e
+    trace_id continua o arquivo e permite pular os temas já concluídos.
+    """
+
+    def __init__(self, coletor: str, trace_id: str, config: Optional[dict] = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.coletor = coletor
+        self.trace_id = trace_id
+        diretorio = Path(self.config["DIRETORIO"])
+        diretorio.mkdir(parents=True, exist_ok=True)
+        self.caminho = diretorio / f"{coletor}_{trace_id}.ndjson"
+
+        # último status de cada tema nesta execução
+        self.estado: Dict[str, dict] = {}
+        if self.caminho.exists():
+            for registro in _ler_registros(self.caminho):
+                self.estado[registro["tema"]] = registro
+            logger.info(f"⏩ Journal {self.caminho.name}: {len(self.concluidos())} temas já concluídos.")
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+
+    def registrar(
+        self,
+        tema: str,
+        status: str,
+        duracao_s: float = 0.0,
+        itens: int = 0,
+        erro: Optional[str] = None,
+        coletor: Optional[str] = None
+    ):
+        """`coletor` permite registrar em nome de outro coletor (ex.: reprocessamento de falhas)."""
+        registro = {
+            "coletor": coletor or self.coletor,
+            "trace_id": self.trace_id,
+            "tema": tema,
+            "status": status,
+            "duracao_s": round(duracao_s, 3),
+            "itens": itens,
+            "erro": erro,
+            "registrado_em": datetime.now().isoformat()
+        }
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        if self.config["FSYNC"]:
+            os.fsync(self._arquivo.fileno())
+        self.estado[tema] = registro
+
+    def concluidos(self) -> List[str]:
+        return [tema for tema, r in self.estado.items() if r["status"] == STATUS_OK]
+
+    def falhos(self) -> List[str]:
+        return [tema for tema, r in self.estado.items() if r["status"] == STATUS_FALHA]
+
+    def pendentes(self, temas: Iterable[str], confirmado: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """
+        Temas ainda não concluídos nesta execução. Com `confirmado`, um tema só
+        é pulado se também estiver confirmado por ele (ex.: já gravado pelo exportador).
+        """
+        pulados = set(self.concluidos())
+        if confirmado is not None:
+            pulados = {t for t in pulados if confirmado(t)}
+        restantes = [t for t in temas if t not in pulados]
+        if pulados:
+            logger.info(f"⏩ {self.coletor} [{self.trace_id}]: {len(pulados)} temas pulados, {len(restantes)} pendentes.")
+        return restantes
+
+    def fechar(self):
+        if not self._arquivo.closed:
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fechar()
+        return False
+
+# =========================
+# CONSULTA AOS JOURNALS
+# =========================
+def listar_journals(coletor: Optional[str] = None, diretorio: Optional[Path] = None) -> List[Path]:
+    diretorio = Path(diretorio or CONFIG_PADRAO["DIRETORIO"])
+    if not diretorio.exists():
+        return []
+    padrao = f"{coletor}_*.ndjson" if coletor else "*.ndjson"
+    return sorted(diretorio.glob(padrao))
+
+def falhas_pendentes(diretorio: Optional[Path] = None) -> List[Tuple[str, str]]:
+    """
+    (coletor, tema) cujo registro mais recente, considerando todos os journals,
+    ainda é uma falha. Um sucesso posterior (nova execução ou reprocessamento)
+    resolve a falha.
+    """
+    ultimos: Dict[Tuple[str, str], dict] = {}
+    for caminho in listar_journals(diretorio=diretorio):
+        for registro in _ler_registros(caminho):
+            chave = (registro["coletor"], registro["tema"])
+            atual = ultimos.get(chave)
+            if atual is None or registro["registrado_em"] >= atual["registrado_em"]:
+                ultimos[chave] = registro
+    return [chave for chave, r in ultimos.items() if r["status"] == STATUS_FALHA]
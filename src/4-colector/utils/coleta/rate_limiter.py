@@ -0,0 +1,137 @@
+# src/coleta/rate_limiter.py
+# Limitador de taxa por domínio (token bucket) com ajuste adaptativo AIMD
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger("rate_limiter")
+
+# =========================
+# CONFIGURAÇÕES PADRÃO
+# =========================
+CONFIG_PADRAO = {
+    "TAXA_INICIAL": 2.0,          # requisições/segundo por domínio
+    "TAXA_MINIMA": 0.05,
+    "TAXA_MAXIMA": 10.0,
+    "RAJADA": 2,                  # capacidade do bucket
+    "INCREMENTO_ADITIVO": 0.1,    # +req/s a cada resposta bem-sucedida
+    "FATOR_REDUCAO": 0.5,         # taxa *= fator a cada 403/429
+    "COOLDOWN_PADRAO": 60,        # segundos, quando não há Retry-After
+    "COOLDOWN_MAXIMO": 900,
+    "STATUS_BLOQUEIO": (403, 429),
+    "TAXAS_POR_HOST": {}          # ex.: {"suggestqueries.google.com": 1.0}
+}
+
+# =========================
+# ESTADO POR DOMÍNIO
+# =========================
+@dataclass
+class EstadoDominio:
+    taxa: float
+    capacidade: float
+    tokens: float
+    ultimo_refill: float = field(default_factory=time.monotonic)
+    bloqueado_ate: float = 0.0
+    bloqueios_consecutivos: int = 0
+    total_bloqueios: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def repor_tokens(self, agora: float):
+        decorrido = agora - self.ultimo_refill
+        self.tokens = min(self.capacidade, self.tokens + decorrido * self.taxa)
+        self.ultimo_refill = agora
+
+def interpretar_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Converte o header Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+
+# =========================
+# LIMITADOR
+# =========================
+class RateLimiterDominio:
+    """
+    Token bucket por domínio. Um domínio em cooldown só estaciona a própria
+    fila: as corrotinas de outros hosts continuam adquirindo tokens normalmente.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self._dominios: Dict[str, EstadoDominio] = {}
+
+    def _estado(self, host: str) -> EstadoDominio:
+        estado = self._dominios.get(host)
+        if estado is None:
+            taxa = self.config["TAXAS_POR_HOST"].get(host, self.config["TAXA_INICIAL"])
+            capacidade = float(self.config["RAJADA"])
+            estado = EstadoDominio(taxa=taxa, capacidade=capacidade, tokens=capacidade)
+            self._dominios[host] = estado
+        return estado
+
+    async def adquirir(self, host: str):
+        estado = self._estado(host)
+        # O lock serializa a fila do domínio: quem espera cooldown segura apenas este host.
+        async with estado.lock:
+            while True:
+                agora = time.monotonic()
+                if estado.bloqueado_ate > agora:
+                    await asyncio.sleep(estado.bloqueado_ate - agora)
+                    continue
+                estado.repor_tokens(agora)
+                if estado.tokens >= 1:
+                    estado.tokens -= 1
+                    return
+                await asyncio.sleep((1 - estado.tokens) / estado.taxa)
+
+    def registrar_resposta(self, host: str, status: int, headers: Optional[Mapping[str, str]] = None):
+        if status in self.config["STATUS_BLOQUEIO"]:
+            retry_after = interpretar_retry_after((headers or {}).get("Retry-After"))
+            self.penalizar(host, retry_after, motivo=f"HTTP {status}")
+        elif 200 <= status < 400:
+            self._aumentar(host)
+
+    def penalizar(self, host: str, segundos: Optional[float] = None, motivo: str = "bloqueio"):
+        """Reduz a taxa do domínio (multiplicativo) e o coloca em cooldown."""
+        estado = self._estado(host)
+        estado.bloqueios_consecutivos += 1
+        estado.total_bloqueios += 1
+        estado.taxa = max(self.config["TAXA_MINIMA"], estado.taxa * self.config["FATOR_REDUCAO"])
+        estado.tokens = 0.0
+        if segundos is None:
+            segundos = self.config["COOLDOWN_PADRAO"] * 2 ** (estado.bloqueios_consecutivos - 1)
+        segundos = min(float(segundos), self.config["COOLDOWN_MAXIMO"])
+        estado.bloqueado_ate = max(estado.bloqueado_ate, time.monotonic() + segundos)
+        logger.warning(
+            f"🧊 {host} em cooldown por {segundos:.0f}s ({motivo}) | nova taxa={estado.taxa:.2f} req/s"
+        )
+
+    def _aumentar(self, host: str):
+        estado = self._estado(host)
+        estado.bloqueios_consecutivos = 0
+        estado.taxa = min(self.config["TAXA_MAXIMA"], estado.taxa + self.config["INCREMENTO_ADITIVO"])
+
+    def estado(self) -> Dict[str, dict]:
+        agora = time.monotonic()
+        return {
+            host: {
+                "taxa": round(e.taxa, 3),
+                "cooldown_restante": round(max(0.0, e.bloqueado_ate - agora), 1),
+                "total_bloqueios": e.total_bloqueios
+            }
+            for host, e in self._dominios.items()
+        }
@@ -0,0 +1,49 @@
+# src/coleta/registro_coletores.py
+# Registro dos coletores disponíveis por nome de origem
+
+import importlib
+import logging
+from typing import Dict, List, Type
+
+from coleta.coletor_base import ColetorBase
+
+logger = logging.getLogger("registro_coletores")
+
+# Módulo que registra cada fonte ao ser importado; só é importado quando a fonte é usada
+FONTES = {
+    "amazon": "amazon_collector_enterprise_plus",
+    "discord": "discord_collector_enterprise_plus",
+    "google_autocomplete": "google_autocomplete",
+    "google_trends": "google_trends",
+    "instagram": "instagram_collector_enterprise_plus",
+    "linkedin": "linkedin_collector_enterprise_plus",
+    "medium": "medium_collector_enterprise_plus_final",
+    "pinterest": "pinterest_collector_enterprise",
+    "quora": "quora_collector_enterprise_plus",
+    "reddit": "reddit_collector",
+    "tiktok": "tiktok_collector",
+    "twitter": "twitter_collector_enterprise_plus",
+    "youtube": "youtube_collector"
+}
+
+_registro: Dict[str, Type[ColetorBase]] = {}
+
+def registrar_coletor(classe: Type[ColetorBase]) -> Type[ColetorBase]:
+    """Decorador usado pelos módulos de coleta: `@registrar_coletor class ColetorX(ColetorBase)`."""
+    if not classe.nome:
+        raise ValueError(f"Coletor {classe.__name__} sem nome de origem.")
+    _registro[classe.nome] = classe
+    return classe
+
+def obter_coletor(nome: str, **kwargs) -> ColetorBase:
+    if nome not in _registro:
+        modulo = FONTES.get(nome)
+        if modulo is None:
+            raise KeyError(f"Fonte desconhecida: '{nome}'. Disponíveis: {listar_coletores()}")
+        importlib.import_module(modulo)
+        if nome not in _registro:
+            raise KeyError(f"Módulo '{modulo}' não registrou o coletor '{nome}'.")
+    return _registro[nome](**kwargs)
+
+def listar_coletores() -> List[str]:
+    return sorted(set(FONTES) | set(_registro))
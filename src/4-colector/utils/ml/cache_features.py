@@ -0,0 +1,163 @@
+# src/ml/cache_features.py
+# Extração de features de treino em paralelo, com cache em disco por amostra
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ml.feature_engineering import extrair_features_lote, assinatura_features
+
+logger = logging.getLogger("cache_features")
+
+CONFIG_PADRAO = {
+    "DIRETORIO": Path("src/ml/cache_features"),
+    "PROCESSOS": os.cpu_count() or 1,
+    "TAMANHO_BLOCO": 2000  # amostras por tarefa do pool (cada tarefa é um nlp.pipe)
+}
+
+# =========================
+# AMOSTRAS
+# =========================
+def hash_amostra(texto: str, tema: str, origem: str, tags: list) -> str:
+    """Identifica a amostra pelo que entra na extração; o rótulo fica de fora."""
+    return hashlib.sha1(json.dumps([texto, tema, origem, tags], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def ler_amostras(caminho: Path) -> Iterator[Tuple[Tuple[str, str, str, list], int]]:
+    """Lê o JSONL rotulado linha a linha: ((texto, tema, origem, tags), rótulo)."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        for numero, linha in enumerate(f, start=1):
+            if not linha.strip():
+                continue
+            try:
+                dado = json.loads(linha)
+                item = (dado["texto"], dado["tema"], dado.get("origem", "desconhecida"), dado.get("tags", []))
+                yield item, int(dado["relevante"])
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Linha {numero} ignorada em {caminho}: {e}")
+
+def _extrair_bloco(itens: List[Tuple[str, str, str, list]]) -> Tuple[np.ndarray, np.ndarray]:
+    # Executa no processo do pool: spaCy carregado uma vez por processo, tabela de embeddings via page cache
+    return extrair_features_lote(itens)
+
+# =========================
+# CACHE EM DISCO
+# =========================
+class CacheFeatures:
+    """
+    Features já extraídas, indexadas pelo hash da amostra. Um arquivo `.npz`
+    por assinatura de features: mudar a extração ou os embeddings começa um
+    cache novo em vez de misturar vetores incompatíveis.
+    """
+
+    def __init__(self, diretorio: Optional[Path] = None, assinatura: Optional[str] = None):
+        self.assinatura = assinatura or assinatura_features()
+        sufixo = hashlib.sha1(self.assinatura.encode("utf-8")).hexdigest()[:12]
+        self.caminho = Path(diretorio or CONFIG_PADRAO["DIRETORIO"]) / f"features_{sufixo}.npz"
+        self.indice: Dict[str, int] = {}
+        self.escalares: Optional[np.ndarray] = None
+        self.embeddings: Optional[np.ndarray] = None
+
+    def carregar(self) -> "CacheFeatures":
+        if self.caminho.exists():
+            with np.load(self.caminho) as dados:
+                chaves = dados["chaves"]
+                self.escalares = dados["escalares"]
+                self.embeddings = dados["embeddings"]
+            self.indice = {chave.decode("ascii"): i for i, chave in enumerate(chaves)}
+            logger.info(f"📦 Cache de features {self.caminho.name}: {len(self.indice)} amostras")
+        return self
+
+    def __contains__(self, chave: str) -> bool:
+        return chave in self.indice
+
+    def salvar(self, chaves: List[str], escalares: np.ndarray, embeddings: np.ndarray):
+        """Regrava o cache com exatamente estas amostras (as removidas do dataset saem do cache)."""
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho.with_suffix(".tmp.npz")
+        np.savez(temporario, chaves=np.array(chaves, dtype="S40"), escalares=escalares, embeddings=embeddings)
+        os.replace(temporario, self.caminho)
+        self.indice = {chave: i for i, chave in enumerate(chaves)}
+        self.escalares, self.embeddings = escalares, embeddings
+
+# =========================
+# EXTRAÇÃO INCREMENTAL
+# =========================
+def carregar_features_treino(
+    caminho_dataset: Path,
+    diretorio_cache: Optional[Path] = None,
+    processos: Optional[int] = None,
+    tamanho_bloco: Optional[int] = None,
+    usar_cache: bool = True
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lê o dataset em streaming e devolve (escalares, embeddings, rótulos) alinhados
+    às linhas válidas. Só as amostras novas ou alteradas desde o último treino
+    passam pelo spaCy, em blocos distribuídos por um pool de processos enquanto
+    o arquivo ainda está sendo lido.
+    """
+    processos = processos or CONFIG_PADRAO["PROCESSOS"]
+    tamanho_bloco = tamanho_bloco or CONFIG_PADRAO["TAMANHO_BLOCO"]
+    cache = CacheFeatures(diretorio_cache)
+    if usar_cache:
+        cache.carregar()
+
+    inicio = time.perf_counter()
+    chaves, rotulos = [], []
+    novas: Dict[str, None] = {}   # ordem de submissão, sem duplicatas
+    bloco, blocos = [], []
+    pool = ProcessPoolExecutor(max_workers=processos) if processos > 1 else None
+    try:
+        def enviar():
+            if bloco:
+                itens = list(bloco)
+                blocos.append((pool.submit(_extrair_bloco, itens) if pool else None, itens))
+                bloco.clear()
+
+        for item, rotulo in ler_amostras(caminho_dataset):
+            chave = hash_amostra(*item)
+            chaves.append(chave)
+            rotulos.append(rotulo)
+            if chave in cache or chave in novas:
+                continue
+            novas[chave] = None
+            bloco.append(item)
+            if len(bloco) >= tamanho_bloco:
+                enviar()
+        enviar()
+
+        resultados = [futuro.result() if futuro else _extrair_bloco(itens) for futuro, itens in blocos]
+    finally:
+        if pool:
+            pool.shutdown()
+
+    logger.info(
+        f"🧮 Features: {len(chaves)} amostras | {len(novas)} extraídas agora | "
+        f"{len(chaves) - len(novas)} do cache | {time.perf_counter() - inicio:.1f}s"
+    )
+    if not chaves:
+        return np.empty((0, 0), np.float32), np.empty((0, 0), np.float32), np.empty(0, np.int64)
+
+    # Junta cache + novas numa única tabela e monta as matrizes na ordem do dataset
+    unicas = list(dict.fromkeys(chaves))
+    novas_escalares = [e for e, _ in resultados]
+    novas_embeddings = [m for _, m in resultados]
+    if cache.escalares is not None and len(cache.indice):
+        novas_escalares.insert(0, cache.escalares)
+        novas_embeddings.insert(0, cache.embeddings)
+    escalares_todos = np.concatenate(novas_escalares)
+    embeddings_todos = np.concatenate(novas_embeddings)
+    posicao = {**cache.indice, **{c: len(cache.indice) + i for i, c in enumerate(novas)}}
+
+    linhas_unicas = np.fromiter((posicao[c] for c in unicas), dtype=np.int64, count=len(unicas))
+    if usar_cache:
+        cache.salvar(unicas, escalares_todos[linhas_unicas], embeddings_todos[linhas_unicas])
+
+    linhas = np.fromiter((posicao[c] for c in chaves), dtype=np.int64, count=len(chaves))
+    return escalares_todos[linhas], embeddings_todos[linhas], np.asarray(rotulos, dtype=np.int64)
@@ -0,0 +1,108 @@
+# src/ml/cliente_relevancia.py
+# Cliente do servidor local de relevância: mesma interface de prever_relevancia / prever_relevancia_lote
+
+import http.client
+import json
+import logging
+import os
+import socket
+import threading
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("cliente_relevancia")
+
+CONFIG_PADRAO = {
+    "SOCKET": os.getenv("RELEVANCIA_SOCKET", "/tmp/omni_relevancia.sock"),
+    "TIMEOUT": 30.0,
+    # Sem servidor no socket, prediz no próprio processo em vez de falhar
+    "FALLBACK_LOCAL": True
+}
+
+class _ConexaoUnix(http.client.HTTPConnection):
+    def __init__(self, caminho: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.caminho = caminho
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.caminho)
+
+class ClienteRelevancia:
+    """
+    Envia os itens ao `ServidorRelevancia` por HTTP sobre unix socket, com uma
+    conexão keep-alive por thread. Pedidos simultâneos de vários coletores
+    são agrupados pelo servidor numa única chamada ao modelo.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self._local = threading.local()
+        self._aviso_fallback = False
+
+    def _conexao(self) -> _ConexaoUnix:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = _ConexaoUnix(self.config["SOCKET"], self.config["TIMEOUT"])
+            self._local.conexao = conexao
+        return conexao
+
+    def _post(self, corpo: bytes) -> dict:
+        # Uma nova tentativa cobre a conexão keep-alive fechada pelo servidor entre pedidos
+        for tentativa in range(2):
+            conexao = self._conexao()
+            try:
+                conexao.request("POST", "/prever", body=corpo, headers={"Content-Type": "application/json"})
+                resposta = conexao.getresponse()
+                dados = json.loads(resposta.read())
+            except (http.client.HTTPException, ConnectionError, BrokenPipeError):
+                conexao.close()
+                self._local.conexao = None
+                if tentativa:
+                    raise
+                continue
+            if resposta.status != 200:
+                raise ValueError(f"Servidor de relevância respondeu {resposta.status}: {dados.get('erro')}")
+            return dados
+
+    def _prever_local(self, itens, debug, threshold):
+        if not self._aviso_fallback:
+            logger.warning(f"⚠️ Servidor de relevância indisponível em {self.config['SOCKET']}; predizendo localmente.")
+            self._aviso_fallback = True
+        from ml.relevance_predictor import prever_relevancia_lote as prever_local
+        return prever_local(itens, debug, threshold)
+
+    def prever_lote(self, itens: Iterable[tuple], debug: bool = False, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        itens = [list(item) for item in itens]
+        if not itens:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.float64)
+        corpo = json.dumps({"itens": itens, "threshold": threshold}, ensure_ascii=False).encode("utf-8")
+        try:
+            dados = self._post(corpo)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            if not self.config["FALLBACK_LOCAL"]:
+                raise
+            logger.debug(f"Falha ao conectar ao servidor de relevância: {e}")
+            return self._prever_local(itens, debug, threshold)
+        return np.asarray(dados["validos"], dtype=bool), np.asarray(dados["escores"], dtype=np.float64)
+
+    def prever(self, texto: str, tema: str, origem: str, tags: list, debug: bool = False, threshold: float = 0.5) -> Tuple[bool, float]:
+        validos, escores = self.prever_lote([(texto, tema, origem, tags)], debug, threshold)
+        return bool(validos[0]), float(escores[0])
+
+# Interface funcional, com as mesmas assinaturas de ml.relevance_predictor
+_cliente_padrao: Optional[ClienteRelevancia] = None
+
+def _obter_cliente() -> ClienteRelevancia:
+    global _cliente_padrao
+    if _cliente_padrao is None:
+        _cliente_padrao = ClienteRelevancia()
+    return _cliente_padrao
+
+def prever_relevancia(texto: str, tema: str, origem: str, tags: list, debug: bool = False, threshold: float = 0.5) -> Tuple[bool, float]:
+    return _obter_cliente().prever(texto, tema, origem, tags, debug, threshold)
+
+def prever_relevancia_lote(itens: Iterable[tuple], debug: bool = False, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    return _obter_cliente().prever_lote(itens, debug, threshold)
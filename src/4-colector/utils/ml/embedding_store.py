@@ -0,0 +1,180 @@
+# src/ml/embedding_store.py
+# Tabela de embeddings pré-calculada e mapeada em memória (compartilhada entre processos via page cache)
+#
+# Construção (uma vez por modelo):
+#   python src/4-colector/utils/ml/embedding_store.py --modelo pt_core_news_md --saida src/ml/embeddings/pt_core_news_md
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("embedding_store")
+
+CONFIG_PADRAO = {
+    "DIRETORIO": Path(os.getenv("EMBEDDINGS_PATH", "src/ml/embeddings/pt_core_news_md")),
+    # "zero": token fora do vocabulário entra na média como vetor nulo (igual ao Doc.vector do spaCy)
+    # "ignorar": a média considera só os tokens conhecidos
+    "OOV": "zero",
+    "TAMANHO_MAXIMO_TOKEN": 32  # bytes; tokens maiores ficam fora da tabela e contam como OOV
+}
+
+ARQUIVO_VETORES = "vetores.npy"
+ARQUIVO_VOCAB = "vocab.npy"
+ARQUIVO_META = "meta.json"
+
+# =========================
+# TABELA
+# =========================
+class TabelaEmbeddings:
+    """
+    Vetores por token normalizado (minúsculo, sem acento e sem pontuação,
+    como `normalizar_texto`). Os dois arrays são abertos com `mmap_mode="r"`:
+    vários processos que abrem a mesma tabela usam as mesmas páginas do
+    page cache em vez de cada um carregar os vetores do spaCy.
+
+    `vocab` é um array ordenado de bytes de largura fixa, e a busca dos ids
+    é um `searchsorted` sobre todos os tokens do lote. A última linha de
+    `vetores` é nula e serve de id para tokens fora do vocabulário.
+    """
+
+    def __init__(self, diretorio: Path, oov: Optional[str] = None):
+        self.diretorio = Path(diretorio)
+        self.meta = json.loads((self.diretorio / ARQUIVO_META).read_text(encoding="utf-8"))
+        self.oov = oov or CONFIG_PADRAO["OOV"]
+        self._vetores = np.load(self.diretorio / ARQUIVO_VETORES, mmap_mode="r")
+        self._vocab = np.load(self.diretorio / ARQUIVO_VOCAB, mmap_mode="r")
+        self.id_oov = len(self._vocab)
+        self.tamanho_maximo = self._vocab.dtype.itemsize
+
+    @property
+    def dimensao(self) -> int:
+        return self._vetores.shape[1]
+
+    def __len__(self) -> int:
+        return self.id_oov
+
+    def ids(self, tokens: Sequence[str]) -> np.ndarray:
+        """Ids dos tokens (já normalizados); `id_oov` para os ausentes."""
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        consulta = np.array(tokens, dtype=self._vocab.dtype)
+        posicoes = np.searchsorted(self._vocab, consulta)
+        posicoes[posicoes == self.id_oov] = 0
+        encontrados = self._vocab[posicoes] == consulta
+        # np.array trunca silenciosamente tokens maiores que a largura do vocabulário
+        encontrados &= np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens)) <= self.tamanho_maximo
+        return np.where(encontrados, posicoes, self.id_oov)
+
+    def vetores(self, textos_normalizados: Sequence[str]) -> np.ndarray:
+        """Média dos vetores dos tokens de cada texto: matriz float32 (n, dimensao)."""
+        n = len(textos_normalizados)
+        if n == 0:
+            return np.empty((0, self.dimensao), dtype=np.float32)
+
+        # Texto vazio vira um token OOV para nenhum segmento do reduceat ficar vazio
+        tokens_por_texto = [t.split() or [""] for t in textos_normalizados]
+        contagens = np.fromiter(map(len, tokens_por_texto), dtype=np.int64, count=n)
+        ids = self.ids(list(chain.from_iterable(tokens_por_texto)))
+        inicios = np.concatenate(([0], np.cumsum(contagens)[:-1]))
+
+        # A linha OOV é nula: não altera a soma, só o denominador depende do modo
+        soma = np.add.reduceat(self._vetores[ids], inicios, axis=0, dtype=np.float32)
+        if self.oov == "ignorar":
+            contagens = np.add.reduceat((ids != self.id_oov).astype(np.int64), inicios)
+        return soma / np.maximum(contagens, 1)[:, None].astype(np.float32)
+
+    def vetor(self, texto_normalizado: str) -> np.ndarray:
+        return self.vetores([texto_normalizado])[0]
+
+# =========================
+# INSTÂNCIA POR PROCESSO
+# =========================
+_tabelas = {}
+_lock = threading.Lock()
+
+def obter_tabela(diretorio: Optional[Path] = None) -> Optional[TabelaEmbeddings]:
+    """
+    Abre a tabela uma vez por processo. Retorna None (e avisa uma vez) se
+    ela ainda não foi construída; quem chama volta para os vetores do spaCy.
+    """
+    diretorio = Path(diretorio or CONFIG_PADRAO["DIRETORIO"])
+    if diretorio in _tabelas:
+        return _tabelas[diretorio]
+    with _lock:
+        if diretorio not in _tabelas:
+            if not (diretorio / ARQUIVO_META).exists():
+                logger.warning(f"⚠️ Tabela de embeddings não encontrada em {diretorio}; usando vetores do spaCy.")
+                _tabelas[diretorio] = None
+            else:
+                inicio = time.perf_counter()
+                tabela = TabelaEmbeddings(diretorio)
+                logger.info(
+                    f"🗺️ Embeddings mapeados de {diretorio} em {time.perf_counter() - inicio:.3f}s "
+                    f"| {len(tabela)} tokens x {tabela.dimensao} ({tabela.meta['dtype']})"
+                )
+                _tabelas[diretorio] = tabela
+    return _tabelas[diretorio]
+
+# =========================
+# CONSTRUÇÃO
+# =========================
+def construir_tabela(modelo: str, destino: Path, float16: bool = False) -> Path:
+    """Exporta os vetores estáticos de um modelo spaCy para `destino`, indexados pelo token normalizado."""
+    from ml.feature_engineering import normalizar_texto
+    from ml.nlp_registry import obter_modelo, COMPONENTES_SO_NER
+
+    nlp = obter_modelo(modelo, COMPONENTES_SO_NER + ("ner",))
+    vetores_spacy = nlp.vocab.vectors
+    if vetores_spacy.shape[0] == 0:
+        raise ValueError(f"Modelo '{modelo}' não tem vetores estáticos.")
+
+    tamanho_maximo = CONFIG_PADRAO["TAMANHO_MAXIMO_TOKEN"]
+    linhas = {}
+    for chave, linha in vetores_spacy.key2row.items():
+        original = nlp.vocab.strings[chave]
+        token = normalizar_texto(original)
+        if not token or " " in token or len(token) > tamanho_maximo:
+            continue
+        # Várias grafias colapsam no mesmo token normalizado; a que já está normalizada tem prioridade
+        if token not in linhas or original == token:
+            linhas[token] = linha
+
+    tokens = sorted(linhas)
+    dtype = np.float16 if float16 else np.float32
+    matriz = np.zeros((len(tokens) + 1, vetores_spacy.shape[1]), dtype=dtype)
+    matriz[:-1] = np.asarray(vetores_spacy.data)[[linhas[t] for t in tokens]]
+
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    np.save(destino / ARQUIVO_VETORES, matriz)
+    np.save(destino / ARQUIVO_VOCAB, np.array(tokens, dtype=f"S{tamanho_maximo}"))
+    # meta.json por último: a tabela só é considerada pronta quando ele existe
+    (destino / ARQUIVO_META).write_text(json.dumps({
+        "modelo": modelo,
+        "tokens": len(tokens),
+        "dimensao": int(matriz.shape[1]),
+        "dtype": np.dtype(dtype).name,
+        "criado_em": datetime.now().isoformat()
+    }, indent=2), encoding="utf-8")
+    logger.info(f"✅ Tabela de embeddings salva em {destino}: {len(tokens)} tokens, {matriz.nbytes / 2**20:.1f} MB")
+    return destino
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Constrói a tabela de embeddings mapeada em memória")
+    parser.add_argument("--modelo", default="pt_core_news_md")
+    parser.add_argument("--saida", type=Path, default=CONFIG_PADRAO["DIRETORIO"])
+    parser.add_argument("--float16", action="store_true", help="Metade do tamanho em disco/memória; a média é feita em float32")
+    args = parser.parse_args()
+    construir_tabela(args.modelo, args.saida, float16=args.float16)
@@ -3,16 +3,35 @@
 import re
 import string
 import unicodedata
-import spacy
 import numpy as np
-from typing import TypedDict
+from typing import Optional, Sequence, Tuple, TypedDict
 
-# Carrega modelo spaCy
-nlp = spacy.load("pt_core_news_sm")
+from ml.nlp_registry import modelo_preguicoso, COMPONENTES_SO_NER
+from ml.embedding_store import obter_tabela
+
+# Modelo spaCy compartilhado (carregado no primeiro uso; só NER e vetores são necessários)
+nlp = modelo_preguicoso("pt_core_news_sm", desativar=COMPONENTES_SO_NER)
+
+# Features numéricas na ordem das colunas de treino (sem "origem", que é texto, e sem o embedding)
+FEATURES_NUMERICAS = (
+    "qtde_palavras", "contagem_caracteres", "contem_ano", "qtde_entidades",
+    "contem_modificadores", "tema_igual", "qtde_tags"
+)
+
+DIM_EMBEDDING = 300
+BATCH_SIZE_PADRAO = 256
+
+# Incrementar sempre que a extração mudar: invalida o cache de features de treino
+VERSAO_FEATURES = 1
 
 # Lista de palavras modificadoras
 MODIFICADORES = ["melhor", "mais barato", "top", "2024", "em promoção", "funcional"]
 
+# Padrões aplicados de uma vez sobre os textos do lote unidos por "\n"
+PADRAO_ANO = re.compile(r"\b20\d{2}\b")
+PADRAO_MODIFICADORES = re.compile("|".join(re.escape(m) for m in MODIFICADORES))
+_SEM_PONTUACAO = str.maketrans("", "", string.punctuation)
+
 # ---- TypedDict para padronizar saída ----
 class FeaturesDict(TypedDict):
     qtde_palavras: int
@@ -29,7 +48,7 @@ class FeaturesDict(TypedDict):
 def normalizar_texto(texto):
     texto = texto.lower().strip()
     texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("utf-8")
-    texto = texto.translate(str.maketrans("", "", string.punctuation))
+    texto = texto.translate(_SEM_PONTUACAO)
     return texto
 
 # ---- Contadores auxiliares ----
@@ -41,22 +60,113 @@ def contem_modificadores(texto):
     texto_normalizado = normalizar_texto(texto)
     return int(any(mod in texto_normalizado for mod in MODIFICADORES))
 
+# ---- Extração em lote (colunar) ----
+def _linhas_com_ocorrencia(padrao: re.Pattern, textos: Sequence[str]) -> np.ndarray:
+    """Marca os textos com ao menos uma ocorrência do padrão, com uma única varredura do lote."""
+    marcados = np.zeros(len(textos), dtype=bool)
+    if not textos:
+        return marcados
+    tamanhos = np.fromiter(map(len, textos), dtype=np.int64, count=len(textos))
+    inicios = np.cumsum(tamanhos + 1) - (tamanhos + 1)  # +1 pelo separador "\n"
+    posicoes = np.fromiter((m.start() for m in padrao.finditer("\n".join(textos))), dtype=np.int64)
+    marcados[np.searchsorted(inicios, posicoes, side="right") - 1] = True
+    return marcados
+
+# ---- Origem dos embeddings ----
+def fonte_embeddings() -> str:
+    """
+    De onde vêm os embeddings agora: "tabela:<modelo>" se a tabela mapeada
+    existe, senão "spacy:<modelo>" (Doc.vector). São espaços vetoriais
+    diferentes: o treino grava este valor no modelo (`fonte_features_`).
+    """
+    tabela = obter_tabela()
+    return f"tabela:{tabela.meta['modelo']}" if tabela is not None else f"spacy:{nlp.nome}"
+
+def _tabela_para(fonte: Optional[str]):
+    """Tabela a usar para a `fonte` pedida (None = a ativa); erro se ela não pode ser reproduzida aqui."""
+    tabela = obter_tabela()
+    if fonte is None:
+        return tabela
+    if fonte == f"spacy:{nlp.nome}":
+        return None
+    if tabela is not None and fonte == f"tabela:{tabela.meta['modelo']}":
+        return tabela
+    raise ValueError(f"Embeddings '{fonte}' indisponíveis neste processo (fonte ativa: {fonte_embeddings()})")
+
+def extrair_features_lote(
+    itens: Sequence[Tuple[str, str, str, list]],
+    batch_size: int = BATCH_SIZE_PADRAO,
+    fonte: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features de N itens (texto, tema, origem, tags) de uma vez.
+
+    Retorna dois arrays float32 alinhados à entrada:
+    - escalares (N, len(FEATURES_NUMERICAS)), colunas na ordem de FEATURES_NUMERICAS
+    - embeddings (N, DIM_EMBEDDING no máximo)
+
+    Entidades vêm de uma passada de `nlp.pipe`; ano e modificadores, de uma
+    varredura de regex sobre o lote inteiro; embeddings, da tabela mapeada
+    em memória (ou dos vetores do spaCy, se a tabela não existir).
+
+    `fonte` (como em `fonte_embeddings`) fixa a origem dos embeddings, ex.:
+    a do modelo que vai consumir as features; ValueError se não houver.
+    """
+    n = len(itens)
+    textos_norm = [normalizar_texto(texto) for texto, _, _, _ in itens]
+    temas_norm = np.array([normalizar_texto(str(tema)) for _, tema, _, _ in itens], dtype=object)
+
+    tabela = _tabela_para(fonte)
+    docs = nlp.pipe(textos_norm, batch_size=batch_size)
+    qtde_entidades = np.empty(n, dtype=np.float32)
+    vetores_spacy = [] if tabela is None else None
+    for i, doc in enumerate(docs):
+        qtde_entidades[i] = len(doc.ents)
+        if vetores_spacy is not None:
+            vetores_spacy.append(doc.vector[:DIM_EMBEDDING])
+
+    escalares = np.empty((n, len(FEATURES_NUMERICAS)), dtype=np.float32)
+    escalares[:, 0] = np.fromiter((len(t.split()) for t in textos_norm), dtype=np.float32, count=n)
+    escalares[:, 1] = np.fromiter(map(len, textos_norm), dtype=np.float32, count=n)
+    escalares[:, 2] = _linhas_com_ocorrencia(PADRAO_ANO, textos_norm)
+    escalares[:, 3] = qtde_entidades
+    escalares[:, 4] = _linhas_com_ocorrencia(PADRAO_MODIFICADORES, textos_norm)
+    escalares[:, 5] = np.array(textos_norm, dtype=object) == temas_norm
+    escalares[:, 6] = np.fromiter((len(tags) for _, _, _, tags in itens), dtype=np.float32, count=n)
+
+    if tabela is not None:
+        embeddings = tabela.vetores(textos_norm)[:, :DIM_EMBEDDING]
+    elif vetores_spacy:
+        embeddings = np.vstack(vetores_spacy).astype(np.float32, copy=False)
+    else:
+        embeddings = np.empty((0, 0), dtype=np.float32)
+    return escalares, np.ascontiguousarray(embeddings)
+
+def assinatura_features() -> str:
+    """Identifica o que produz as features: versão da extração + origem dos embeddings (tabela ou spaCy)."""
+    tabela = obter_tabela()
+    if tabela is not None:
+        embeddings = f"tabela-{tabela.meta['modelo']}-{tabela.meta['dtype']}-{tabela.meta['criado_em']}"
+    else:
+        embeddings = "spacy"
+    return f"v{VERSAO_FEATURES}|ner-{nlp.nome}|{embeddings}"
+
+def montar_matriz(escalares: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+    """Matriz float32 contígua na ordem de colunas do treino: FEATURES_NUMERICAS + embedding."""
+    return np.hstack((escalares, embeddings)).astype(np.float32, copy=False)
+
+def validar_embeddings(embeddings: np.ndarray) -> bool:
+    """Equivalente em lote de `validar_features`: o vetor semântico precisa ter ao menos 100 dimensões."""
+    return embeddings.ndim == 2 and embeddings.shape[1] >= 100
+
 # ---- Função principal ----
 def extrair_features(texto: str, tema: str, origem: str, tags: list[str], debug: bool = False) -> FeaturesDict:
-    texto_norm = normalizar_texto(texto)
-    tema_norm = normalizar_texto(tema)
-    doc = nlp(texto_norm)
+    escalares, embeddings = extrair_features_lote([(texto, tema, origem, tags)])
 
     features: FeaturesDict = {
-        "qtde_palavras": len(texto_norm.split()),
-        "contagem_caracteres": len(texto_norm),
-        "contem_ano": int(bool(re.search(r"\b20\d{2}\b", texto_norm))),
-        "qtde_entidades": len(doc.ents),
-        "contem_modificadores": contem_modificadores(texto),
-        "tema_igual": int(texto_norm == tema_norm),
+        **{nome: int(valor) for nome, valor in zip(FEATURES_NUMERICAS, escalares[0])},
         "origem": origem.lower(),
-        "qtde_tags": len(tags),
-        "embedding_300d": doc.vector[:300].tolist()  # Vetor semântico truncado
+        "embedding_300d": embeddings[0].tolist()  # Vetor semântico truncado
     }
 
     if debug:
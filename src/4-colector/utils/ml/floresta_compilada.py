@@ -0,0 +1,273 @@
+# src/ml/floresta_compilada.py
+# Exporta o pipeline (StandardScaler + RandomForest) para arrays numpy planos e avalia em lote sem sklearn
+#
+# Exportação de um modelo já treinado:
+#   python src/4-colector/utils/ml/floresta_compilada.py --modelo src/ml/modelo_relevancia.pkl --saida src/ml/modelo_relevancia_compilado
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger("floresta_compilada")
+
+VERSAO_FORMATO = 2  # 2: média/escala em float64 + aritmética do scaler registrada em meta.json
+ARQUIVO_META = "meta.json"
+# Nós de todas as árvores concatenados (índices globais). Os irmãos ficam lado a lado:
+# o filho direito é sempre `esquerda + 1`. Folhas têm feature -1.
+ARRAYS = ("feature", "limiar", "esquerda", "valor", "raizes", "media", "escala")
+# Florestas que fazem a média das probabilidades das árvores (o boosting soma escores e não entra aqui)
+ESTIMADORES_SUPORTADOS = ("RandomForestClassifier", "ExtraTreesClassifier", "DecisionTreeClassifier", "ExtraTreeClassifier")
+
+# =========================
+# EXPORTAÇÃO
+# =========================
+def _limiar_float32(limiar: np.ndarray) -> np.ndarray:
+    """
+    Maior float32 <= limiar. Com X em float32 (como o sklearn avalia as
+    árvores), `x <= limiar32` dá exatamente o mesmo resultado que comparar
+    com o limiar original em float64.
+    """
+    limiar32 = limiar.astype(np.float32)
+    acima = limiar32.astype(np.float64) > limiar
+    limiar32[acima] = np.nextafter(limiar32[acima], np.float32(-np.inf))
+    return limiar32
+
+def _padronizar(X32: np.ndarray, media: np.ndarray, escala: np.ndarray, aritmetica: str) -> np.ndarray:
+    """
+    (X - média) / escala como o StandardScaler faz sobre entrada float32:
+    - "float32": média e escala convertidas para float32 (sklearn recente)
+    - "float64": cada operação em float64, arredondada para float32 no lugar (sklearn antigo, `X -= mean_`)
+    """
+    if aritmetica == "float32":
+        return (X32 - media.astype(np.float32)) / escala.astype(np.float32)
+    centrado = (X32.astype(np.float64) - media).astype(np.float32)
+    return (centrado.astype(np.float64) / escala).astype(np.float32)
+
+def _detectar_aritmetica(scaler, media: np.ndarray, escala: np.ndarray) -> str:
+    """
+    Qual das duas aritméticas reproduz bit a bit o `transform` do scaler
+    instalado: muda entre versões do sklearn e decide limiares na fronteira.
+    """
+    rng = np.random.default_rng(0)
+    amostra = (media + escala * rng.normal(scale=3.0, size=(512, media.size))).astype(np.float32)
+    esperado = scaler.transform(amostra.copy())
+    for aritmetica in ("float64", "float32"):
+        if np.array_equal(_padronizar(amostra, media, escala, aritmetica), esperado):
+            return aritmetica
+    raise ValueError("Aritmética do StandardScaler não reconhecida; exportação abortada.")
+
+def _ordem_por_nivel(esquerda: np.ndarray, direita: np.ndarray) -> np.ndarray:
+    """Ids originais na nova ordem: nível a nível, com os dois filhos de cada nó em posições consecutivas."""
+    niveis = [np.zeros(1, dtype=np.int64)]
+    while True:
+        internos = niveis[-1][esquerda[niveis[-1]] >= 0]
+        if not internos.size:
+            return np.concatenate(niveis)
+        niveis.append(np.column_stack((esquerda[internos], direita[internos])).ravel())
+
+def _decompor(modelo):
+    """Separa o scaler (opcional) e as árvores de um Pipeline, RandomForest ou árvore única."""
+    scaler, estimador = None, modelo
+    if hasattr(modelo, "steps"):
+        *etapas, (_, estimador) = modelo.steps
+        for _, etapa in etapas:
+            if etapa is None or etapa == "passthrough":
+                continue
+            if scaler is not None or not hasattr(etapa, "mean_"):
+                raise ValueError(f"Etapa não suportada na exportação: {type(etapa).__name__}")
+            scaler = etapa
+    if type(estimador).__name__ not in ESTIMADORES_SUPORTADOS:
+        raise ValueError(f"Estimador não suportado na exportação: {type(estimador).__name__}")
+    arvores = list(getattr(estimador, "estimators_", [estimador]))
+    if list(getattr(estimador, "classes_", [0, 1])) != [0, 1]:
+        raise ValueError("Só classificadores binários com classes [0, 1] são suportados.")
+    return scaler, arvores
+
+def compilar_modelo(modelo) -> dict:
+    scaler, arvores = _decompor(modelo)
+    n_features = arvores[0].tree_.n_features
+
+    features, limiares, esquerdas, valores, raizes = [], [], [], [], []
+    deslocamento, profundidade = 0, 0
+    for arvore in arvores:
+        t = arvore.tree_
+        ordem = _ordem_por_nivel(t.children_left, t.children_right)
+        novo_id = np.empty(t.node_count, dtype=np.int64)
+        novo_id[ordem] = np.arange(t.node_count)
+        folha = t.children_left[ordem] < 0
+        features.append(np.where(folha, -1, t.feature[ordem]).astype(np.int32))
+        limiares.append(np.where(folha, 0.0, t.threshold[ordem]))
+        esquerdas.append(np.where(folha, -1, novo_id[t.children_left[ordem]] + deslocamento).astype(np.int32))
+        # Probabilidade da classe 1 na folha, normalizada como no predict_proba de cada árvore
+        contagens = t.value[ordem, 0, :]
+        valores.append((contagens[:, 1] / contagens.sum(axis=1)).astype(np.float32))
+        raizes.append(deslocamento)
+        deslocamento += t.node_count
+        profundidade = max(profundidade, t.max_depth)
+
+    if scaler is not None:
+        media = np.asarray(scaler.mean_ if scaler.with_mean else np.zeros(n_features), dtype=np.float64)
+        escala = np.asarray(scaler.scale_ if scaler.with_std else np.ones(n_features), dtype=np.float64)
+        aritmetica = _detectar_aritmetica(scaler, media, escala)
+    else:
+        media, escala, aritmetica = np.zeros(n_features), np.ones(n_features), "float32"
+
+    return {
+        "feature": np.concatenate(features),
+        "limiar": _limiar_float32(np.concatenate(limiares)),
+        "esquerda": np.concatenate(esquerdas),
+        "valor": np.concatenate(valores),
+        "raizes": np.asarray(raizes, dtype=np.int32),
+        "media": media,
+        "escala": escala,
+        "meta": {
+            "versao_formato": VERSAO_FORMATO,
+            "arvores": len(arvores),
+            "nos": int(deslocamento),
+            "profundidade_maxima": int(profundidade),
+            "n_features": int(n_features),
+            "aritmetica_scaler": aritmetica,
+            # Origem dos embeddings do treino (ver RelevancePredictor); None em modelos anteriores ao registro
+            "fonte_features": getattr(modelo, "fonte_features_", None),
+            "criado_em": datetime.now().isoformat()
+        }
+    }
+
+def verificar_paridade(modelo, compilada: "FlorestaCompilada", X: np.ndarray, tolerancia: float = 1e-6) -> int:
+    """
+    Linhas de X em que a floresta compilada diverge do modelo sklearn. As
+    médias das folhas diferem só no arredondamento; um limiar decidido para
+    o outro lado muda a probabilidade em ao menos 1/n_arvores.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    diferenca = np.abs(compilada.predict_proba(X)[:, 1] - modelo.predict_proba(X)[:, 1])
+    return int((diferenca > tolerancia).sum())
+
+def exportar_floresta(modelo, destino: Path, X_verificacao: Optional[np.ndarray] = None) -> Path:
+    """
+    Grava num diretório temporário ao lado de `destino` e troca os diretórios
+    por rename. Processos com a versão anterior mapeada em memória continuam
+    lendo os arquivos antigos (já desvinculados) até recarregarem; nada é
+    sobrescrito no lugar. Com `X_verificacao`, nada é publicado se alguma
+    linha divergir do modelo sklearn.
+    """
+    compilado = compilar_modelo(modelo)
+    if X_verificacao is not None and len(X_verificacao):
+        divergentes = verificar_paridade(modelo, FlorestaCompilada(compilado, compilado["meta"]), X_verificacao)
+        if divergentes:
+            raise ValueError(f"Floresta compilada diverge do modelo em {divergentes}/{len(X_verificacao)} linhas; exportação abortada.")
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_name(f"{destino.name}.tmp-{os.getpid()}")
+    shutil.rmtree(temporario, ignore_errors=True)
+    temporario.mkdir()
+    for nome in ARRAYS:
+        np.save(temporario / f"{nome}.npy", np.ascontiguousarray(compilado[nome]))
+    # meta.json por último: o diretório só é considerado pronto quando ele existe
+    (temporario / ARQUIVO_META).write_text(json.dumps(compilado["meta"], indent=2), encoding="utf-8")
+
+    anterior = destino.with_name(f"{destino.name}.anterior-{os.getpid()}")
+    if destino.exists():
+        os.rename(destino, anterior)
+    os.rename(temporario, destino)
+    shutil.rmtree(anterior, ignore_errors=True)
+    tamanho = sum(compilado[nome].nbytes for nome in ARRAYS)
+    logger.info(
+        f"✅ Floresta compilada em {destino}: {compilado['meta']['arvores']} árvores, "
+        f"{compilado['meta']['nos']} nós, {tamanho / 2**20:.1f} MB"
+    )
+    return destino
+
+def remover_floresta(destino: Path) -> bool:
+    """
+    Tira de uso um compilado que não corresponde mais ao pickle (ex.: o novo
+    modelo não é uma floresta). Renomeia antes de apagar, como na exportação:
+    o diretório some de uma vez para os preditores que o procuram.
+    """
+    destino = Path(destino)
+    if not destino.exists():
+        return False
+    removido = destino.with_name(f"{destino.name}.removido-{os.getpid()}")
+    os.rename(destino, removido)
+    shutil.rmtree(removido, ignore_errors=True)
+    logger.info(f"🗑️ Floresta compilada em {destino} removida")
+    return True
+
+# =========================
+# AVALIAÇÃO
+# =========================
+class FlorestaCompilada:
+    """
+    Avaliador numpy puro com a interface `predict_proba` usada pelo
+    RelevancePredictor. Todas as árvores descem juntas para todo o lote:
+    cada passo é um gather sobre os pares (amostra, árvore) que ainda não
+    chegaram a uma folha, e os que chegaram saem do conjunto ativo.
+    """
+
+    def __init__(self, arrays: dict, meta: dict, diretorio: Optional[Path] = None):
+        self.meta = meta
+        self.diretorio = diretorio
+        for nome in ARRAYS:
+            setattr(self, nome, arrays[nome])
+        self.n_features_in_ = meta["n_features"]
+        self.aritmetica_scaler = meta["aritmetica_scaler"]
+        self.classes_ = np.array([0, 1])
+        self.fonte_features_ = meta.get("fonte_features")
+
+    @classmethod
+    def carregar(cls, diretorio: Path, mmap_mode: Optional[str] = None) -> "FlorestaCompilada":
+        diretorio = Path(diretorio)
+        meta = json.loads((diretorio / ARQUIVO_META).read_text(encoding="utf-8"))
+        if meta.get("versao_formato") != VERSAO_FORMATO:
+            raise ValueError(f"Formato de floresta compilada não suportado: {meta.get('versao_formato')}")
+        arrays = {nome: np.load(diretorio / f"{nome}.npy", mmap_mode=mmap_mode) for nome in ARRAYS}
+        return cls(arrays, meta, diretorio)
+
+    @classmethod
+    def de_modelo(cls, modelo) -> "FlorestaCompilada":
+        compilado = compilar_modelo(modelo)
+        return cls(compilado, compilado["meta"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, nome).nbytes for nome in ARRAYS)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Esperado X com {self.n_features_in_} colunas, recebido formato {X.shape}")
+        # Entrada float32 como no predictor; arredondamento do scaler detectado na exportação (ver _padronizar)
+        X = _padronizar(np.asarray(X, dtype=np.float32), self.media, self.escala, self.aritmetica_scaler)
+
+        n, n_arvores = X.shape[0], len(self.raizes)
+        X_plano = np.ascontiguousarray(X).ravel()
+        nos = np.tile(self.raizes.astype(np.int64), n)
+        base = np.repeat(np.arange(n, dtype=np.int64) * X.shape[1], n_arvores)
+        ativos = np.flatnonzero(self.feature[nos] >= 0)
+        while ativos.size:
+            no = nos[ativos]
+            no = self.esquerda[no] + (X_plano[base[ativos] + self.feature[no]] > self.limiar[no])
+            nos[ativos] = no
+            ativos = ativos[self.feature[no] >= 0]
+
+        prob = self.valor[nos].reshape(n, n_arvores).mean(axis=1, dtype=np.float64)
+        return np.column_stack((1.0 - prob, prob))
+
+if __name__ == "__main__":
+    import joblib
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Compila o modelo de relevância em arrays numpy")
+    parser.add_argument("--modelo", type=Path, default=Path("src/ml/modelo_relevancia.pkl"))
+    parser.add_argument("--saida", type=Path, default=Path("src/ml/modelo_relevancia_compilado"))
+    args = parser.parse_args()
+    exportar_floresta(joblib.load(args.modelo), args.saida)
@@ -0,0 +1,116 @@
+# src/ml/nlp_registry.py
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import spacy
+
+try:
+    import psutil
+except ImportError:  # métrica de memória é opcional
+    psutil = None
+
+logger = logging.getLogger("nlp_registry")
+
+# ---- Presets de componentes ----
+# Os coletores só usam doc.ents: parser, lemmatizer e morfologia não precisam ser carregados.
+COMPONENTES_SO_NER = ("parser", "lemmatizer", "attribute_ruler", "morphologizer", "tagger", "senter")
+
+# ---- Registro de modelos carregados ----
+@dataclass
+class ModeloCarregado:
+    nome: str
+    desativados: Tuple[str, ...]
+    nlp: "spacy.language.Language"
+    tempo_carga_s: float
+    memoria_mb: Optional[float]
+    componentes: List[str] = field(default_factory=list)
+
+_modelos: Dict[Tuple[str, Tuple[str, ...]], ModeloCarregado] = {}
+_lock = threading.Lock()
+
+def _rss_mb() -> Optional[float]:
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+def obter_modelo(nome: str, desativar: Iterable[str] = ()) -> "spacy.language.Language":
+    """
+    Carrega o modelo spaCy uma única vez por processo e combinação de componentes.
+
+    Componentes em `desativar` são excluídos no carregamento (não ocupam memória);
+    nomes que o pacote não possui são ignorados pelo spaCy.
+    """
+    chave = (nome, tuple(sorted(desativar)))
+    carregado = _modelos.get(chave)
+    if carregado is not None:
+        return carregado.nlp
+
+    with _lock:
+        carregado = _modelos.get(chave)
+        if carregado is None:
+            rss_antes = _rss_mb()
+            inicio = time.perf_counter()
+            nlp = spacy.load(nome, exclude=list(chave[1]))
+            tempo = time.perf_counter() - inicio
+            rss_depois = _rss_mb()
+            memoria = round(rss_depois - rss_antes, 1) if rss_antes is not None else None
+            carregado = ModeloCarregado(
+                nome=nome,
+                desativados=chave[1],
+                nlp=nlp,
+                tempo_carga_s=round(tempo, 3),
+                memoria_mb=memoria,
+                componentes=list(nlp.pipe_names)
+            )
+            _modelos[chave] = carregado
+            logger.info(
+                f"🧠 Modelo spaCy '{nome}' carregado em {carregado.tempo_carga_s}s "
+                f"| +{memoria} MB RSS | componentes={carregado.componentes}"
+            )
+    return carregado.nlp
+
+def relatorio_modelos() -> List[dict]:
+    """Tempo de carga e memória residente de cada modelo carregado no processo."""
+    return [
+        {
+            "nome": m.nome,
+            "desativados": list(m.desativados),
+            "componentes": m.componentes,
+            "tempo_carga_s": m.tempo_carga_s,
+            "memoria_mb": m.memoria_mb
+        }
+        for m in _modelos.values()
+    ]
+
+# ---- Proxy preguiçoso para uso em nível de módulo ----
+class ModeloPreguicoso:
+    """
+    Substitui `nlp = spacy.load(...)` em nível de módulo: nada é carregado no
+    import, e o primeiro `nlp(texto)` resolve o modelo compartilhado do registro.
+    """
+
+    def __init__(self, nome: str, desativar: Iterable[str] = ()):
+        self.nome = nome
+        self.desativar = tuple(desativar)
+
+    @property
+    def modelo(self) -> "spacy.language.Language":
+        return obter_modelo(self.nome, self.desativar)
+
+    def __call__(self, texto: str):
+        return self.modelo(texto)
+
+    def pipe(self, textos, **kwargs):
+        return self.modelo.pipe(textos, **kwargs)
+
+    def __getattr__(self, atributo):
+        if atributo.startswith("__") or atributo in ("nome", "desativar"):
+            raise AttributeError(atributo)
+        return getattr(self.modelo, atributo)
+
+def modelo_preguicoso(nome: str, desativar: Iterable[str] = ()) -> ModeloPreguicoso:
+    return ModeloPreguicoso(nome, desativar)
@@ -2,10 +2,14 @@
 
 import joblib
 import os
+import threading
+import time
 import numpy as np
 import logging
-from typing import Tuple, Optional
-from ml.feature_engineering import extrair_features, validar_features
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple, Optional
+from ml.feature_engineering import extrair_features_lote, montar_matriz, validar_embeddings, nlp as nlp_features
+from ml.floresta_compilada import FlorestaCompilada, ARQUIVO_META as META_FLORESTA
 
 # Configuração de logging estruturado e níveis customizados
 logger = logging.getLogger("relevance_predictor")
@@ -17,24 +21,156 @@ logger.setLevel(logging.DEBUG)
 
 # Caminho padrão do modelo treinado (pode ser sobrescrito via ENV ou config externa futuramente)
 MODELO_PATH = os.getenv("MODELO_RELEVANCIA_PATH", "src/ml/modelo_relevancia.pkl")
+# Mesmo modelo exportado para arrays numpy (ml.floresta_compilada); tem prioridade sobre o pickle quando atualizado
+MODELO_COMPILADO_PATH = os.getenv("MODELO_RELEVANCIA_COMPILADO_PATH", "src/ml/modelo_relevancia_compilado")
+# Arrays do modelo mapeados do disco (somente leitura): workers da mesma máquina compartilham as páginas
+# pelo page cache em vez de cada um ter sua cópia. Vazio desativa.
+MODELO_MMAP = os.getenv("MODELO_RELEVANCIA_MMAP", "r") or None
+# Segundos entre verificações de nova versão do modelo em disco (0 desativa a troca a quente)
+INTERVALO_RECARGA = float(os.getenv("MODELO_RELEVANCIA_RECARGA_S", "5"))
+
+# Item de predição em lote: (texto, tema, origem, tags)
+ItemPredicao = Tuple[str, str, str, list]
+
+# Modelos treinados antes de o treino registrar `fonte_features_` usavam o Doc.vector do spaCy
+FONTE_LEGADA = f"spacy:{nlp_features.nome}"
+
+@dataclass
+class PalavraAvaliada:
+    """
+    Palavra já processada pelo coletor. Quando `tags` e `escore` vêm
+    preenchidos, `salvar_coleta` grava os valores como estão em vez de
+    rodar NER e o modelo de novo.
+    """
+    palavra: str
+    tags: Optional[List[str]] = None
+    escore: Optional[float] = None
+    validado: Optional[bool] = None
+
+    @property
+    def pontuada(self) -> bool:
+        return self.tags is not None and self.escore is not None and self.validado is not None
+
+def _validar_tags(tags):
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        logger.error("❌ As tags devem ser uma lista de strings.")
+        raise ValueError("As tags devem ser uma lista de strings.")
 
 class RelevancePredictor:
-    def __init__(self, modelo_path: str = MODELO_PATH):
+    """
+    O modelo é carregado com `mmap_mode` (floresta compilada via `np.load`,
+    pickle via `joblib.load`) e trocado a quente quando o arquivo em disco
+    muda: a nova versão é carregada por inteiro antes de substituir a
+    referência, e predições em andamento terminam com a versão anterior.
+
+    As features são extraídas com os embeddings registrados no modelo
+    (`fonte_features_`), não com os ativos no processo: se essa fonte não
+    está disponível aqui, o lote recebe escore neutro em vez de vetores de
+    outro espaço.
+    """
+
+    def __init__(
+        self,
+        modelo_path: str = MODELO_PATH,
+        modelo_compilado_path: Optional[str] = MODELO_COMPILADO_PATH,
+        mmap_mode: Optional[str] = MODELO_MMAP,
+        intervalo_recarga: float = INTERVALO_RECARGA
+    ):
         self.modelo_path = modelo_path
+        self.modelo_compilado_path = modelo_compilado_path
+        self.mmap_mode = mmap_mode
+        self.intervalo_recarga = intervalo_recarga
+        self._trava_recarga = threading.Lock()
+        self._verificado_em = time.monotonic()
+        self._fonte_legada_avisada = False
+        self._compilado_antigo_avisado: Optional[float] = None  # mtime do pickle já avisado
+        self.versao_modelo = self._versao_em_disco()
         self.modelo = self._carregar_modelo()
 
+    def _compilado_atualizado(self) -> bool:
+        if not self.modelo_compilado_path:
+            return False
+        meta = os.path.join(self.modelo_compilado_path, META_FLORESTA)
+        if not os.path.exists(meta):
+            return False
+        mtime_pickle = os.path.getmtime(self.modelo_path) if os.path.exists(self.modelo_path) else None
+        if mtime_pickle is not None and mtime_pickle > os.path.getmtime(meta):
+            # Chamado a cada verificação de versão: avisa uma vez por pickle
+            if self._compilado_antigo_avisado != mtime_pickle:
+                logger.warning(f"⚠️ Modelo compilado em {self.modelo_compilado_path} é mais antigo que o pickle; usando o pickle.")
+                self._compilado_antigo_avisado = mtime_pickle
+            return False
+        return True
+
+    def _versao_em_disco(self) -> Optional[tuple]:
+        """(arquivo, inode, mtime) do modelo que seria carregado agora; o inode muda a cada exportação atômica."""
+        if self._compilado_atualizado():
+            caminho = os.path.join(self.modelo_compilado_path, META_FLORESTA)
+        elif os.path.exists(self.modelo_path):
+            caminho = self.modelo_path
+        else:
+            return None
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            return None  # troca de diretórios em andamento; fica para a próxima verificação
+        return caminho, info.st_ino, info.st_mtime_ns
+
     def _carregar_modelo(self):
+        if self._compilado_atualizado():
+            try:
+                modelo = FlorestaCompilada.carregar(self.modelo_compilado_path, mmap_mode=self.mmap_mode)
+                logger.info(f"✅ Modelo compilado carregado de: {self.modelo_compilado_path}")
+                return modelo
+            except Exception as e:
+                logger.error(f"Erro ao carregar modelo compilado, tentando o pickle: {e}", exc_info=True)
+
         if not os.path.exists(self.modelo_path):
             logger.warning(f"⚠️ Modelo não encontrado em: {self.modelo_path}")
             return None
         try:
-            modelo = joblib.load(self.modelo_path)
+            # mmap_mode só vale para pickles gravados sem compressão (padrão do joblib.dump no treino)
+            modelo = joblib.load(self.modelo_path, mmap_mode=self.mmap_mode)
             logger.info(f"✅ Modelo carregado de: {self.modelo_path}")
             return modelo
         except Exception as e:
             logger.error(f"Erro ao carregar modelo: {e}", exc_info=True)
             return None
 
+    def _fonte_do_modelo(self, modelo) -> str:
+        fonte = getattr(modelo, "fonte_features_", None)
+        if fonte is not None:
+            return fonte
+        if not self._fonte_legada_avisada:
+            logger.warning(f"⚠️ Modelo sem fonte de embeddings registrada; assumindo {FONTE_LEGADA}. Retreine para registrá-la.")
+            self._fonte_legada_avisada = True
+        return FONTE_LEGADA
+
+    def verificar_atualizacao(self, forcar: bool = False) -> bool:
+        """
+        Troca o modelo se o arquivo em disco mudou desde a última carga.
+        Chamado a cada predição, mas só olha o disco a cada `intervalo_recarga`
+        segundos; só uma thread recarrega por vez. Retorna True se trocou.
+        """
+        if not forcar and (self.intervalo_recarga <= 0 or time.monotonic() - self._verificado_em < self.intervalo_recarga):
+            return False
+        if not self._trava_recarga.acquire(blocking=False):
+            return False
+        try:
+            self._verificado_em = time.monotonic()
+            versao = self._versao_em_disco()
+            if versao is None or versao == self.versao_modelo:
+                return False
+            novo = self._carregar_modelo()
+            if novo is None:
+                logger.warning("⚠️ Nova versão do modelo não pôde ser carregada; mantendo a atual.")
+                return False
+            self.modelo, self.versao_modelo = novo, versao
+            logger.info(f"🔄 Modelo de relevância atualizado a quente: {versao[0]}")
+            return True
+        finally:
+            self._trava_recarga.release()
+
     def prever(self, texto: str, tema: str, origem: str, tags: list[str], debug: bool = False, threshold: float = 0.5) -> Tuple[bool, float]:
         """
         Realiza a predição de relevância de uma sugestão com base no modelo treinado.
@@ -43,53 +179,80 @@ class RelevancePredictor:
         - valido (bool): se a sugestão é considerada relevante
         - escore (float): probabilidade de relevância
         """
-        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
-            logger.error("❌ As tags devem ser uma lista de strings.")
-            raise ValueError("As tags devem ser uma lista de strings.")
+        validos, escores = self.prever_lote([(texto, tema, origem, tags)], debug=debug, threshold=threshold)
+        return bool(validos[0]), float(escores[0])
 
-        try:
-            features = extrair_features(texto, tema, origem, tags, debug=debug)
-        except Exception as e:
-            logger.error(f"Erro na extração de features: {e}", exc_info=True)
-            return False, 0.0
+    def prever_lote(self, itens: Iterable[ItemPredicao], debug: bool = False, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predição de vários itens (texto, tema, origem, tags) com uma única
+        chamada a `predict_proba` sobre uma matriz float32 contígua.
 
-        if not validar_features(features):
-            logger.warning(f"⚠️ Features inválidas para texto='{texto}' | tema='{tema}'")
-            return False, 0.0
+        Retorna arrays alinhados à entrada:
+        - validos (bool): relevância de cada item
+        - escores (float): probabilidade de relevância (0.0 para itens sem texto válido ou se a extração falhar)
+        """
+        itens = list(itens)
+        validos = np.zeros(len(itens), dtype=bool)
+        escores = np.zeros(len(itens), dtype=np.float64)
+        if not itens:
+            return validos, escores
 
-        if self.modelo is None:
+        for _, _, _, tags in itens:
+            _validar_tags(tags)
+
+        self.verificar_atualizacao()
+        modelo = self.modelo  # referência fixa durante o lote, mesmo se houver troca em outra thread
+        if modelo is None:
             logger.warning("⚠️ Modelo indisponível. Retornando escore neutro.")
-            return False, 0.0
+            return validos, escores
+
+        indices = [i for i, (texto, _, _, _) in enumerate(itens) if isinstance(texto, str)]
+        if not indices:
+            return validos, escores
 
         try:
-            X_base = [features[k] for k in features if k != "embedding_300d"]
-            X_emb = features["embedding_300d"]
-            X_input = np.array([X_base + X_emb])
+            escalares, embeddings = extrair_features_lote([itens[i] for i in indices], fonte=self._fonte_do_modelo(modelo))
+        except Exception as e:
+            logger.error(f"Erro na extração de features: {e}", exc_info=True)
+            return validos, escores
 
-            prob = self.modelo.predict_proba(X_input)[0][1]
-            valido = prob >= threshold
+        if not validar_embeddings(embeddings):
+            logger.warning(f"⚠️ Features inválidas: embedding com formato {embeddings.shape}")
+            return validos, escores
 
-            logger.info(f"📊 Predição: texto='{texto[:30]}...' | escore={prob:.4f} | relevante={valido}")
+        X_input = montar_matriz(escalares, embeddings)
 
-            if debug:
-                logger.debug("\n[DEBUG] --- Predição de Relevância ---")
-                logger.debug(f"Texto: {texto}")
-                logger.debug(f"Tema: {tema}")
-                logger.debug(f"Origem: {origem}")
-                logger.debug(f"Tags: {tags}")
-                logger.debug(f"Escore: {prob:.4f} | Relevante: {valido}\n")
+        try:
+            probs = modelo.predict_proba(X_input)[:, 1]
+        except Exception as e:
+            logger.error(f"Erro ao realizar predição em lote: {e}", exc_info=True)
+            return validos, escores
 
-            return valido, float(prob)
+        indices = np.asarray(indices)
+        escores[indices] = probs
+        validos[indices] = probs >= threshold
 
-        except Exception as e:
-            logger.error(f"Erro ao realizar predição: {e}", exc_info=True)
-            return False, 0.0
+        logger.info(
+            f"📊 Predição em lote: {len(itens)} itens | {len(indices)} com texto | "
+            f"{int(validos.sum())} relevantes | escore médio={probs.mean():.4f}"
+        )
+        if debug:
+            for i in indices:
+                logger.debug(f"[DEBUG] texto='{itens[i][0]}' | escore={escores[i]:.4f} | relevante={validos[i]}")
+
+        return validos, escores
 
 # Interface funcional para uso legado ou simples
 _default_predictor: Optional[RelevancePredictor] = None
 
-def prever_relevancia(texto: str, tema: str, origem: str, tags: list[str], debug: bool = False, threshold: float = 0.5) -> Tuple[bool, float]:
+def _obter_preditor() -> RelevancePredictor:
     global _default_predictor
     if _default_predictor is None:
         _default_predictor = RelevancePredictor()
-    return _default_predictor.prever(texto, tema, origem, tags, debug, threshold)
+    return _default_predictor
+
+def prever_relevancia(texto: str, tema: str, origem: str, tags: list[str], debug: bool = False, threshold: float = 0.5) -> Tuple[bool, float]:
+    return _obter_preditor().prever(texto, tema, origem, tags, debug, threshold)
+
+def prever_relevancia_lote(itens: Iterable[ItemPredicao], debug: bool = False, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    return _obter_preditor().prever_lote(itens, debug, threshold)
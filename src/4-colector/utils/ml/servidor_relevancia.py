@@ -0,0 +1,209 @@
+# src/ml/servidor_relevancia.py
+# Servidor local de relevância (HTTP sobre unix socket) com micro-batching dinâmico
+#
+# Uso:
+#   python src/4-colector/utils/ml/servidor_relevancia.py --socket /tmp/omni_relevancia.sock
+# Os coletores passam a usá-lo com RELEVANCIA_SOCKET=/tmp/omni_relevancia.sock (ver ml.cliente_relevancia).
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from aiohttp import web
+from prometheus_client import Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+logger = logging.getLogger("servidor_relevancia")
+
+CONFIG_PADRAO = {
+    "SOCKET": os.getenv("RELEVANCIA_SOCKET", "/tmp/omni_relevancia.sock"),
+    "MAX_LOTE": 512,       # itens por chamada ao modelo
+    "JANELA_MS": 2.0       # espera máxima por mais pedidos depois do primeiro
+}
+
+# === Métricas Prometheus ===
+profundidade_fila = Histogram(
+    "relevancia_fila_profundidade",
+    "Pedidos já na fila quando um novo pedido chega",
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+tamanho_lote = Histogram(
+    "relevancia_lote_itens",
+    "Itens por chamada ao modelo após o agrupamento",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+)
+pedidos_por_lote = Histogram(
+    "relevancia_lote_pedidos",
+    "Pedidos HTTP agrupados em cada chamada ao modelo",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+latencia_pedido = Histogram(
+    "relevancia_pedido_segundos",
+    "Tempo do pedido dentro do servidor (fila + modelo)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+@dataclass
+class Pedido:
+    itens: List[tuple]
+    threshold: float
+    futuro: asyncio.Future
+    recebido_em: float = field(default_factory=time.perf_counter)
+
+class ServidorRelevancia:
+    """
+    Um RelevancePredictor (e um spaCy) aquecido por máquina, compartilhado
+    pelos coletores. Pedidos que chegam enquanto o modelo está ocupado, ou
+    dentro de `JANELA_MS` após o primeiro, viram uma única chamada a
+    `prever_lote`. O modelo roda numa thread dedicada e o loop continua
+    aceitando pedidos durante a predição.
+
+    POST /prever   {"itens": [[texto, tema, origem, tags], ...], "threshold": 0.5}
+                   -> {"validos": [...], "escores": [...]}
+    GET  /saude    -> {"ok": true, ...}
+    GET  /metrics  -> histogramas Prometheus (profundidade da fila, tamanho do lote, latência)
+    """
+
+    def __init__(self, preditor=None, config: Optional[dict] = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        if preditor is None:
+            from ml.relevance_predictor import RelevancePredictor
+            preditor = RelevancePredictor()
+        self.preditor = preditor
+        self._fila: Optional[asyncio.Queue] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="modelo")
+        self._agrupador: Optional[asyncio.Task] = None
+        self.lotes = 0
+        self.itens = 0
+
+    # ---- Agrupamento ----
+    async def _proximo_lote(self) -> List[Pedido]:
+        lote = [await self._fila.get()]
+        quantidade = len(lote[0].itens)
+        prazo = time.perf_counter() + self.config["JANELA_MS"] / 1000
+        while quantidade < self.config["MAX_LOTE"]:
+            if self._fila.empty():
+                restante = prazo - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    pedido = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                pedido = self._fila.get_nowait()
+            lote.append(pedido)
+            quantidade += len(pedido.itens)
+        return lote
+
+    async def _agrupar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = await self._proximo_lote()
+            itens = [item for pedido in lote for item in pedido.itens]
+            tamanho_lote.observe(len(itens))
+            pedidos_por_lote.observe(len(lote))
+            try:
+                # threshold 0.0: `validos` marca só os itens que o modelo conseguiu pontuar;
+                # o corte de cada pedido é aplicado abaixo
+                pontuados, escores = await loop.run_in_executor(self._executor, self.preditor.prever_lote, itens, False, 0.0)
+            except Exception as e:
+                logger.error(f"❌ Falha no lote de {len(itens)} itens: {e}", exc_info=True)
+                for pedido in lote:
+                    if not pedido.futuro.done():
+                        pedido.futuro.set_exception(e)
+                continue
+
+            self.lotes += 1
+            self.itens += len(itens)
+            inicio = 0
+            for pedido in lote:
+                fim = inicio + len(pedido.itens)
+                validos = pontuados[inicio:fim] & (escores[inicio:fim] >= pedido.threshold)
+                if not pedido.futuro.done():
+                    pedido.futuro.set_result((validos.tolist(), escores[inicio:fim].tolist()))
+                latencia_pedido.observe(time.perf_counter() - pedido.recebido_em)
+                inicio = fim
+
+    # ---- Rotas ----
+    async def _prever(self, request: web.Request) -> web.Response:
+        try:
+            corpo = await request.json()
+            itens = [tuple(item) for item in corpo["itens"]]
+            if any(len(item) != 4 for item in itens):
+                raise ValueError("Cada item deve ser [texto, tema, origem, tags].")
+            # Validado aqui para um pedido inválido não derrubar o lote inteiro
+            if not all(isinstance(campo, str) for item in itens for campo in item[:3]):
+                raise ValueError("Texto, tema e origem devem ser strings.")
+            if not all(isinstance(tags, list) and all(isinstance(t, str) for t in tags) for _, _, _, tags in itens):
+                raise ValueError("As tags devem ser uma lista de strings.")
+            threshold = float(corpo.get("threshold", 0.5))
+        except (ValueError, KeyError, TypeError) as e:
+            return web.json_response({"erro": str(e)}, status=400)
+        if not itens:
+            return web.json_response({"validos": [], "escores": []})
+
+        profundidade_fila.observe(self._fila.qsize())
+        pedido = Pedido(itens=itens, threshold=threshold, futuro=asyncio.get_running_loop().create_future())
+        await self._fila.put(pedido)
+        try:
+            validos, escores = await pedido.futuro
+        except Exception as e:
+            return web.json_response({"erro": str(e)}, status=500)
+        return web.json_response({"validos": validos, "escores": escores})
+
+    async def _saude(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "ok": self.preditor.modelo is not None,
+            "modelo": type(self.preditor.modelo).__name__,
+            "fila": self._fila.qsize(),
+            "lotes": self.lotes,
+            "itens": self.itens,
+            "itens_por_lote": round(self.itens / self.lotes, 2) if self.lotes else 0.0
+        })
+
+    async def _metricas(self, request: web.Request) -> web.Response:
+        return web.Response(body=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+    # ---- Ciclo de vida ----
+    async def _ao_iniciar(self, app):
+        self._fila = asyncio.Queue()
+        self._agrupador = asyncio.create_task(self._agrupar())
+
+    async def _ao_encerrar(self, app):
+        self._agrupador.cancel()
+        self._executor.shutdown(wait=False)
+
+    def aplicacao(self) -> web.Application:
+        app = web.Application(client_max_size=32 * 2**20)
+        app.router.add_post("/prever", self._prever)
+        app.router.add_get("/saude", self._saude)
+        app.router.add_get("/metrics", self._metricas)
+        app.on_startup.append(self._ao_iniciar)
+        app.on_cleanup.append(self._ao_encerrar)
+        return app
+
+    def executar(self):
+        caminho = self.config["SOCKET"]
+        if os.path.exists(caminho):
+            os.unlink(caminho)  # socket órfão de uma execução anterior
+        # Aquecimento antes de aceitar conexões: modelo e spaCy já carregados no primeiro pedido
+        self.preditor.prever_lote([("aquecimento", "aquecimento", "servidor", [])])
+        logger.info(f"🧠 Servidor de relevância em unix:{caminho} | lote até {self.config['MAX_LOTE']} | janela {self.config['JANELA_MS']} ms")
+        web.run_app(self.aplicacao(), path=caminho, access_log=None, print=None)
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Servidor local de relevância com micro-batching")
+    parser.add_argument("--socket", default=CONFIG_PADRAO["SOCKET"])
+    parser.add_argument("--max-lote", type=int, default=CONFIG_PADRAO["MAX_LOTE"])
+    parser.add_argument("--janela-ms", type=float, default=CONFIG_PADRAO["JANELA_MS"])
+    args = parser.parse_args()
+    ServidorRelevancia(config={"SOCKET": args.socket, "MAX_LOTE": args.max_lote, "JANELA_MS": args.janela_ms}).executar()
@@ -0,0 +1,41 @@
+# src/ml/tagging.py
+
+from typing import Iterable, List
+
+from ml.nlp_registry import obter_modelo, COMPONENTES_SO_NER
+
+# ---- Configuração ----
+MODELO_TAGS_PADRAO = "pt_core_news_md"
+BATCH_SIZE_PADRAO = 256
+N_PROCESS_PADRAO = 1  # >1 só compensa para lotes grandes (fork + cópia do modelo por processo)
+
+# ---- Geração de tags em lote ----
+def gerar_tags_lote(
+    textos: Iterable[str],
+    nlp=None,
+    batch_size: int = BATCH_SIZE_PADRAO,
+    n_process: int = N_PROCESS_PADRAO,
+    minusculas: bool = True,
+    unicas: bool = True,
+    tamanho_minimo: int = 0
+) -> List[List[str]]:
+    """
+    Extrai as entidades nomeadas de vários textos com uma única passada de `nlp.pipe`.
+
+    Retorna uma lista de tags por texto, alinhada à entrada. Com os padrões
+    (minúsculas, únicas) o resultado equivale ao `gerar_tags` dos coletores;
+    com `minusculas=False, unicas=False` equivale ao `extrair_entidades`.
+    """
+    textos = list(textos)
+    if not textos:
+        return []
+    nlp = nlp if nlp is not None else obter_modelo(MODELO_TAGS_PADRAO, COMPONENTES_SO_NER)
+
+    resultado = []
+    for doc in nlp.pipe(textos, batch_size=batch_size, n_process=n_process):
+        tags = [ent.text.lower() if minusculas else ent.text for ent in doc.ents if len(ent.text) > tamanho_minimo]
+        resultado.append(list(dict.fromkeys(tags)) if unicas else tags)
+    return resultado
+
+def gerar_tags(texto: str, nlp=None) -> List[str]:
+    return gerar_tags_lote([texto], nlp=nlp)[0]
@@ -1,50 +1,67 @@
 # src/ml/train_relevance_model.py
 
-import pandas as pd
+import argparse
+import numpy as np
 import joblib
 import json
+import os
+import time
 from pathlib import Path
 from datetime import datetime
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (habilita HalvingGridSearchCV)
+from sklearn.model_selection import train_test_split, GridSearchCV, HalvingGridSearchCV, cross_val_score
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, accuracy_score
 
-from ml.feature_engineering import extrair_features, validar_features
+from ml.feature_engineering import montar_matriz, validar_embeddings, fonte_embeddings, FEATURES_NUMERICAS
+from ml.cache_features import carregar_features_treino
+from ml.floresta_compilada import exportar_floresta, remover_floresta, ESTIMADORES_SUPORTADOS
 
 # ---- Configuração ----
 DATASET_PATH = "data/palavras_rotuladas.jsonl"
 MODELO_SAIDA_PATH = "src/ml/modelo_relevancia.pkl"
+MODELO_COMPILADO_SAIDA_PATH = "src/ml/modelo_relevancia_compilado"
 METRICAS_SAIDA_PATH = "src/ml/metricas_relevancia.json"
+CACHE_FEATURES_DIR = "src/ml/cache_features"
+ALGORITMOS = ("floresta", "boosting")
 
 # ---- Carregamento dos dados rotulados ----
 def carregar_dados_rotulados():
-    registros = []
-    with open(DATASET_PATH, "r", encoding="utf-8") as f:
-        for linha in f:
-            dado = json.loads(linha)
-            features = extrair_features(
-                texto=dado["texto"],
-                tema=dado["tema"],
-                origem=dado.get("origem", "desconhecida"),
-                tags=dado.get("tags", [])
-            )
-            if validar_features(features):
-                features["label"] = int(dado["relevante"])
-                registros.append(features)
-    return pd.DataFrame(registros)
+    """
+    Matriz X (float32) e rótulos y do JSONL. As features vêm do cache em disco;
+    só amostras novas ou alteradas passam pelo spaCy (em paralelo).
+    """
+    escalares, embeddings, y = carregar_features_treino(Path(DATASET_PATH), Path(CACHE_FEATURES_DIR))
+    if len(y) == 0 or not validar_embeddings(embeddings):
+        return np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int64)
+    return montar_matriz(escalares, embeddings), y
 
-# ---- Treinamento do modelo ----
-def treinar_modelo(df: pd.DataFrame):
-    X = df.drop(columns=["label", "origem", "embedding_300d"])
-    X_emb = pd.DataFrame(df["embedding_300d"].tolist())
-    X_total = pd.concat([X.reset_index(drop=True), X_emb], axis=1)
-    y = df["label"]
-
-    X_train, X_test, y_train, y_test = train_test_split(X_total, y, test_size=0.2, random_state=42)
+# ---- Medição de inferência ----
+def medir_latencia_inferencia(modelo, X: np.ndarray, repeticoes: int = 200) -> dict:
+    """Latência de predict_proba para 1 item (caso dos coletores) e para o conjunto de teste inteiro."""
+    tempos = []
+    for i in range(repeticoes):
+        linha = X[i % len(X):i % len(X) + 1]
+        inicio = time.perf_counter()
+        modelo.predict_proba(linha)
+        tempos.append(time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    modelo.predict_proba(X)
+    lote_s = time.perf_counter() - inicio
+    return {
+        "p50_item_ms": round(float(np.percentile(tempos, 50)) * 1000, 3),
+        "p99_item_ms": round(float(np.percentile(tempos, 99)) * 1000, 3),
+        "lote_itens": len(X),
+        "lote_ms": round(lote_s * 1000, 3),
+        "predicoes_por_s_lote": round(len(X) / lote_s, 1) if lote_s else None
+    }
 
+# ---- Treinamento do modelo ----
+def treinar_floresta(X_train: np.ndarray, y_train: np.ndarray):
+    """RandomForest com grade completa (9 configurações x 5 folds)."""
     pipeline = Pipeline([
         ("scaler", StandardScaler()),
         ("clf", RandomForestClassifier(random_state=42))
@@ -57,37 +74,109 @@ def treinar_modelo(df: pd.DataFrame):
 
     grid = GridSearchCV(pipeline, param_grid, cv=5, n_jobs=-1)
     grid.fit(X_train, y_train)
+    return grid.best_estimator_, grid.best_params_
+
+def treinar_boosting(X_train: np.ndarray, y_train: np.ndarray):
+    """
+    HistGradientBoosting com early stopping (cada candidato para quando a
+    validação interna deixa de melhorar) e busca por successive halving: os
+    candidatos começam com poucas amostras e só os melhores seguem para o
+    conjunto inteiro.
+    """
+    modelo = HistGradientBoostingClassifier(
+        max_iter=500,
+        early_stopping=True,
+        validation_fraction=0.1,
+        n_iter_no_change=10,
+        random_state=42
+    )
+
+    param_grid = {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_leaf_nodes": [15, 31, 63],
+        "l2_regularization": [0.0, 1.0]
+    }
+
+    busca = HalvingGridSearchCV(modelo, param_grid, cv=5, factor=3, resource="n_samples", random_state=42, n_jobs=-1)
+    busca.fit(X_train, y_train)
+    print(f"Successive halving: {busca.n_iterations_} rodadas | candidatos por rodada: {list(busca.n_candidates_)}")
+    print(f"Iterações de boosting do melhor modelo (early stopping): {busca.best_estimator_.n_iter_}")
+    return busca.best_estimator_, busca.best_params_
 
-    preds = grid.predict(X_test)
+TREINADORES = {"floresta": ("RandomForest", treinar_floresta), "boosting": ("HistGradientBoosting", treinar_boosting)}
+
+def treinar_modelo(X_total: np.ndarray, y: np.ndarray, algoritmo: str = "floresta", modelo_saida: str = MODELO_SAIDA_PATH, metricas_saida: str = METRICAS_SAIDA_PATH):
+    colunas = list(FEATURES_NUMERICAS) + [f"embed_{i}" for i in range(X_total.shape[1] - len(FEATURES_NUMERICAS))]
+    nome_modelo, treinar = TREINADORES[algoritmo]
+
+    X_train, X_test, y_train, y_test = train_test_split(X_total, y, test_size=0.2, random_state=42)
+
+    inicio = time.perf_counter()
+    melhor, melhores_params = treinar(X_train, y_train)
+    tempo_treino = time.perf_counter() - inicio
+    # Mesma validação (5 folds sobre X_total) para todo algoritmo: `media_cv` é comparável entre treinos
+    scores = cross_val_score(melhor, X_total, y, cv=5)
+    media_cv = scores.mean()
+    print("Validação cruzada (CV=5):", scores)
+    # Embeddings com que as features de treino foram extraídas; o RelevancePredictor extrai com a mesma fonte
+    melhor.fonte_features_ = fonte_embeddings()
+
+    preds = melhor.predict(X_test)
     print("\nRelatório de Classificação:\n", classification_report(y_test, preds))
     print("Acurácia:", accuracy_score(y_test, preds))
+    print("Média CV:", media_cv)
+    print(f"⏱️ Tempo de treino: {tempo_treino:.1f}s")
 
-    scores = cross_val_score(grid.best_estimator_, X_total, y, cv=5)
-    print("Validação cruzada (CV=5):", scores)
-    print("Média CV:", scores.mean())
+    latencia = medir_latencia_inferencia(melhor, X_test)
+    print(f"⏱️ Inferência: p50={latencia['p50_item_ms']} ms/item | {latencia['predicoes_por_s_lote']} predições/s em lote")
 
     # ---- Salvar modelo treinado ----
-    Path(MODELO_SAIDA_PATH).parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(grid.best_estimator_, MODELO_SAIDA_PATH)
-    print(f"\n✅ Modelo salvo em: {MODELO_SAIDA_PATH}")
+    Path(modelo_saida).parent.mkdir(parents=True, exist_ok=True)
+    # Saída alternativa (ex.: comparação entre algoritmos) não mexe no compilado em produção
+    compilado_saida = MODELO_COMPILADO_SAIDA_PATH if modelo_saida == MODELO_SAIDA_PATH else f"{Path(modelo_saida).with_suffix('')}_compilado"
+    estimador = melhor.steps[-1][1] if isinstance(melhor, Pipeline) else melhor
+    compilavel = type(estimador).__name__ in ESTIMADORES_SUPORTADOS
+    if not compilavel and remover_floresta(compilado_saida):
+        # Removido antes de o pickle novo entrar: o preditor nunca vê o compilado antigo ao lado dele
+        print(f"🗑️ Compilado anterior removido de: {compilado_saida}")
+    # Arquivo temporário + rename: workers em execução (com o pickle mapeado em memória) trocam de versão sem ler um arquivo pela metade
+    temporario = f"{modelo_saida}.tmp"
+    joblib.dump(melhor, temporario)
+    os.replace(temporario, modelo_saida)
+    print(f"\n✅ Modelo salvo em: {modelo_saida}")
+    if compilavel:
+        exportar_floresta(melhor, compilado_saida, X_verificacao=X_test)
+        print(f"✅ Modelo compilado (arrays numpy) salvo em: {compilado_saida}")
+    else:
+        print(f"ℹ️ {nome_modelo} não tem exportação compilada; o preditor usará o pickle.")
 
     # ---- Salvar métricas e parâmetros em JSON ----
     metricas = {
-        "modelo": "RandomForest",
+        "modelo": nome_modelo,
         "versao": "v1.0.0",
         "data_treino": datetime.now().isoformat(),
         "acuracia": accuracy_score(y_test, preds),
-        "media_cv": scores.mean(),
-        "params_otimizados": grid.best_params_,
-        "features": list(X.columns) + [f"embed_{i}" for i in range(X_emb.shape[1])]
+        "media_cv": float(media_cv),
+        "params_otimizados": melhores_params,
+        "tempo_treino_s": round(tempo_treino, 2),
+        "latencia_inferencia": latencia,
+        "fonte_embeddings": melhor.fonte_features_,
+        "features": colunas
     }
-    with open(METRICAS_SAIDA_PATH, "w", encoding="utf-8") as f:
+    with open(metricas_saida, "w", encoding="utf-8") as f:
         json.dump(metricas, f, indent=2)
-    print(f"📊 Métricas salvas em: {METRICAS_SAIDA_PATH}")
+    print(f"📊 Métricas salvas em: {metricas_saida}")
 
 if __name__ == "__main__":
-    df = carregar_dados_rotulados()
-    if df.empty:
+    parser = argparse.ArgumentParser(description="Treino do modelo de relevância")
+    parser.add_argument("--algoritmo", choices=ALGORITMOS, default="floresta",
+                        help="floresta: RandomForest com grade completa | boosting: HistGradientBoosting com early stopping e successive halving")
+    parser.add_argument("--modelo-saida", default=MODELO_SAIDA_PATH)
+    parser.add_argument("--metricas-saida", default=METRICAS_SAIDA_PATH)
+    args = parser.parse_args()
+
+    X_total, y = carregar_dados_rotulados()
+    if len(y) == 0:
         print("⚠️ Nenhum dado válido encontrado para treino.")
     else:
-        treinar_modelo(df)
+        treinar_modelo(X_total, y, args.algoritmo, args.modelo_saida, args.metricas_saida)
@@ -7,7 +7,6 @@ from typing import List, Dict, Union, Optional, Tuple
 from pathlib import Path
 from uuid import uuid4
 
-import spacy
 from redis import Redis
 
 from theme_manager.ml_model import prever_relevancia
@@ -17,9 +16,10 @@ from theme_manager.config import (
     VOLUME_MIN_DEFAULT,
     SCORE_MIN_DEFAULT
 )
+from ml.nlp_registry import modelo_preguicoso, COMPONENTES_SO_NER
 
 logger = logging.getLogger(__name__)
-nlp = spacy.load("pt_core_news_sm")
+nlp = modelo_preguicoso("pt_core_news_sm", desativar=COMPONENTES_SO_NER)
 
 # ---------------------------
 # Logger com trace_id